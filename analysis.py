@@ -0,0 +1,41 @@
+from lexicon import DEFAULT_LEXICONS, count_hits
+from readability import FogCounter, fog_verdict, iter_chunks, CHUNK_SIZE
+
+# --- NARRATIVE ANALYSIS (UI-independent) ---
+# Fog + lexicon hit counts over a str, Path, file-like object or iterable of
+# text pieces (e.g. report pages) in one streamed pass.
+
+# Bump when Fog / lexicon / X-Ray output changes: invalidates persisted results (result_store.py)
+ANALYSIS_VERSION = '1'
+
+_BREAK_CHARS = '.!?\n'
+
+
+def sentence_aligned(chunks):
+    # Re-cut a chunk stream at the last sentence break so lexicon phrases are never split
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk
+        cut = max(text.rfind(c) for c in _BREAK_CHARS) + 1
+        if cut <= 0:
+            cut = text.rfind(' ') + 1
+        if cut <= 0:
+            carry = text
+            continue
+        carry = text[cut:]
+        yield text[:cut]
+    if carry:
+        yield carry
+
+
+def analyze_narrative(source, lexicons=DEFAULT_LEXICONS, chunk_size=CHUNK_SIZE):
+    counter = FogCounter()
+    hits = {category: 0 for category, _ in lexicons}
+    for piece in sentence_aligned(iter_chunks(source, chunk_size)):
+        counter.feed(piece)
+        for category, n in count_hits(piece, lexicons).items():
+            hits[category] += n
+    res = counter.result()
+    res['hits'] = hits
+    res['verdict'] = fog_verdict(res['fog'])
+    return res
@@ -0,0 +1,353 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from result_store import cached_analysis
+from scoring import INPUT_FIELDS, VERDICT_LABELS, score_arrays
+
+# --- HEADLESS SCORING API (ASGI) ---
+# The Z/M/quality scoring and the narrative Fog/lexicon analysis behind a small
+# local HTTP service, without the Streamlit rerun loop. Same engines as the UI.
+#
+#   uvicorn api:app --port 8000          (or: python api.py --port 8000)
+#
+#   POST /score              {"rev_cy": ..., ...}          -> scores + verdict
+#   POST /score/batch        [{...}, ...] or NDJSON        -> one result per row
+#   POST /narrative          {"text": "..."}               -> Fog + lexicon hits + verdict
+#   POST /narrative/batch    [{"id":..,"text":..}] or NDJSON
+#   GET  /metrics            p50 / p99 latency per endpoint
+#   GET  /health
+
+NDJSON = 'application/x-ndjson'
+SCORE_BATCH_ROWS = 10_000          # NDJSON rows scored per vectorized batch
+MAX_JSON_BODY = 64 * 1024 * 1024   # plain-JSON bodies are read whole; NDJSON is streamed
+# NDJSON limits: results are held until the request body ends (see score_batch), so a
+# request's size is capped as well as each line's
+MAX_NDJSON_LINE = MAX_JSON_BODY
+MAX_NDJSON_BODY = 1024 * 1024 * 1024
+MAX_BATCH_ROWS = 500_000
+LATENCY_WINDOW = 2048
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- SCORING ---
+
+def _score_rows(rows):
+    # Vectorized over the batch; missing fields are NaN (-> null scores, null verdict)
+    cols = {}
+    for f in INPUT_FIELDS:
+        try:
+            cols[f] = np.array([r.get(f, np.nan) for r in rows], dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ApiError(400, f"Field '{f}' must be numeric")
+        except AttributeError:
+            raise ApiError(400, "Each row must be a JSON object")
+    res = score_arrays(**cols)
+    codes = res.pop('verdict_code')
+    out = []
+    for i, row in enumerate(rows):
+        item = {'id': row['id']} if 'id' in row else {}
+        for k, v in res.items():
+            x = float(v[i])
+            item[k] = None if np.isnan(x) else x
+        item['verdict'] = VERDICT_LABELS[codes[i]] if codes[i] >= 0 else None
+        out.append(item)
+    return out
+
+
+def _narrative(doc):
+    if not isinstance(doc, dict) or not isinstance(doc.get('text'), str):
+        return {'id': doc.get('id') if isinstance(doc, dict) else None, 'error': "expected {\"text\": str}"}
+    res = cached_analysis(doc['text'])
+    if 'id' in doc:
+        res = {'id': doc['id'], **res}
+    return res
+
+
+# --- ASGI PLUMBING ---
+
+class ForensicApi:
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.pool = None
+        self.latency = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+        t0 = time.perf_counter()
+        route = (scope['method'], scope['path'].rstrip('/') or '/')
+        handler = ROUTES.get(route)
+        try:
+            if handler is None:
+                known = any(path == route[1] for _, path in ROUTES)
+                raise ApiError(405 if known else 404, "Method not allowed" if known else "Not found")
+            await handler(self, scope, receive, send)
+        except ApiError as e:
+            await _send_json(send, {'error': str(e)}, status=e.status)
+        finally:
+            if handler is not None:
+                window = self.latency.setdefault(f'{route[0]} {route[1]}', deque(maxlen=LATENCY_WINDOW))
+                window.append((time.perf_counter() - t0) * 1000)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            msg = await receive()
+            if msg['type'] == 'lifespan.startup':
+                self._get_pool()
+                await send({'type': 'lifespan.startup.complete'})
+            elif msg['type'] == 'lifespan.shutdown':
+                if self.pool is not None:
+                    self.pool.shutdown(cancel_futures=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def _get_pool(self):
+        # CPU-heavy text work runs here so the event loop stays responsive
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(self.workers)
+        return self.pool
+
+    async def run_in_pool(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+
+    async def _map_narratives(self, docs, results):
+        # At most two documents per worker in flight: while the pool is busy the request
+        # body is not read further, so memory follows the window, not the request
+        pending = deque()
+        limit = 2 * (self.workers or os.cpu_count() or 1)
+        try:
+            async for doc in docs:
+                pending.append(asyncio.ensure_future(self.run_in_pool(_narrative, doc)))
+                if len(pending) >= limit:
+                    results.append(await pending.popleft())
+        finally:
+            # documents already dispatched still report, also when the body turns out invalid
+            while pending:
+                results.append(await pending.popleft())
+
+    # --- handlers ---
+
+    async def health(self, scope, receive, send):
+        await _send_json(send, {'status': 'ok'})
+
+    async def metrics(self, scope, receive, send):
+        out = {}
+        for name, window in self.latency.items():
+            samples = sorted(window)
+            if samples:
+                out[name] = {'count': len(samples),
+                             'p50_ms': samples[int(0.50 * (len(samples) - 1))],
+                             'p99_ms': samples[int(0.99 * (len(samples) - 1))]}
+        await _send_json(send, out)
+
+    async def score(self, scope, receive, send):
+        row = await _read_json(receive)
+        if not isinstance(row, dict):
+            raise ApiError(400, "Expected a JSON object")
+        await _send_json(send, _score_rows([row])[0])
+
+    async def score_batch(self, scope, receive, send):
+        if _content_type(scope) != NDJSON:
+            rows = await _read_json(receive)
+            if not isinstance(rows, list):
+                raise ApiError(400, "Expected a JSON array (or NDJSON)")
+            await _send_json(send, await _run_in_thread(_score_rows, rows))
+            return
+        # NDJSON in, NDJSON out: rows are scored in vectorized batches as lines arrive.
+        # Output is held until the request body is complete, since most HTTP/1.1
+        # clients only read the response after sending the whole request (the rows and bytes
+        # of a request are capped, see _iter_ndjson).
+        out, batch, error = [], [], None
+        try:
+            async for row in _iter_ndjson(receive):
+                batch.append(row)
+                if len(batch) >= SCORE_BATCH_ROWS:
+                    out.append(await _run_in_thread(_score_and_encode, batch))
+                    batch = []
+            if batch:
+                out.append(await _run_in_thread(_score_and_encode, batch))
+        except ApiError as e:
+            error = e
+            try:
+                if batch:
+                    out.append(await _run_in_thread(_score_and_encode, batch))
+            except ApiError:
+                pass
+        if error is not None and not out:
+            raise error
+        await _start(send, 200, NDJSON)
+        for chunk in out:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        if error is not None:
+            await _send_lines(send, [{'error': str(error)}])
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def narrative(self, scope, receive, send):
+        doc = await _read_json(receive)
+        res = await self.run_in_pool(_narrative, doc)
+        if 'error' in res:
+            raise ApiError(400, res['error'])
+        await _send_json(send, res)
+
+    async def narrative_batch(self, scope, receive, send):
+        if _content_type(scope) != NDJSON:
+            docs = await _read_json(receive)
+            if not isinstance(docs, list):
+                raise ApiError(400, "Expected a JSON array (or NDJSON)")
+            results = []
+            await self._map_narratives(_aiter(docs), results)
+            await _send_json(send, results)
+            return
+        # Documents are dispatched to the pool as they arrive; results go back in input order
+        results, error = [], None
+        try:
+            await self._map_narratives(_iter_ndjson(receive), results)
+        except ApiError as e:
+            error = e
+        if error is not None and not results:
+            raise error
+        await _start(send, 200, NDJSON)
+        for i in range(0, len(results), SCORE_BATCH_ROWS):
+            await _send_lines(send, results[i:i + SCORE_BATCH_ROWS])
+        if error is not None:
+            await _send_lines(send, [{'error': str(error)}])
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+ROUTES = {
+    ('GET', '/health'): ForensicApi.health,
+    ('GET', '/metrics'): ForensicApi.metrics,
+    ('POST', '/score'): ForensicApi.score,
+    ('POST', '/score/batch'): ForensicApi.score_batch,
+    ('POST', '/narrative'): ForensicApi.narrative,
+    ('POST', '/narrative/batch'): ForensicApi.narrative_batch,
+}
+
+
+def _content_type(scope):
+    for k, v in scope.get('headers', []):
+        if k == b'content-type':
+            return v.decode('latin-1').split(';')[0].strip().lower()
+    return ''
+
+
+async def _read_json(receive):
+    body = bytearray()
+    while True:
+        msg = await receive()
+        body += msg.get('body', b'')
+        if len(body) > MAX_JSON_BODY:
+            raise ApiError(413, "Body too large; use NDJSON for big batches")
+        if not msg.get('more_body'):
+            break
+    try:
+        return json.loads(body or b'null')
+    except ValueError as e:
+        raise ApiError(400, f"Invalid JSON: {e}")
+
+
+async def _iter_ndjson(receive):
+    # Only the bytes of each new message are split; an unfinished line is kept as a list of
+    # pieces and joined once, when its newline arrives
+    tail, tail_len, total, rows = [], 0, 0, 0
+    while True:
+        msg = await receive()
+        body = msg.get('body', b'')
+        total += len(body)
+        if total > MAX_NDJSON_BODY:
+            raise ApiError(413, f"NDJSON body over {MAX_NDJSON_BODY >> 20} MB; split the batch")
+        *lines, rest = body.split(b'\n')
+        if lines:
+            tail.append(lines[0])
+            lines[0] = b''.join(tail)
+            tail, tail_len = [], 0
+        for line in lines:
+            if len(line) > MAX_NDJSON_LINE:
+                raise ApiError(413, f"NDJSON line over {MAX_NDJSON_LINE >> 20} MB")
+            if line.strip():
+                rows += 1
+                if rows > MAX_BATCH_ROWS:
+                    raise ApiError(413, f"More than {MAX_BATCH_ROWS:,} rows; split the batch")
+                yield _parse_line(line)
+        if rest:
+            tail.append(rest)
+            tail_len += len(rest)
+            if tail_len > MAX_NDJSON_LINE:
+                raise ApiError(413, f"NDJSON line over {MAX_NDJSON_LINE >> 20} MB")
+        if not msg.get('more_body'):
+            break
+    line = b''.join(tail)
+    if line.strip():
+        if rows >= MAX_BATCH_ROWS:
+            raise ApiError(413, f"More than {MAX_BATCH_ROWS:,} rows; split the batch")
+        yield _parse_line(line)
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _run_in_thread(fn, *args):
+    # Vectorized scoring of a big batch: off the event loop, in the default thread pool
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+def _score_and_encode(rows):
+    return _encode_lines(_score_rows(rows))
+
+
+def _parse_line(line):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise ApiError(400, f"Invalid NDJSON line: {e}")
+
+
+async def _start(send, status, content_type):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', content_type.encode())]})
+
+
+async def _send_json(send, payload, status=200):
+    body = json.dumps(payload).encode()
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode())]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _encode_lines(items):
+    return ''.join(json.dumps(item) + '\n' for item in items).encode()
+
+
+async def _send_lines(send, items):
+    await send({'type': 'http.response.body', 'body': _encode_lines(items), 'more_body': True})
+
+
+app = ForensicApi(workers=int(os.environ['FO_API_WORKERS']) if os.environ.get('FO_API_WORKERS') else None)
+
+
+if __name__ == '__main__':
+    import argparse
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Forensic Omniscient headless scoring API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help="text-analysis worker processes")
+    args = parser.parse_args()
+    app.workers = args.workers
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -1,14 +1,32 @@
+import importlib
+import os
+import time
 import streamlit as st
 from utils import inject_custom_css
-from views_financial import show_financial_phase
-from views_narrative import show_narrative_phase
-from views_about import show_about_tab
+from instrumentation import begin_run, end_run, span, SHOW_PANEL
+
+# Pages are imported lazily: a view module (and plotly / numpy behind it)
+# is only loaded once that page is routed to.
+PAGES = {
+    "💎 Financial Analysis": ("views_financial", "show_financial_phase"),
+    "📈 Trend Analysis": ("views_trends", "show_trends_phase"),
+    "📝 Narrative Decoder": ("views_narrative", "show_narrative_phase"),
+    "📘 About & Methodology": ("views_about", "show_about_tab"),
+}
+
+# Startup measurement mode: FO_PROFILE_STARTUP=1 streamlit run app.py
+# (or python startup_profile.py for a cold-start report of every page)
+PROFILE_STARTUP = os.environ.get("FO_PROFILE_STARTUP") == "1"
 
 # 1. Page Config
 st.set_page_config(page_title="Forensic Omniscient", layout="wide", page_icon="🔍")
 
+# Per-stage rerun timings: no-op unless FO_TRACE=1 (see instrumentation.py)
+begin_run()
+
 # 2. Inject CSS
-inject_custom_css()
+with span("css.global"):
+    inject_custom_css()
 
 # --- HEADER SECTION (CENTERED) ---
 # Using a professional Audit/Forensic Icon
@@ -23,17 +41,39 @@ st.markdown("""
 # 3. Sidebar Nav (Cleaned up)
 with st.sidebar:
     st.markdown("### 🧭 Navigation Module")
-    page = st.radio("", ["💎 Financial Analysis", "📝 Narrative Decoder", "📘 About & Methodology"], label_visibility="collapsed")
+    page = st.radio("", list(PAGES), label_visibility="collapsed", key="nav_page")
     st.markdown("---")
     st.info("**Status:** System Online \n**v3.5 Stable**")
 
-# 4. Route
-if page == "💎 Financial Analysis":
-    show_financial_phase()
-elif page == "📝 Narrative Decoder":
-    show_narrative_phase()
-elif page == "📘 About & Methodology":
-    show_about_tab()
+# 4. Route (lazy import of the selected view only)
+module_name, func_name = PAGES[page]
+t_import = time.perf_counter()
+with span(f"import:{module_name}"):
+    show_page = getattr(importlib.import_module(module_name), func_name)
+t_render = time.perf_counter()
+with span(f"render:{module_name}"):
+    show_page()
+t_done = time.perf_counter()
+
+if PROFILE_STARTUP:
+    # First visit per session = cold import + first render of that page
+    timings = st.session_state.setdefault("_startup_timings", {})
+    timings.setdefault(page, {"import_ms": (t_render - t_import) * 1000,
+                              "first_render_ms": (t_done - t_render) * 1000})
+    with st.sidebar:
+        st.caption("⏱️ **Startup profile**  \n" + "  \n".join(
+            f"{p}: import {t['import_ms']:.0f} ms, render {t['first_render_ms']:.0f} ms" for p, t in timings.items()))
 
 # 5. BIG PROMINENT FOOTER
-st.markdown('<div class="footer">⚡ Created by Manthaj Morajker ⚡</div>', unsafe_allow_html=True)
\ No newline at end of file
+st.markdown('<div class="footer">⚡ Created by Manthaj Morajker ⚡</div>', unsafe_allow_html=True)
+
+record = end_run(page)
+if SHOW_PANEL and record is not None:
+    # Debug panel: this rerun's stage breakdown + recent rerun totals
+    history = st.session_state.setdefault("_trace_history", [])
+    history.append(record["total_ms"])
+    del history[:-20]
+    with st.sidebar.expander("🛠️ Rerun Profile", expanded=True):
+        st.caption(f"**Total {record['total_ms']:.1f} ms**  \n" + "  \n".join(
+            f"{'&nbsp;' * 4 * s['depth']}{s['name']}: {s['ms']:.1f} ms" for s in record["spans"]))
+        st.caption("Last reruns (ms): " + ", ".join(f"{ms:.0f}" for ms in history))
\ No newline at end of file
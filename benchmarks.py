@@ -0,0 +1,194 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+# --- BENCHMARK SUITE ---
+# Reproducible timings + peak memory for the scoring, readability and X-Ray
+# hot paths on synthetic inputs of increasing size.
+#
+#   python benchmarks.py --save                 # record .forensic_cache/bench_baseline.json
+#   python benchmarks.py                        # compare; exit 1 on regression
+#   python benchmarks.py --quick --threshold 0.5 --only fog
+
+COMPANY_SIZES = [1, 1_000, 100_000, 1_000_000]
+TEXT_SIZES = [1 << 10, 1 << 20, 10 << 20, 50 << 20]   # 1KB .. 50MB
+QUICK_COMPANY_MAX = 100_000
+QUICK_TEXT_MAX = 1 << 20
+
+# Machine-specific, so kept out of the tree with the other local caches
+DEFAULT_BASELINE = os.environ.get('FO_BENCH_BASELINE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.forensic_cache', 'bench_baseline.json')
+
+
+# --- SYNTHETIC INPUTS ---
+
+def make_companies(n, seed=42):
+    import numpy as np
+    import pandas as pd
+    from scoring import INPUT_FIELDS, DEFAULT_INPUTS
+    rng = np.random.default_rng(seed)
+    # Scatter each field around the sample company, with some zero denominators
+    data = {f: DEFAULT_INPUTS[f] * rng.lognormal(0.0, 0.5, n) for f in INPUT_FIELDS}
+    for f in ('ta', 'tl', 'rev_py', 'ni'):
+        data[f][rng.random(n) < 0.01] = 0.0
+    return pd.DataFrame(data)
+
+
+def make_text(n_bytes, seed=42):
+    from lexicon import RISK_TERMS, VAGUE_TERMS
+    rnd = random.Random(seed)
+    vocab = (['the', 'of', 'and', 'to', 'in', 'our', 'we', 'company', 'revenue', 'growth', 'market',
+              'strategic', 'operational', 'performance', 'shareholders', 'macroeconomic',
+              'comprehensive', 'infrastructure', 'sustainability', 'fiscal', 'year', 'cash']
+             + list(RISK_TERMS) + list(VAGUE_TERMS))
+    block = []
+    size = 0
+    while size < min(n_bytes, 1 << 16):
+        sentence = ' '.join(rnd.choice(vocab) for _ in range(rnd.randint(8, 30)))
+        sentence = sentence.capitalize() + rnd.choice(['. ', '. ', '! ', '? ', '.\n\n'])
+        block.append(sentence)
+        size += len(sentence)
+    block = ''.join(block)
+    return (block * (n_bytes // len(block) + 1))[:n_bytes]
+
+
+# --- CASES ---
+# name -> (input kind: "companies" | "text", fn(input))
+
+def _safe_div_scalar(df):
+    from utils import safe_div
+    for n, d in zip(df['rev_cy'].tolist(), df['ta'].tolist()):
+        safe_div(n, d)
+
+
+def _safe_div_array(df):
+    from utils import safe_div_array
+    safe_div_array(df['rev_cy'].to_numpy(), df['ta'].to_numpy())
+
+
+def _score(df):
+    from scoring import score_frame
+    score_frame(df)
+
+
+def _fog(text):
+    from readability import fog_index
+    fog_index(text)
+
+
+def _highlight(text):
+    from lexicon import highlight_text
+    highlight_text(text)
+
+
+CASES = {
+    'safe_div_scalar': ('companies', _safe_div_scalar),
+    'safe_div_array': ('companies', _safe_div_array),
+    'score_frame': ('companies', _score),
+    'fog_index': ('text', _fog),
+    'highlight_text': ('text', _highlight),
+}
+
+
+def case_sizes(kind, quick):
+    if kind == 'companies':
+        return [n for n in COMPANY_SIZES if not quick or n <= QUICK_COMPANY_MAX]
+    return [n for n in TEXT_SIZES if not quick or n <= QUICK_TEXT_MAX]
+
+
+def measure(fn, arg, repeats):
+    fn(arg)  # warm-up (imports, lexicon compile, syllable cache)
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        t0 = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - t0)
+    # Peak memory in a separate run: tracemalloc would distort the timings
+    gc.collect()
+    tracemalloc.start()
+    fn(arg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': min(times), 'peak_bytes': peak}
+
+
+def run_suite(quick=False, only=None, repeats=3):
+    results = {}
+    for name, (kind, fn) in CASES.items():
+        if only and not any(o in name for o in only):
+            continue
+        for size in case_sizes(kind, quick):
+            # the pure-Python scalar loop is the reference point, not a target: cap it
+            if name == 'safe_div_scalar' and size > QUICK_COMPANY_MAX:
+                continue
+            arg = make_companies(size) if kind == 'companies' else make_text(size)
+            n_repeats = repeats if size <= (1 << 20) else 1
+            res = measure(fn, arg, n_repeats)
+            key = f'{name}[{size}]'
+            results[key] = res
+            print(f"  {key:<32}{res['seconds'] * 1000:>12.2f} ms{res['peak_bytes'] / 1e6:>12.2f} MB peak")
+            del arg
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in ('seconds', 'peak_bytes'):
+            # ignore sub-millisecond / sub-64KB noise
+            floor = 1e-3 if metric == 'seconds' else 64 * 1024
+            if res[metric] > max(base[metric], floor) * (1 + threshold):
+                regressions.append(f"{key} {metric}: {base[metric]:.4g} -> {res[metric]:.4g} "
+                                   f"(+{(res[metric] / max(base[metric], floor) - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forensic Omniscient benchmark suite")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument('--save', action='store_true', help="write results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed slowdown/memory growth (0.25 = 25%%)")
+    parser.add_argument('--quick', action='store_true', help="skip the largest sizes (<= 100k companies, <= 1MB text)")
+    parser.add_argument('--only', nargs='+', help="run cases whose name contains any of these")
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    print(f"Python {platform.python_version()} on {platform.machine()}")
+    results = run_suite(args.quick, args.only, args.repeats)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as fh:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(),
+                       'results': results}, fh, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save first.")
+        return 0
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)['results']
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r}")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
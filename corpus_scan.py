@@ -0,0 +1,192 @@
+import argparse
+import csv
+import fnmatch
+import multiprocessing as mp
+import os
+import sys
+import time
+from pathlib import Path
+
+from analysis import analyze_narrative
+from extract import EXTRACTABLE, analyze_report
+from result_store import cached_analysis
+from lexicon import DEFAULT_LEXICONS
+
+# --- CORPUS SCANNER (CLI) ---
+# Runs the Narrative Decoder analysis (Fog + risk/vague lexicons) over a whole
+# directory of MD&A text files on a process pool, streaming results to CSV or
+# Parquet. Re-running with the same output resumes where it stopped.
+#
+#   python corpus_scan.py filings/ -o narrative.csv --workers 8
+#   python corpus_scan.py filings/ -o narrative.parquet --pattern "*.txt" "*.md"
+#   python corpus_scan.py reports/ -o narrative.csv --pattern "*.pdf" "*.html"
+#
+# PDF / HTML annual reports are extracted page by page and only their MD&A /
+# Directors' Report is analysed (see extract.py).
+
+CATEGORIES = [category for category, _ in DEFAULT_LEXICONS]
+COLUMNS = (['path', 'words', 'sentences', 'complex_words', 'complex_ratio', 'fog']
+           + [f'hits_{c}' for c in CATEGORIES] + ['verdict', 'error'])
+
+
+def iter_documents(root, patterns):
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if any(fnmatch.fnmatch(name, p) for p in patterns):
+                yield Path(dirpath, name).relative_to(root).as_posix()
+
+
+def analyze_file(job):
+    root, rel, use_cache = job
+    row = {'path': rel, 'error': ''}
+    try:
+        if Path(rel).suffix.lower() in EXTRACTABLE:
+            # Already one document per worker: no nested page pool
+            res = analyze_report(Path(root, rel), workers=1)
+        else:
+            # Documents already analysed (in any scan or in the UI) come from the result store
+            analyze = cached_analysis if use_cache else analyze_narrative
+            res = analyze(Path(root, rel))
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+        return row
+    for k in ('words', 'sentences', 'complex_words', 'complex_ratio', 'fog', 'verdict'):
+        row[k] = res[k]
+    for c in CATEGORIES:
+        row[f'hits_{c}'] = res['hits'].get(c, 0)
+    return row
+
+
+# --- OUTPUT WRITERS ---
+# CSV: one file, appended to. Parquet: a directory of part files (Parquet
+# files cannot be appended to), one part per flushed batch.
+
+class CsvSink:
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def done(self):
+        if not self.path.exists():
+            return set()
+        with open(self.path, newline='', encoding='utf-8') as fh:
+            # A hard kill can leave a truncated last line; it is simply re-scanned. Failed documents
+            # are retried too (their new row follows the failed one: keep the last row per path).
+            return {r['path'] for r in csv.DictReader(fh) if r.get('path') and r.get('error') == ''}
+
+    def open(self):
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        if not new:
+            with open(self.path, 'rb') as fh:
+                fh.seek(-1, os.SEEK_END)
+                partial = fh.read(1) != b'\n'
+        self._fh = open(self.path, 'a', newline='', encoding='utf-8')
+        if not new and partial:
+            self._fh.write('\r\n')
+        self._writer = csv.DictWriter(self._fh, fieldnames=COLUMNS)
+        if new:
+            self._writer.writeheader()
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+
+class ParquetSink:
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def done(self):
+        import pandas as pd
+        paths = set()
+        for part in sorted(self.path.glob('part-*.parquet')):
+            df = pd.read_parquet(part, columns=['path', 'error'])
+            paths.update(df.loc[df['error'].fillna('') == '', 'path'])
+        return paths
+
+    def open(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._next = len(list(self.path.glob('part-*.parquet')))
+
+    def write(self, rows):
+        import pandas as pd
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        tmp = self.path / f'.part-{self._next:05d}.tmp'
+        df.to_parquet(tmp, index=False)
+        # Rename last, so an interrupted write never leaves a half-written part behind
+        tmp.replace(self.path / f'part-{self._next:05d}.parquet')
+        self._next += 1
+
+    def close(self):
+        pass
+
+
+def make_sink(output, fmt=None):
+    fmt = fmt or ('parquet' if str(output).endswith('.parquet') else 'csv')
+    return ParquetSink(output) if fmt == 'parquet' else CsvSink(output)
+
+
+def scan_corpus(root, output, workers=None, patterns=('*.txt',), fmt=None, batch_size=500, progress=True,
+                use_cache=True):
+    sink = make_sink(output, fmt)
+    done = sink.done()
+    todo = [(str(root), rel, use_cache) for rel in iter_documents(root, patterns) if rel not in done]
+    if progress:
+        print(f"{len(done):,} already scanned, {len(todo):,} to go", file=sys.stderr)
+    if not todo:
+        return 0
+
+    sink.open()
+    buf, n, t0 = [], 0, time.perf_counter()
+    pool = mp.Pool(workers)
+    try:
+        for row in pool.imap_unordered(analyze_file, todo, chunksize=8):
+            buf.append(row)
+            n += 1
+            if len(buf) >= batch_size:
+                sink.write(buf)
+                buf = []
+                if progress:
+                    rate = n / (time.perf_counter() - t0)
+                    print(f"  {n:,}/{len(todo):,} documents ({rate:,.1f}/s)", file=sys.stderr)
+        pool.close()
+    except KeyboardInterrupt:
+        pool.terminate()
+        print("Interrupted: partial results saved, re-run to resume.", file=sys.stderr)
+    except BaseException:
+        # join() below needs a closed or terminated pool, else it hides this error
+        pool.terminate()
+        raise
+    finally:
+        if buf:
+            sink.write(buf)
+        sink.close()
+        pool.join()
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forensic Omniscient: narrative corpus scanner")
+    parser.add_argument('root', help="directory of MD&A text files or PDF / HTML annual reports")
+    parser.add_argument('-o', '--output', required=True, help="results file (.csv) or directory (.parquet)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--pattern', nargs='+', default=['*.txt'], help="filename glob(s) to include")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None, help="default: from output suffix")
+    parser.add_argument('--batch-size', type=int, default=500, help="rows per flush / Parquet part")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the persistent result store")
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    n = scan_corpus(args.root, args.output, workers=args.workers, patterns=args.pattern,
+                    fmt=args.format, batch_size=args.batch_size, progress=not args.quiet,
+                    use_cache=not args.no_cache)
+    if not args.quiet:
+        print(f"Scanned {n:,} documents -> {args.output}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
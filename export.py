@@ -0,0 +1,274 @@
+import argparse
+import html
+import multiprocessing as mp
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from corpus_scan import CATEGORIES, analyze_file
+from extract import EXTRACTABLE
+from report_blocks import (CARD_CSS, build_radar_figure, fog_gauge, make_card, verdict_html,
+                           z_breakdown_html, m_breakdown_html)
+from scoring import COMPONENT_FIELDS, VERDICT_LABELS, score_frame, z_status, m_status, q_status
+from utils import parse_screener_csv
+
+# --- PORTFOLIO REPORT EXPORT (CLI) ---
+# Audit-committee pack for a whole portfolio: one workbook (a row per company
+# with every Z / M / quality component and the verdict, plus one sheet per
+# narrative metric) and an HTML report card per company with the radar and
+# Fog gauge. The portfolio is read in batches, the workbook is written with
+# openpyxl's write-only (streaming) mode and the cards are rendered in a
+# process pool one batch at a time, so memory stays flat as the portfolio grows.
+#
+#   python export.py portfolio.csv -o pack/
+#   python export.py portfolio.xlsx -o pack/ --narratives mdna/ --workers 8
+#
+# Narrative files are matched to companies by file name: "<company>_<year>.txt"
+# or "<company>.txt" (also .pdf / .html annual reports), ignoring case and punctuation.
+
+WORKBOOK_NAME = 'portfolio.xlsx'
+CARDS_DIR = 'cards'
+NARRATIVE_SUFFIXES = ('.txt', '.md') + EXTRACTABLE
+
+FINANCIAL_COLUMNS = (['Company', 'Sector', 'Year'] + COMPONENT_FIELDS
+                     + ['z_status', 'm_status', 'q_status', 'verdict', 'report_card'])
+# Workbook sheet -> narrative metric (corpus_scan row field)
+NARRATIVE_SHEETS = ([('Fog Index', 'fog'), ('Complex Words', 'complex_ratio'), ('Word Count', 'words')]
+                    + [(f'{c.title()} Phrases', f'hits_{c}') for c in CATEGORIES])
+
+PAGE_CSS = """
+<style>
+    body {background: #0e1117; color: #fafafa; font-family: "Source Sans Pro", sans-serif; margin: 30px;}
+    .row {display: flex; gap: 20px; margin-bottom: 20px;}
+    .col {flex: 1;}
+    h1 {margin-bottom: 0;} .sub {color: #8b949e; margin-top: 4px;}
+    table {border-collapse: collapse; width: 100%;}
+    td, th {border-bottom: 1px solid #333; padding: 6px 10px; text-align: left;}
+    a {color: #00e5ff;}
+</style>
+"""
+
+
+def _norm(name):
+    return ''.join(ch for ch in str(name).lower() if ch.isalnum())
+
+
+def _slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '-', str(name)).strip('-')[:60] or 'company'
+
+
+def narrative_files(root):
+    # {normalized "<company><year>" or "<company>": path relative to root}
+    found = {}
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            p = Path(dirpath, name)
+            if p.suffix.lower() in NARRATIVE_SUFFIXES:
+                found.setdefault(_norm(p.stem), p.relative_to(root).as_posix())
+    return found
+
+
+def narrative_for(matches, company, year=None):
+    # Path (relative to the narratives root) matched to a company, preferring its year-specific file
+    return (year and matches.get(_norm(f"{company}{year}"))) or matches.get(_norm(company))
+
+
+def _value(v):
+    # openpyxl writes NaN as an invalid cell: leave it empty
+    if isinstance(v, (float, np.floating)):
+        return None if np.isnan(v) else float(v)
+    return v
+
+
+def _fmt(v, suffix=''):
+    return 'n/a' if v is None or v != v else f"{v:.2f}{suffix}"
+
+
+# --- REPORT CARDS (pool workers) ---
+
+def card_html(rec, narrative):
+    z, m, q = rec['z_score'], rec['m_score'], rec['q_ratio']
+    chart = dict(full_html=False, include_plotlyjs=False, config={'displayModeBar': False})
+    complete = rec['verdict_code'] >= 0
+    radar = build_radar_figure(z, m, q).to_html(**chart) if complete else "<p>Incomplete inputs.</p>"
+    verdict = verdict_html(rec['verdict_code']) if complete else (
+        '<div style="border-left: 5px solid #8b949e; padding: 20px;"><h2>INCOMPLETE INPUTS</h2></div>')
+    title = html.escape(str(rec['company']))
+    sub = ' · '.join(html.escape(str(v)) for v in (rec.get('sector'), rec.get('year') and f"FY{rec['year']}") if v)
+    parts = [
+        f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{title}: forensic report card</title>',
+        '<script src="plotly.min.js"></script>', CARD_CSS, PAGE_CSS, '</head><body>',
+        f'<h1>{title}</h1><p class="sub">{sub}</p>',
+        '<div class="row">',
+        f'<div class="col">{make_card("Solvency (Z-Score)", _fmt(z), rec["z_status"], "Target > 3.0")}</div>',
+        f'<div class="col">{make_card("Integrity (M-Score)", _fmt(m), rec["m_status"], "Target < -2.22")}</div>',
+        f'<div class="col">{make_card("Quality (CFO/NI)", _fmt(q, "x"), rec["q_status"], "Target > 1.0")}</div>',
+        '</div>',
+        f'<div class="row"><div class="col">{radar}</div><div class="col">{verdict}</div></div>',
+    ]
+    if complete:
+        parts.append(f'<div class="row"><div class="col">{z_breakdown_html(*(rec[k] for k in "ABCDE"))}</div>'
+                     f'<div class="col">{m_breakdown_html(rec["dsri"], rec["sgi"])}</div></div>')
+    if narrative and not narrative.get('error'):
+        gauge = fog_gauge(narrative['fog']).to_html(**chart)
+        hits = ''.join(f"<tr><td>{c.title()} phrases</td><td>{narrative[f'hits_{c}']}</td></tr>" for c in CATEGORIES)
+        parts.append(f'<h2>Narrative ({html.escape(narrative["path"])})</h2>'
+                     f'<div class="row"><div class="col">{gauge}</div><div class="col"><table>'
+                     f"<tr><td>Verdict</td><td>{narrative['verdict']}</td></tr>"
+                     f"<tr><td>Words</td><td>{narrative['words']:,}</td></tr>"
+                     f"<tr><td>Complex words</td><td>{narrative['complex_ratio']:.1%}</td></tr>"
+                     f'{hits}</table></div></div>')
+    parts.append('</body></html>\n')
+    return '\n'.join(parts)
+
+
+def render_company(job):
+    # One company: narrative metrics (if a file matched) and the report card. Returns
+    # the narrative row for the workbook; the card goes straight to disk.
+    rec, narrative_root, narrative_rel, cards_dir, use_cache = job
+    narrative = analyze_file((narrative_root, narrative_rel, use_cache)) if narrative_rel else None
+    if cards_dir:
+        with open(Path(cards_dir, rec['card']), 'w', encoding='utf-8') as fh:
+            fh.write(card_html(rec, narrative))
+    return narrative
+
+
+# --- WORKBOOK ---
+
+def _header(ws, names):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    bold = Font(bold=True)
+    cells = []
+    for name in names:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = bold
+        cells.append(cell)
+    ws.append(cells)
+    ws.freeze_panes = 'A2'
+
+
+def _records(batch, start):
+    scores = score_frame(batch)
+    codes = scores['verdict'].cat.codes.to_numpy()
+    n = len(batch)
+    company = batch['company'] if 'company' in batch.columns else [f"Company {start + i + 1}" for i in range(n)]
+    sector = batch['sector'] if 'sector' in batch.columns else [None] * n
+    year = batch['year'] if 'year' in batch.columns else [None] * n
+    statuses = (z_status(scores['z_score'].to_numpy()), m_status(scores['m_score'].to_numpy()),
+                q_status(scores['q_ratio'].to_numpy()))
+    cols = {f: scores[f].to_numpy() for f in COMPONENT_FIELDS}
+    for i, (c, s, y) in enumerate(zip(company, sector, year)):
+        c = c or f"Company {start + i + 1}"
+        rec = {'company': c, 'sector': s or None, 'year': y or None, 'verdict_code': int(codes[i]),
+               'z_status': str(statuses[0][i]), 'm_status': str(statuses[1][i]), 'q_status': str(statuses[2][i])}
+        rec.update({f: float(cols[f][i]) for f in COMPONENT_FIELDS})
+        for score, status in (('z_score', 'z_status'), ('m_score', 'm_status'), ('q_ratio', 'q_status')):
+            if np.isnan(rec[score]):
+                rec[status] = None  # incomplete inputs: no band
+        rec['card'] = f"{start + i + 1:06d}-{_slug(c)}{'-' + _slug(y) if y else ''}.html"
+        yield rec
+
+
+def export_portfolio(source, output, narratives=None, workers=None, cards=True, batch_size=5000,
+                     progress=True, use_cache=True):
+    from openpyxl import Workbook
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    cards_dir = output / CARDS_DIR if cards else None
+    if cards:
+        from plotly.offline import get_plotlyjs
+        cards_dir.mkdir(exist_ok=True)
+        bundle = cards_dir / 'plotly.min.js'
+        if not bundle.exists():
+            bundle.write_text(get_plotlyjs(), encoding='utf-8')
+    matches = narrative_files(narratives) if narratives else {}
+
+    wb = Workbook(write_only=True)
+    fin = wb.create_sheet('Financial')
+    _header(fin, FINANCIAL_COLUMNS)
+    sheets = []
+    for title, field in NARRATIVE_SHEETS:
+        ws = wb.create_sheet(title)
+        _header(ws, ['Company', 'Sector', 'Year', title, 'Narrative verdict', 'Source'])
+        sheets.append((ws, field))
+
+    index = open(cards_dir / 'index.html', 'w', encoding='utf-8') if cards else None
+    if index:
+        index.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Portfolio report cards</title>'
+                    f'{PAGE_CSS}</head><body><h1>Portfolio report cards</h1><table>\n'
+                    '<tr><th>Company</th><th>Sector</th><th>Year</th><th>Verdict</th><th>Fog</th></tr>\n')
+
+    # Pool only when there is per-company work beyond the score math
+    pool = mp.Pool(workers) if cards or matches else None
+    n, t0 = 0, time.perf_counter()
+    try:
+        for batch in parse_screener_csv(source, chunksize=batch_size):
+            recs = list(_records(batch, n))
+            jobs = [(rec, str(narratives) if narratives else None,
+                     narrative_for(matches, rec['company'], rec['year']),
+                     str(cards_dir) if cards else None, use_cache) for rec in recs]
+            results = pool.imap(render_company, jobs, chunksize=8) if pool else map(render_company, jobs)
+            for rec, narrative in zip(recs, results):
+                verdict = VERDICT_LABELS[rec['verdict_code']] if rec['verdict_code'] >= 0 else None
+                fin.append([rec['company'], rec['sector'], rec['year']]
+                           + [_value(rec[f]) for f in COMPONENT_FIELDS]
+                           + [rec['z_status'], rec['m_status'], rec['q_status'], verdict,
+                              f"{CARDS_DIR}/{rec['card']}" if cards else None])
+                ok = narrative is not None and not narrative.get('error')
+                if ok:
+                    for ws, field in sheets:
+                        ws.append([rec['company'], rec['sector'], rec['year'], _value(narrative[field]),
+                                   narrative['verdict'], narrative['path']])
+                if index:
+                    fog = f"{narrative['fog']:.1f}" if ok else ''
+                    index.write(f'<tr><td><a href="{rec["card"]}">{html.escape(str(rec["company"]))}</a></td>'
+                                f'<td>{html.escape(str(rec["sector"] or ""))}</td><td>{html.escape(str(rec["year"] or ""))}</td>'
+                                f'<td>{verdict or "Incomplete inputs"}</td><td>{fog}</td></tr>\n')
+            n += len(recs)
+            if progress:
+                rate = n / (time.perf_counter() - t0)
+                print(f"  {n:,} companies ({rate:,.1f}/s)", file=sys.stderr)
+        if pool:
+            pool.close()
+    except BaseException:
+        if pool:
+            pool.terminate()
+        raise
+    finally:
+        if pool:
+            pool.join()
+        if index:
+            index.write('</table></body></html>\n')
+            index.close()
+    wb.save(output / WORKBOOK_NAME)
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forensic Omniscient: portfolio report export")
+    parser.add_argument('portfolio', help="Screener-style CSV / XLSX export (one row per company or company-year)")
+    parser.add_argument('-o', '--output', required=True, help="output directory (workbook + cards/)")
+    parser.add_argument('--narratives', help="directory of MD&A text files / annual reports named by company")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--no-cards', action='store_true', help="workbook only")
+    parser.add_argument('--batch-size', type=int, default=5000, help="portfolio rows read and rendered per batch")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the persistent result store")
+    parser.add_argument('-q', '--quiet', action='store_true')
+    args = parser.parse_args(argv)
+
+    n = export_portfolio(args.portfolio, args.output, narratives=args.narratives, workers=args.workers,
+                         cards=not args.no_cards, batch_size=args.batch_size, progress=not args.quiet,
+                         use_cache=not args.no_cache)
+    if not args.quiet:
+        print(f"Exported {n:,} companies -> {Path(args.output) / WORKBOOK_NAME}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
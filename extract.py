@@ -0,0 +1,285 @@
+import argparse
+import multiprocessing as mp
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+
+from analysis import analyze_narrative
+from lexicon import DEFAULT_LEXICONS
+from readability import CHUNK_SIZE
+
+# --- ANNUAL REPORT TEXT EXTRACTION ---
+# Local PDF / HTML annual reports to analysis-ready text, one page at a time.
+# PDFs are read page by page (large files are split into page ranges across a
+# process pool, results come back in order with a bounded number in flight);
+# HTML is fed to the stdlib parser in chunks and cut into pseudo-pages at
+# headings. Pages stream through a section detector that keeps only the MD&A /
+# Directors' Report and on into the Fog / lexicon pass, so a 400-page report
+# is never held in memory as a whole.
+#
+#   python extract.py annual_report_2025.pdf               metrics for the MD&A / Directors' Report
+#   python extract.py annual_report_2025.pdf -o mdna.txt   ... and the extracted text
+#   python corpus_scan.py reports/ -o narrative.csv --pattern "*.pdf" "*.html"    (batch)
+#
+# PDF support needs pypdf (pip install pypdf); HTML uses the standard library.
+
+EXTRACTABLE = ('.pdf', '.htm', '.html')
+
+PDF_BATCH = 8              # pages per pool task
+PARALLEL_MIN_PAGES = 32    # smaller PDFs are read in-process
+HTML_PAGE_CHARS = 20000    # pseudo-page size when an HTML report has few headings
+HEAD_LINES = 6             # lines at the top of a page searched for a section heading
+HEADING_MAX_CHARS = 120
+
+# Sections kept for the narrative analysis, and headings that close them
+SECTIONS = {
+    'mdna': re.compile(r"management\W{0,3}s?\s+discussion\s+(?:and|&)\s+analysis", re.I),
+    'directors_report': re.compile(r"(?:directors|board)\W{0,3}s?\W{0,3}\s*report", re.I),
+}
+SECTION_LABELS = {'mdna': "MD&A", 'directors_report': "Directors' Report"}
+END_HEADINGS = re.compile(
+    r"corporate\s+governance|independent\s+auditor|auditor\W{0,3}s?\s+report|"
+    r"business\s+responsibility|sustainability\s+report|financial\s+statements|"
+    r"balance\s+sheet\s+as\s+at|notice\s+of\s+(?:the\s+)?annual\s+general\s+meeting", re.I)
+
+_HYPHEN_BREAK_RE = re.compile(r'(\w)-\n(\w)')
+_PAGE_NUMBER_RE = re.compile(r'^\s*(?:page\s+)?\d{1,4}\s*$', re.I | re.M)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def clean_page(text):
+    # Re-join words hyphenated across lines and drop bare page-number lines
+    text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)
+    return _PAGE_NUMBER_RE.sub('', text).strip()
+
+
+# --- PDF ---
+
+def _pdf_reader(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ImportError("PDF extraction needs pypdf: pip install pypdf") from None
+    return PdfReader(str(path))
+
+
+def _pdf_range(job):
+    # Pool task: text of pages [start, stop) of one PDF (each worker opens the file itself)
+    path, start, stop = job
+    reader = _pdf_reader(path)
+    return [clean_page(reader.pages[i].extract_text() or '') for i in range(start, stop)]
+
+
+def iter_pdf_pages(path, workers=None, batch=PDF_BATCH):
+    reader = _pdf_reader(path)
+    n = len(reader.pages)
+    if workers == 1 or n < PARALLEL_MIN_PAGES:
+        for i in range(n):
+            yield clean_page(reader.pages[i].extract_text() or '')
+        return
+    del reader
+    jobs = iter([(str(path), i, min(i + batch, n)) for i in range(0, n, batch)])
+    # spawn: safe to start from the threaded Streamlit server as well as the CLI
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context('spawn')) as pool:
+        # Keep ~2 batches per worker in flight and yield in page order: memory stays
+        # bounded by the window, not the document
+        window = deque()
+        limit = 2 * (workers or os.cpu_count() or 1)
+        for job in jobs:
+            window.append(pool.submit(_pdf_range, job))
+            if len(window) >= limit:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+# --- HTML ---
+
+class _HTMLPages(HTMLParser):
+    SKIP = {'script', 'style', 'head', 'noscript', 'template', 'svg'}
+    HEADINGS = {'h1', 'h2', 'h3'}
+    BLOCKS = {'p', 'div', 'li', 'tr', 'td', 'th', 'table', 'section', 'article', 'br',
+              'h4', 'h5', 'h6', 'blockquote', 'pre', 'ul', 'ol', 'dd', 'dt'}
+
+    def __init__(self, page_chars=HTML_PAGE_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.page_chars = page_chars
+        self.pages = []      # completed pages, drained by the caller after each feed()
+        self._parts = []
+        self._size = 0
+        self._skip = 0
+
+    def _break_page(self):
+        text = clean_page(''.join(self._parts))
+        if text:
+            self.pages.append(text)
+        self._parts, self._size = [], 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.HEADINGS:
+            # a heading opens a new page, so section headings sit at the top of their page
+            self._break_page()
+        elif tag in self.BLOCKS:
+            self._parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(self._skip - 1, 0)
+        elif tag in self.HEADINGS or tag in self.BLOCKS:
+            self._parts.append('\n')
+            if self._size >= self.page_chars:
+                self._break_page()
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        # Collapse whitespace runs but keep them: the space between two inline tags
+        # (<b>significant</b> <i>litigation</i>) is the only word boundary there
+        data = _WHITESPACE_RE.sub(' ', data)
+        if data:
+            self._parts.append(data)
+            self._size += len(data)
+
+    def close(self):
+        super().close()
+        self._break_page()
+
+
+def iter_html_pages(path, page_chars=HTML_PAGE_CHARS, chunk_size=CHUNK_SIZE):
+    parser = _HTMLPages(page_chars)
+    with open(path, encoding='utf-8', errors='replace') as fh:
+        while True:
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            yield from parser.pages
+            parser.pages.clear()
+    parser.close()
+    yield from parser.pages
+
+
+def iter_pages(path, workers=None):
+    suffix = Path(path).suffix.lower()
+    if suffix == '.pdf':
+        return iter_pdf_pages(path, workers)
+    if suffix in ('.htm', '.html'):
+        return iter_html_pages(path)
+    raise ValueError(f"Cannot extract text from {suffix or 'extension-less'} files (supported: {', '.join(EXTRACTABLE)})")
+
+
+# --- SECTION DETECTION ---
+
+class SectionFilter:
+    # Streams pages through, yielding only those inside a wanted section. A section
+    # opens at a page whose top lines carry its heading (running headers keep it open)
+    # and closes at the next major heading (Corporate Governance, Auditor's Report,
+    # financial statements...). Pages listing several headings are contents pages
+    # and are skipped.
+
+    def __init__(self, sections=tuple(SECTIONS)):
+        self.sections = sections
+        self.pages = 0          # pages seen
+        self.found = {}         # section -> [first page, last page] (1-based)
+        self.current = None
+
+    def _headings(self, text):
+        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+        heads = [ln for ln in lines if len(ln) <= HEADING_MAX_CHARS]
+        top = [ln for ln in lines[:HEAD_LINES] if len(ln) <= HEADING_MAX_CHARS]
+        opens = [name for ln in top for name, rx in SECTIONS.items() if rx.search(ln)]
+        closes = any(END_HEADINGS.search(ln) for ln in top)
+        listed = sum(1 for ln in heads if END_HEADINGS.search(ln) or any(rx.search(ln) for rx in SECTIONS.values()))
+        return opens, closes, listed
+
+    def __call__(self, pages):
+        for text in pages:
+            self.pages += 1
+            opens, closes, listed = self._headings(text)
+            if listed >= 3:
+                continue
+            if opens:
+                self.current = opens[0] if opens[0] in self.sections else None
+            elif closes:
+                self.current = None
+            if self.current is None:
+                continue
+            first_last = self.found.setdefault(self.current, [self.pages, self.pages])
+            first_last[1] = self.pages
+            yield text
+
+    def summary(self):
+        if not self.found:
+            return "no MD&A / Directors' Report heading found: whole document"
+        return ', '.join(f"{SECTION_LABELS.get(s, s)} p. {a}–{b}" for s, (a, b) in self.found.items())
+
+
+def pages_with_breaks(pages):
+    # A paragraph break after every page: words and sentences never run across pages
+    for text in pages:
+        yield text
+        yield '\n\n'
+
+
+def analyze_report(path, sections=True, workers=None, lexicons=DEFAULT_LEXICONS):
+    # Narrative metrics of a PDF / HTML report, streamed page by page. With sections=True only
+    # the MD&A / Directors' Report is analysed; a report without those headings is analysed whole
+    # (second pass).
+    if sections:
+        selector = SectionFilter()
+        res = analyze_narrative(pages_with_breaks(selector(iter_pages(path, workers))), lexicons)
+        if selector.found:
+            res['pages'] = selector.pages
+            res['extracted'] = selector.summary()
+            return res
+    res = analyze_narrative(pages_with_breaks(iter_pages(path, workers)), lexicons)
+    res['extracted'] = "whole document"
+    return res
+
+
+def extract_text(path, sections=True, workers=None):
+    # (text, summary): the selected pages only are materialised, for the interactive views
+    if sections:
+        selector = SectionFilter()
+        text = '\n\n'.join(selector(iter_pages(path, workers)))
+        if selector.found:
+            return text, f"{selector.pages} pages read; {selector.summary()}"
+    pages = list(iter_pages(path, workers))
+    return '\n\n'.join(pages), f"{len(pages)} pages read; whole document"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forensic Omniscient: annual report text extraction")
+    parser.add_argument('report', help="PDF or HTML annual report")
+    parser.add_argument('-o', '--output', help="also write the extracted text here")
+    parser.add_argument('--all', action='store_true', help="whole document, not just the MD&A / Directors' Report")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="PDF worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        selector = SectionFilter()
+        pages = iter_pages(args.report, args.workers)
+        if not args.all:
+            pages = selector(pages)
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            for text in pages:
+                fh.write(text + '\n\n')
+        if not args.all and not selector.found:
+            print("No MD&A / Directors' Report heading found; re-run with --all", file=sys.stderr)
+        res = analyze_narrative(Path(args.output))
+        res['extracted'] = "whole document" if args.all else selector.summary()
+    else:
+        res = analyze_report(args.report, sections=not args.all, workers=args.workers)
+    print(f"{res.get('extracted', 'whole document')}")
+    print(f"{res['words']:,} words, {res['sentences']:,} sentences, Fog {res['fog']:.1f} ({res['verdict']})")
+    print(', '.join(f"{c}: {n}" for c, n in res['hits'].items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import json
+import os
+import random
+import threading
+import time
+
+# --- RERUN INSTRUMENTATION ---
+# Timed spans around the stages of a Streamlit rerun (CSS, score math, text
+# passes, figure construction, chart serialization). Off by default: span()
+# then returns a shared no-op context, so instrumented code pays one attribute
+# lookup. Enabled per process with environment variables:
+#
+#   FO_TRACE=1                   record spans
+#   FO_TRACE_SAMPLE=0.1          share of reruns traced (default 1.0)
+#   FO_TRACE_FILE=trace.jsonl    append one JSON line per traced rerun
+#   FO_TRACE_PROM=fo.prom        Prometheus text-format file, rewritten after each traced rerun
+#   FO_TRACE_PANEL=1             per-rerun breakdown in the sidebar
+#
+# Fragment reruns (st.fragment) skip app.py; fragment_trace() records them as
+# runs named 'fragment:<name>'.
+
+ENABLED = os.environ.get('FO_TRACE') == '1'
+SAMPLE_RATE = float(os.environ.get('FO_TRACE_SAMPLE') or 1.0)
+TRACE_FILE = os.environ.get('FO_TRACE_FILE') or None
+PROM_FILE = os.environ.get('FO_TRACE_PROM') or None
+SHOW_PANEL = ENABLED and os.environ.get('FO_TRACE_PANEL') == '1'
+
+# Histogram buckets (seconds) for the Prometheus export
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()    # current trace of this session's script thread
+_lock = threading.Lock()
+_stats = {}                   # stage -> [count, sum, bucket counts]
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoSpan()
+
+
+class _Span:
+    __slots__ = ('trace', 'entry', 't0')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        # [name, ms, depth], listed in start order; ms is filled in on exit
+        self.entry = [name, None, trace['depth']]
+
+    def __enter__(self):
+        self.trace['spans'].append(self.entry)
+        self.trace['depth'] += 1
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.entry[1] = (time.perf_counter() - self.t0) * 1000
+        self.trace['depth'] -= 1
+        return False
+
+
+def span(name):
+    # with span('narrative.fog'): ...   (no-op unless this rerun is being traced)
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        return _NOOP
+    return _Span(trace, name)
+
+
+def timed(name):
+    # Decorator form of span()
+    def wrap(fn):
+        def inner(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        inner.__name__ = fn.__name__
+        inner.__doc__ = fn.__doc__
+        return inner
+    return wrap
+
+
+def begin_run():
+    # Start tracing this rerun (subject to sampling); returns True when traced
+    if not ENABLED or random.random() >= SAMPLE_RATE:
+        _local.trace = None
+        return False
+    _local.trace = {'ts': time.time(), 't0': time.perf_counter(), 'depth': 0, 'spans': []}
+    return True
+
+
+def end_run(page=None):
+    # Finish the current trace; returns the rerun record (None when not traced)
+    trace = getattr(_local, 'trace', None)
+    _local.trace = None
+    if trace is None:
+        return None
+    record = {
+        'ts': round(trace['ts'], 3),
+        'page': page,
+        'total_ms': round((time.perf_counter() - trace['t0']) * 1000, 3),
+        # spans left open by an exception have no duration
+        'spans': [{'name': n, 'ms': round(ms, 3), 'depth': d} for n, ms, d in trace['spans'] if ms is not None],
+    }
+    with _lock:
+        _record_stats(record)
+        if TRACE_FILE:
+            with open(TRACE_FILE, 'a', encoding='utf-8') as fh:
+                fh.write(json.dumps(record) + '\n')
+        if PROM_FILE:
+            write_prometheus(PROM_FILE)
+    return record
+
+
+class _FragmentRun:
+    # A fragment-only rerun never executes app.py: trace it as a run of its own
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        begin_run()
+        _local.fragment_run = True
+        return self
+
+    def __exit__(self, *exc):
+        _local.fragment_run = False
+        end_run(f'fragment:{self.name}')
+        return False
+
+
+def fragment_trace(name):
+    # with fragment_trace('narrative.text'): ... at the top of an st.fragment body. Inside a
+    # full app run it is an ordinary span; on a fragment rerun it records its own rerun.
+    # Nested fragments (X-Ray inside the text panel) are spans of the outermost one's run,
+    # whether or not that run was sampled.
+    if not ENABLED:
+        return _NOOP
+    if getattr(_local, 'fragment_run', False) or getattr(_local, 'trace', None) is not None:
+        return span(f'fragment:{name}')
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None or not ctx.fragment_ids_this_run:
+        return span(f'fragment:{name}')
+    return _FragmentRun(name)
+
+
+def _record_stats(record):
+    stages = [('rerun', record['total_ms'])] + [(s['name'], s['ms']) for s in record['spans']]
+    for name, ms in stages:
+        sec = ms / 1000
+        entry = _stats.setdefault(name, [0, 0.0, [0] * len(BUCKETS)])
+        entry[0] += 1
+        entry[1] += sec
+        for i, b in enumerate(BUCKETS):
+            if sec <= b:
+                entry[2][i] += 1
+
+
+def prometheus_text():
+    lines = ['# HELP fo_stage_seconds Time spent per rerun stage (traced reruns only).',
+             '# TYPE fo_stage_seconds histogram']
+    for name, (count, total, buckets) in sorted(_stats.items()):
+        label = name.replace('\\', '\\\\').replace('"', '\\"')
+        for b, n in zip(BUCKETS, buckets):
+            lines.append(f'fo_stage_seconds_bucket{{stage="{label}",le="{b}"}} {n}')
+        lines.append(f'fo_stage_seconds_bucket{{stage="{label}",le="+Inf"}} {count}')
+        lines.append(f'fo_stage_seconds_sum{{stage="{label}"}} {total:.6f}')
+        lines.append(f'fo_stage_seconds_count{{stage="{label}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path):
+    # Write-then-rename so a scraper (node_exporter textfile collector) never reads half a file
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        fh.write(prometheus_text())
+    os.replace(tmp, path)
+
@@ -0,0 +1,133 @@
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+
+# --- LEXICON HIGHLIGHTER ENGINE ---
+# Tags a document against any number of word/phrase lexicons in a single
+# tokenization pass. Lookups are dict/trie based, so cost is linear in the
+# document length regardless of lexicon size.
+
+# Red Flags (Negative/Risk)
+RISK_TERMS = ('loss', 'decline', 'challenging', 'headwinds', 'litigation', 'fail', 'unable',
+              'volatilities', 'constrained', 'pressures')
+# Yellow Flags (Vague/Obfuscation)
+VAGUE_TERMS = ('believe', 'estimate', 'anticipate', 'maybe', 'could', 'contingent', 'endeavored',
+               'mitigate', 'aforementioned', 'synergistic', 'rationalization', 'precipitate')
+
+# (category, terms) in priority order: a term listed in two categories keeps the first
+DEFAULT_LEXICONS = (('risk', RISK_TERMS), ('vague', VAGUE_TERMS))
+CATEGORY_CLASSES = {'risk': 'risk-high', 'vague': 'risk-med'}
+
+TOKEN_RE = re.compile(r'\w+')
+_END = None  # trie key marking the end of a phrase
+
+
+def load_wordlist(path):
+    # One term (or phrase) per line; blank lines and '#' comments ignored.
+    # For CSV dictionaries (e.g. Loughran-McDonald) the first column is used.
+    terms = []
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            term = line.split(',', 1)[0].strip()
+            if term and not term.startswith('#'):
+                terms.append(term)
+    return tuple(terms)
+
+
+@lru_cache(maxsize=16)
+def compile_lexicons(lexicons=DEFAULT_LEXICONS):
+    # lexicons: tuple of (category, tuple_of_terms) -> (single-word dict, phrase trie).
+    # Cached per process, so Streamlit reruns reuse the compiled structures.
+    words, trie = {}, {}
+    for category, terms in lexicons:
+        for term in terms:
+            toks = [t.lower() for t in TOKEN_RE.findall(term)]
+            if not toks:
+                continue
+            if len(toks) == 1:
+                words.setdefault(toks[0], category)
+                continue
+            node = trie
+            for t in toks:
+                node = node.setdefault(t, {})
+            node.setdefault(_END, category)
+    return words, trie
+
+
+@lru_cache(maxsize=16)
+def lexicon_fingerprint(lexicons=DEFAULT_LEXICONS):
+    # Stable short hash of the lexicon contents, for keying persisted results
+    h = hashlib.sha256()
+    for category, terms in lexicons:
+        h.update(category.encode('utf-8') + b'\0' + '\0'.join(terms).encode('utf-8') + b'\1')
+    return h.hexdigest()[:16]
+
+
+def scan(text, lexicons=DEFAULT_LEXICONS):
+    # Returns (matches, counts): matches are (start, end, category) character spans
+    words, trie = compile_lexicons(lexicons)
+    counts = {category: 0 for category, _ in lexicons}
+    matches = []
+
+    if not trie:
+        for m in TOKEN_RE.finditer(text):
+            category = words.get(m.group().lower())
+            if category is not None:
+                matches.append((m.start(), m.end(), category))
+                counts[category] += 1
+        return matches, counts
+
+    # Phrase lexicons present: walk the trie from each token, longest match wins
+    tokens = [(m.start(), m.end(), m.group().lower()) for m in TOKEN_RE.finditer(text)]
+    i, n = 0, len(tokens)
+    while i < n:
+        best = None
+        node = trie.get(tokens[i][2])
+        j = i
+        while node is not None:
+            if _END in node:
+                best = (j, node[_END])
+            j += 1
+            node = node.get(tokens[j][2]) if j < n else None
+        if best is not None:
+            matches.append((tokens[i][0], tokens[best[0]][1], best[1]))
+            counts[best[1]] += 1
+            i = best[0] + 1
+            continue
+        category = words.get(tokens[i][2])
+        if category is not None:
+            matches.append((tokens[i][0], tokens[i][1], category))
+            counts[category] += 1
+        i += 1
+    return matches, counts
+
+
+def count_hits(text, lexicons=DEFAULT_LEXICONS):
+    # Counts only (no spans): the fast path for batch/corpus analysis
+    words, trie = compile_lexicons(lexicons)
+    if trie:
+        return scan(text, lexicons)[1]
+    tally = Counter(map(words.get, TOKEN_RE.findall(text.lower())))
+    return {category: tally.get(category, 0) for category, _ in lexicons}
+
+
+def render_html(text, matches, start=0, end=None):
+    # Wraps each match in its category <span>; optionally only the text[start:end] window
+    end = len(text) if end is None else end
+    parts, pos = [], start
+    for s, e, category in matches:
+        if e <= start or s >= end:
+            continue
+        s, e = max(s, start), min(e, end)
+        parts.append(text[pos:s])
+        parts.append(f'<span class="{CATEGORY_CLASSES.get(category, "risk-med")}">{text[s:e]}</span>')
+        pos = e
+    parts.append(text[pos:end])
+    return ''.join(parts)
+
+
+def highlight_text(text, lexicons=DEFAULT_LEXICONS):
+    # One-shot helper for the X-Ray view: (highlighted_html, per-category hit counts)
+    matches, counts = scan(text, lexicons)
+    return render_html(text, matches), counts
@@ -0,0 +1,218 @@
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import time
+
+import numpy as np
+
+from scoring import DEFAULT_INPUTS
+
+# --- LOAD TEST HARNESS (CLI) ---
+# N concurrent simulated analyst sessions against app.py, headless, on
+# Streamlit's app-testing API (no browser, no server). Each session runs in its
+# own process (AppTest drives a process-wide runtime, so sessions cannot share
+# one) and loops over a random mix of actions: switch page, edit a sidebar
+# number, paste a large text. Every action is one timed rerun. Sessions warm up
+# (imports + first run), then start together; the report gives rerun latency
+# percentiles per action, throughput and memory per session.
+#
+#   python loadtest.py --sessions 8 --duration 60
+#   python loadtest.py --sessions 1 2 4 8 16 --actions 30      (capacity sweep)
+#
+# Per-stage timings of the same reruns: set FO_TRACE=1 FO_TRACE_FILE=trace.jsonl
+# (instrumentation.py); the sessions inherit the environment.
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+FINANCIAL_PAGE, NARRATIVE_PAGE = 0, 2           # indexes into the sidebar page radio
+ACTION_MIX = {'switch_page': 0.3, 'edit_number': 0.4, 'paste_text': 0.3}
+# Sidebar number inputs edited by the simulated analysts (label -> default)
+EDIT_INPUTS = {
+    "Revenue (CY)": DEFAULT_INPUTS['rev_cy'], "Revenue (PY)": DEFAULT_INPUTS['rev_py'],
+    "Net Income": DEFAULT_INPUTS['ni'], "Operating Cash Flow": DEFAULT_INPUTS['cfo'],
+    "Total Assets": DEFAULT_INPUTS['ta'], "Receivables (CY)": DEFAULT_INPUTS['rec_cy'],
+}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _rss_mb():
+    # Current resident set size (Linux /proc), else the peak from getrusage
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Session:
+    # One simulated analyst: an AppTest instance plus the actions it can take
+    def __init__(self, seed, paste_bytes, timeout=120):
+        from streamlit.testing.v1 import AppTest
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.paste_bytes = paste_bytes
+        self.pastes = 0
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.page = FINANCIAL_PAGE
+
+    def _run(self):
+        t0 = time.perf_counter()
+        self.at.run()
+        ms = (time.perf_counter() - t0) * 1000
+        return ms, not self.at.exception
+
+    def start(self):
+        return self._run()
+
+    def _goto(self, page, out):
+        if self.page != page:
+            radio = self.at.sidebar.radio[0]
+            radio.set_value(radio.options[page])
+            out.append(('switch_page', *self._run()))
+            self.page = page
+
+    def switch_page(self, out):
+        radio = self.at.sidebar.radio[0]
+        self._goto(self.rng.choice([i for i in range(len(radio.options)) if i != self.page]), out)
+
+    def edit_number(self, out):
+        self._goto(FINANCIAL_PAGE, out)
+        label, default = self.rng.choice(list(EDIT_INPUTS.items()))
+        widget = next(w for w in self.at.sidebar.number_input if w.label == label)
+        widget.set_value(round(default * self.rng.uniform(0.8, 1.2), 1))
+        out.append(('edit_number', *self._run()))
+
+    def paste_text(self, out):
+        from benchmarks import make_text
+        self._goto(NARRATIVE_PAGE, out)
+        self.pastes += 1
+        # a different report every time: worst case, no cache hits
+        self.at.text_area[0].set_value(make_text(self.paste_bytes, seed=self.seed * 1000 + self.pastes))
+        out.append(('paste_text', *self._run()))
+
+
+def run_session(index, args, barrier, results):
+    # Worker process: always report back, so the parent never waits on a dead session
+    try:
+        results.put(_session(index, args, barrier))
+    except Exception as e:
+        barrier.abort()  # release sessions still waiting to start
+        results.put({'session': index, 'failed': f"{type(e).__name__}: {e}"})
+
+
+def _session(index, args, barrier):
+    # Warm up, wait for every session, then act until done
+    logging.disable(logging.WARNING)  # per-rerun app warnings would drown the report
+    rss_start = _rss_mb()
+    session = Session(args['seed'] + index, args['paste_bytes'])
+    first_ms, ok = session.start()
+    rss_warm = _rss_mb()
+    barrier.wait()
+    records, t0 = [], time.perf_counter()
+    actions, weights = zip(*ACTION_MIX.items())
+    while len(records) < args['actions'] and time.perf_counter() - t0 < args['duration']:
+        getattr(session, session.rng.choices(actions, weights)[0])(records)
+    return {
+        'session': index, 'first_run_ms': first_ms, 'first_run_ok': ok, 'records': records,
+        'elapsed': time.perf_counter() - t0,
+        'rss_start_mb': rss_start, 'rss_warm_mb': rss_warm, 'rss_end_mb': _rss_mb(),
+        'rss_peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def load_test(sessions, actions=20, duration=60.0, paste_kb=256, seed=0):
+    ctx = mp.get_context('spawn')
+    barrier = ctx.Barrier(sessions)
+    results = ctx.Queue()
+    args = {'actions': actions, 'duration': duration, 'paste_bytes': paste_kb * 1024, 'seed': seed}
+    procs = [ctx.Process(target=run_session, args=(i, args, barrier, results), daemon=True)
+             for i in range(sessions)]
+    for p in procs:
+        p.start()
+    # Drain the queue before join(): a child blocks on exit until its result is read
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return summarize(out)
+
+
+def summarize(sessions):
+    failed = [s for s in sessions if 'failed' in s]
+    sessions = [s for s in sessions if 'failed' not in s]
+    if not sessions:
+        raise RuntimeError(f"All sessions failed: {failed[0]['failed']}")
+    records = [r for s in sessions for r in s['records']]
+    wall = max((s['elapsed'] for s in sessions), default=0.0)
+    by_action = {}
+    for action in list(ACTION_MIX) + ['all']:
+        ms = np.array([r[1] for r in records if action == 'all' or r[0] == action])
+        if not len(ms):
+            continue
+        stats = {f'p{p}': float(v) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))}
+        stats.update(count=int(len(ms)), mean=float(ms.mean()), max=float(ms.max()))
+        by_action[action] = stats
+    mean = lambda key: float(np.mean([s[key] for s in sessions]))
+    return {
+        'sessions': len(sessions),
+        'failed_sessions': [s['failed'] for s in failed],
+        'reruns': len(records),
+        'errors': sum(1 for r in records if not r[2]) + sum(1 for s in sessions if not s['first_run_ok']),
+        'wall_s': wall,
+        'throughput_rps': len(records) / wall if wall else 0.0,
+        'latency_ms': by_action,
+        'first_run_ms': mean('first_run_ms'),
+        # Each session is a whole process here: warm RSS includes the interpreter and
+        # Streamlit itself; growth is what the session's reruns added on top.
+        'rss_warm_mb': mean('rss_warm_mb'),
+        'rss_growth_mb': float(np.mean([s['rss_end_mb'] - s['rss_warm_mb'] for s in sessions])),
+        'rss_peak_mb': max(s['rss_peak_mb'] for s in sessions),
+    }
+
+
+def print_report(res):
+    print(f"\n{res['sessions']} sessions: {res['reruns']:,} reruns in {res['wall_s']:.1f}s "
+          f"= {res['throughput_rps']:.1f} reruns/s, {res['errors']} errors")
+    for reason in res['failed_sessions']:
+        print(f"  session failed: {reason}")
+    print(f"  {'action':<12} {'count':>6} " + ' '.join(f"{'p' + str(p):>8}" for p in PERCENTILES) + f" {'max':>8}  (ms)")
+    for action, st in res['latency_ms'].items():
+        print(f"  {action:<12} {st['count']:>6} " + ' '.join(f"{st['p' + str(p)]:>8.0f}" for p in PERCENTILES)
+              + f" {st['max']:>8.0f}")
+    print(f"  memory per session: {res['rss_warm_mb']:.0f} MB after first run, "
+          f"+{res['rss_growth_mb']:.0f} MB during the test (peak {res['rss_peak_mb']:.0f} MB); "
+          f"first run {res['first_run_ms']:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forensic Omniscient: concurrent-session load test")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[4], help="concurrent sessions (several: sweep)")
+    parser.add_argument('--actions', type=int, default=20, help="max reruns per session")
+    parser.add_argument('--duration', type=float, default=60.0, help="max seconds per session")
+    parser.add_argument('--paste-kb', type=int, default=256, help="size of each pasted text")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results here")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n in args.sessions:
+        print(f"Running {n} concurrent session(s)...", file=sys.stderr)
+        res = load_test(n, args.actions, args.duration, args.paste_kb, args.seed)
+        print_report(res)
+        results.append(res)
+    if len(results) > 1:
+        print(f"\n{'sessions':>8} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for r in results:
+            st = r['latency_ms'].get('all', {})
+            print(f"{r['sessions']:>8} {r['throughput_rps']:>9.1f} {st.get('p50', 0):>8.0f} "
+                  f"{st.get('p95', 0):>8.0f} {st.get('p99', 0):>8.0f}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+from scoring import INPUT_FIELDS, z_combine, m_combine, verdict_codes
+from utils import safe_div
+
+# --- INCREMENTAL METRIC GRAPH ---
+# The financial metrics as a declared dependency graph:
+#   inputs -> A..E, DSRI, SGI, CFO/NI -> Z, M -> verdict
+# update() recomputes only nodes downstream of inputs that actually changed, and
+# stops propagating where a recomputed value comes out unchanged. Every node
+# carries a version number, so UI components built with view() are only rebuilt
+# when a node they read has moved.
+
+# name -> (dependencies, function of those dependencies), in evaluation order
+NODES = {
+    'A': (('ca', 'cl', 'ta'), lambda ca, cl, ta: safe_div(ca - cl, ta)),
+    'B': (('re', 'ta'), lambda re, ta: safe_div(re, ta)),
+    'C': (('rev_cy', 'cogs', 'ta'), lambda rev_cy, cogs, ta: safe_div(rev_cy - cogs, ta)),
+    'D': (('mve', 'tl'), lambda mve, tl: safe_div(mve, tl)),
+    'E': (('rev_cy', 'ta'), lambda rev_cy, ta: safe_div(rev_cy, ta)),
+    'z_score': (('A', 'B', 'C', 'D', 'E'), z_combine),
+    'dsri': (('rec_cy', 'rev_cy', 'rec_py', 'rev_py'),
+             lambda rec_cy, rev_cy, rec_py, rev_py: safe_div(safe_div(rec_cy, rev_cy), safe_div(rec_py, rev_py))),
+    'sgi': (('rev_cy', 'rev_py'), lambda rev_cy, rev_py: safe_div(rev_cy, rev_py)),
+    'm_score': (('dsri', 'sgi'), m_combine),
+    'q_ratio': (('cfo', 'ni'), lambda cfo, ni: safe_div(cfo, ni)),
+    'verdict': (('z_score', 'm_score', 'q_ratio'), lambda z, m, q: int(verdict_codes(z, m, q))),
+}
+
+
+def _topological(nodes, inputs):
+    order, seen = [], set(inputs)
+    pending = dict(nodes)
+    while pending:
+        ready = [n for n, (deps, _) in pending.items() if all(d in seen for d in deps)]
+        if not ready:
+            raise ValueError(f"Unresolvable metric dependencies: {', '.join(pending)}")
+        for n in ready:
+            order.append(n)
+            seen.add(n)
+            del pending[n]
+    return order
+
+
+def _same(a, b):
+    return a == b or (a != a and b != b)  # NaN == NaN here
+
+
+class MetricGraph:
+    def __init__(self, nodes=NODES, inputs=INPUT_FIELDS):
+        self.nodes = nodes
+        self.inputs = list(inputs)
+        self.order = _topological(nodes, self.inputs)
+        self.values = {}
+        self.version = {}
+        self.recomputed = []   # nodes evaluated by the last update()
+        self._views = {}
+
+    def update(self, inputs):
+        # Returns the set of nodes (inputs included) whose value changed
+        changed = set()
+        for k in self.inputs:
+            v = inputs[k]
+            if k not in self.values or not _same(self.values[k], v):
+                self._set(k, v)
+                changed.add(k)
+        self.recomputed = []
+        for name in self.order:
+            deps, fn = self.nodes[name]
+            if name in self.values and not changed.intersection(deps):
+                continue
+            val = fn(*(self.values[d] for d in deps))
+            self.recomputed.append(name)
+            if name not in self.values or not _same(self.values[name], val):
+                self._set(name, val)
+                changed.add(name)
+        return changed
+
+    def _set(self, name, value):
+        self.values[name] = value
+        self.version[name] = self.version.get(name, 0) + 1
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def view(self, key, deps, build, extra=()):
+        # Memoized UI component: build() reruns only when a node in deps (or `extra`) changed
+        stamp = (tuple(self.version[d] for d in deps), extra)
+        hit = self._views.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        out = build()
+        self._views[key] = (stamp, out)
+        return out
+
+
+def session_graph(state, key='_metric_graph'):
+    # One graph per Streamlit session (state: st.session_state)
+    if key not in state:
+        state[key] = MetricGraph()
+    return state[key]
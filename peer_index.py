@@ -0,0 +1,112 @@
+import json
+import os
+
+import numpy as np
+
+from scoring import score_frame
+
+# --- PEER-PERCENTILE INDEX ---
+# Built once from ingested company-years: for every sector/year peer group the
+# Z, M and CFO/NI scores are stored as sorted float64 runs in one memory-mapped
+# .npy file per metric. A percentile lookup is then a binary search over the
+# group's slice instead of a scan of the universe.
+#
+#   python peer_index.py screener_export.csv -o .forensic_cache/peer_index
+
+METRICS = ['z_score', 'm_score', 'q_ratio']
+ALL = '*'  # wildcard group: sector across all years, or the whole universe
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.forensic_cache', 'peer_index')
+
+
+def group_key(sector, year):
+    return f'{sector}|{year}'
+
+
+def build_peer_index(batches, out_dir=DEFAULT_DIR):
+    # batches: DataFrames with 'sector', 'year' and either the score columns or the raw inputs
+    # (e.g. utils.parse_screener_csv). Returns the number of company-years indexed.
+    groups = {}
+    for df in batches:
+        if 'sector' not in df.columns or 'year' not in df.columns:
+            raise KeyError("Peer index needs 'sector' and 'year' columns")
+        scores = df if all(m in df.columns for m in METRICS) else df.join(score_frame(df))
+        sectors = scores['sector'].astype(str)
+        years = scores['year'].astype(str).str[:4]
+        values = np.column_stack([scores[m].to_numpy(dtype=np.float64) for m in METRICS])
+        for key, rows in scores.groupby([sectors, years], sort=False).indices.items():
+            groups.setdefault(group_key(*key), []).append(values[rows])
+
+    # Wildcard groups for fallbacks: sector over all years, and the whole universe
+    for key in list(groups):
+        sector = key.split('|', 1)[0]
+        groups.setdefault(group_key(sector, ALL), []).extend(groups[key])
+    groups[group_key(ALL, ALL)] = [v for key, parts in groups.items() if not key.endswith(ALL) for v in parts]
+
+    os.makedirs(out_dir, exist_ok=True)
+    offsets = {m: {} for m in METRICS}
+    runs = {m: [] for m in METRICS}
+    pos = {m: 0 for m in METRICS}
+    for key in sorted(groups):
+        block = np.concatenate(groups[key]) if groups[key] else np.empty((0, len(METRICS)))
+        for j, m in enumerate(METRICS):
+            col = np.sort(block[:, j][~np.isnan(block[:, j])])
+            offsets[m][key] = [pos[m], pos[m] + len(col)]
+            runs[m].append(col)
+            pos[m] += len(col)
+    for m in METRICS:
+        np.save(os.path.join(out_dir, f'{m}.npy'), np.concatenate(runs[m]) if runs[m] else np.empty(0))
+    with open(os.path.join(out_dir, 'groups.json'), 'w') as fh:
+        json.dump(offsets, fh)
+    return sum(len(v) for v in groups[group_key(ALL, ALL)])
+
+
+class PeerIndex:
+    def __init__(self, path=DEFAULT_DIR):
+        with open(os.path.join(path, 'groups.json')) as fh:
+            self.offsets = json.load(fh)
+        self.values = {m: np.load(os.path.join(path, f'{m}.npy'), mmap_mode='r') for m in METRICS}
+
+    def sectors(self):
+        return sorted({k.split('|', 1)[0] for k in self.offsets[METRICS[0]]} - {ALL})
+
+    def years(self, sector):
+        return sorted(k.split('|', 1)[1] for k in self.offsets[METRICS[0]]
+                      if k.startswith(f'{sector}|') and not k.endswith(f'|{ALL}'))
+
+    def peers(self, metric, sector, year):
+        # Sorted peer values, falling back to the sector's all-years group, then the universe.
+        # Returns (values, group_key_used).
+        for key in (group_key(sector, year), group_key(sector, ALL), group_key(ALL, ALL)):
+            span = self.offsets[metric].get(key)
+            if span and span[1] > span[0]:
+                return self.values[metric][span[0]:span[1]], key
+        return self.values[metric][:0], None
+
+    def percentile(self, metric, sector, year, value):
+        # Share of peers scoring at or below `value` (0-100); None without peers
+        vals, _ = self.peers(metric, sector, year)
+        if not len(vals) or np.isnan(value):
+            return None
+        return 100.0 * np.searchsorted(vals, value, side='right') / len(vals)
+
+    def bands(self, metric, sector, year, qs=(25, 50, 75)):
+        vals, _ = self.peers(metric, sector, year)
+        if not len(vals):
+            return None
+        idx = np.clip((np.asarray(qs) / 100.0 * (len(vals) - 1)).round().astype(int), 0, len(vals) - 1)
+        return [float(vals[i]) for i in idx]
+
+    def group_size(self, sector, year):
+        vals, key = self.peers(METRICS[0], sector, year)
+        return len(vals), key
+
+
+if __name__ == '__main__':
+    import argparse
+    from utils import parse_screener_csv
+    parser = argparse.ArgumentParser(description="Build the sector/year peer-percentile index")
+    parser.add_argument('source', help="Screener-style CSV/XLSX export with sector and year columns")
+    parser.add_argument('-o', '--out', default=DEFAULT_DIR)
+    args = parser.parse_args()
+    n = build_peer_index(parse_screener_csv(args.source), args.out)
+    print(f"Indexed {n:,} company-years -> {args.out}")
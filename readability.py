@@ -0,0 +1,121 @@
+import codecs
+import os
+import re
+from syllables import is_complex_word
+
+# --- STREAMING READABILITY ENGINE ---
+# Gunning Fog over text of any length: counters are updated chunk by chunk,
+# so memory stays constant regardless of document size.
+
+WORD_RE = re.compile(r'\w+')
+SENTENCE_END_RE = re.compile(r'[.!?]+')
+_WORD_CHAR_RE = re.compile(r'\w')
+_TERMINATORS = '.!?'
+
+CHUNK_SIZE = 1 << 16
+
+
+def fog_from_counts(num_words, sentences, complex_words):
+    # Gunning Fog Formula; complex words = 3+ syllables (see syllables.py)
+    num_words = num_words or 1
+    sentences = max(sentences, 1)
+    return 0.4 * ((num_words / sentences) + 100 * (complex_words / num_words))
+
+
+class FogCounter:
+    # Incremental word / sentence / complex-word counter. feed() text in any
+    # chunking; tokens split across chunk boundaries are carried over.
+
+    def __init__(self):
+        self.words = 0
+        self.sentence_ends = 0
+        self.complex_words = 0
+        self._carry = ''
+
+    def _count(self, text):
+        words = WORD_RE.findall(text)
+        self.words += len(words)
+        self.complex_words += sum(map(is_complex_word, words))
+        self.sentence_ends += len(SENTENCE_END_RE.findall(text))
+
+    def feed(self, chunk):
+        text = self._carry + chunk if self._carry else chunk
+        # Hold back a trailing word or terminator run: it may continue in the next chunk
+        cut = len(text)
+        if cut:
+            if text[-1] in _TERMINATORS:
+                in_tail = _TERMINATORS.__contains__
+            elif _WORD_CHAR_RE.match(text[-1]):
+                in_tail = _WORD_CHAR_RE.match
+            else:
+                in_tail = None
+            while in_tail is not None and cut and in_tail(text[cut - 1]):
+                cut -= 1
+        self._carry = text[cut:]
+        self._count(text[:cut])
+        return self
+
+    def close(self):
+        if self._carry:
+            self._count(self._carry)
+            self._carry = ''
+        return self
+
+    def result(self):
+        self.close()
+        # re.split(r'[.!?]+') yields one more piece than there are terminator runs
+        sentences = max(self.sentence_ends, 1)
+        return {
+            'words': self.words,
+            'sentences': sentences,
+            'complex_words': self.complex_words,
+            'complex_ratio': self.complex_words / (self.words or 1),
+            'fog': fog_from_counts(self.words, sentences, self.complex_words),
+        }
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    # str, pathlib.Path to a UTF-8 text file, a (text or binary) file-like object, or an iterable of str
+    if isinstance(source, str):
+        for i in range(0, len(source), chunk_size):
+            yield source[i:i + chunk_size]
+        return
+    if isinstance(source, os.PathLike):
+        with open(source, encoding='utf-8', errors='replace') as fh:
+            yield from iter_chunks(fh, chunk_size)
+        return
+    if not hasattr(source, 'read'):
+        # any other iterable of text pieces (e.g. extracted report pages, see extract.py)
+        for piece in source:
+            yield from iter_chunks(piece, chunk_size)
+        return
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield chunk
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+
+def fog_index(source, chunk_size=CHUNK_SIZE):
+    counter = FogCounter()
+    for chunk in iter_chunks(source, chunk_size):
+        counter.feed(chunk)
+    return counter.result()
+
+
+# Fog verdict thresholds used by the Narrative Decoder
+FOG_OBFUSCATED, FOG_COMPLEX = 18, 14
+
+
+def fog_verdict(fog):
+    if fog > FOG_OBFUSCATED:
+        return "OBFUSCATED"
+    if fog > FOG_COMPLEX:
+        return "COMPLEX"
+    return "CLEAR"
@@ -0,0 +1,193 @@
+import plotly.graph_objects as go
+from scoring import VERDICTS
+
+# --- REPORT BLOCKS ---
+# The score cards, verdict / breakdown HTML and the radar and Fog gauge figures,
+# free of Streamlit: the views cache them per session (views_financial.py,
+# views_narrative.py) and the portfolio export renders them in plain worker
+# processes (export.py).
+
+# --- FIGURES ---
+
+def radar_point(z_score, m_score, q_ratio):
+    # Normalize (0-100 scale)
+    n_z = min(max((z_score/3)*100, 0), 100)
+    n_m = min(max(((-2.0 - m_score)+5)*20, 0), 100) # Inverted
+    n_q = min(max(q_ratio*100, 0), 100)
+    return n_z, n_m, n_q
+
+def build_radar_figure(z_score, m_score, q_ratio, peer_bands=None):
+    # peer_bands: optional ((z, m, q) at P25, P50, P75) of the peer group
+    n_z, n_m, n_q = radar_point(z_score, m_score, q_ratio)
+    
+    # Detailed Radar Chart
+    fig = go.Figure()
+    
+    # Green Safe Zone Overlay
+    fig.add_trace(go.Scatterpolar(
+        r=[100, 100, 100, 100],
+        theta=['Solvency', 'Integrity', 'Quality', 'Solvency'],
+        fill='toself', name='Safe Zone',
+        line=dict(color='rgba(0, 230, 118, 0.2)', width=0),
+        fillcolor='rgba(0, 230, 118, 0.1)'
+    ))
+    
+    # Peer Percentile Band (P25-P75) + Median
+    if peer_bands:
+        p25, p50, p75 = (radar_point(*b) for b in peer_bands)
+        lo = [min(a, b) for a, b in zip(p25, p75)]
+        hi = [max(a, b) for a, b in zip(p25, p75)]
+        theta = ['Solvency', 'Integrity', 'Quality', 'Solvency']
+        fig.add_trace(go.Scatterpolar(r=lo + lo[:1], theta=theta, mode='lines', name='Peers P25',
+                                      line=dict(color='rgba(255, 171, 0, 0.5)', width=1)))
+        fig.add_trace(go.Scatterpolar(r=hi + hi[:1], theta=theta, mode='lines', name='Peers P75',
+                                      fill='tonext', fillcolor='rgba(255, 171, 0, 0.12)',
+                                      line=dict(color='rgba(255, 171, 0, 0.5)', width=1)))
+        fig.add_trace(go.Scatterpolar(r=list(p50) + [p50[0]], theta=theta, mode='lines', name='Peer Median',
+                                      line=dict(color='#ffab00', width=1, dash='dash')))
+
+    # The Data Line
+    fig.add_trace(go.Scatterpolar(
+        r=[n_z, n_m, n_q, n_z],
+        theta=['Solvency', 'Integrity', 'Quality', 'Solvency'],
+        fill='toself', name='Target Co',
+        line=dict(color='#00e5ff', width=3),
+        fillcolor='rgba(0, 229, 255, 0.2)'
+    ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100], gridcolor='#333', tickfont=dict(color='gray')),
+            angularaxis=dict(gridcolor='#333', tickfont=dict(size=14, color='white')),
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        paper_bgcolor='rgba(0,0,0,0)',
+        height=350,
+        showlegend=False,
+        margin=dict(l=40, r=40, t=20, b=20)
+    )
+    return fig
+
+def fog_gauge(fog):
+    # Fog Index Gauge - FIXED VISIBILITY
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number", value = fog,
+        title = {'text': "Fog Index (Complexity)", 'font': {'size': 24, 'color': 'white'}}, # FORCE WHITE
+        number = {'font': {'size': 40, 'color': 'white'}}, # FORCE WHITE
+        gauge = {
+            'axis': {'range': [0, 30], 'tickwidth': 1, 'tickcolor': "white"},
+            'bar': {'color': "#ff5252" if fog > 18 else "#00e5ff"},
+            'bgcolor': "rgba(0,0,0,0)",
+            'steps': [
+                {'range': [0, 14], 'color': "#1e2530"},
+                {'range': [14, 18], 'color': "#2d333b"},
+                {'range': [18, 30], 'color': "#3d0000"}
+            ],
+            'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': 18}
+        }
+    ))
+    fig.update_layout(height=250, margin=dict(t=50, b=10, l=20, r=20), paper_bgcolor='rgba(0,0,0,0)', font={'color': "white"})
+    return fig
+
+# --- HTML BLOCKS ---
+# Score card / breakdown styles (also embedded in exported report cards)
+CARD_CSS = """
+    <style>
+        /* Increase global font size */
+        p, .stMarkdown, li, div {
+            font-size: 18px !important;
+        }
+        
+        /* Custom Score Cards */
+        .score-card {
+            background: linear-gradient(145deg, #161b22, #0d1117);
+            padding: 20px;
+            border-radius: 10px;
+            border: 1px solid #333;
+            text-align: center;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
+            margin-bottom: 10px;
+        }
+        .score-val {
+            font-size: 36px !important;
+            font-weight: 700;
+            margin: 10px 0;
+            text-shadow: 0 0 10px rgba(255,255,255,0.1);
+        }
+        .score-label {
+            font-size: 16px !important;
+            color: #8b949e;
+            text-transform: uppercase;
+            letter-spacing: 1px;
+        }
+        
+        /* Status Colors */
+        .safe {color: #00e676; border-bottom: 3px solid #00e676;}
+        .risk {color: #ff5252; border-bottom: 3px solid #ff5252;}
+        .warn {color: #ffab00; border-bottom: 3px solid #ffab00;}
+        
+        /* Table/Grid styling */
+        .metric-row {
+            display: flex; justify-content: space-between;
+            padding: 12px 0;
+            border-bottom: 1px solid #333;
+            font-size: 16px !important;
+        }
+        .metric-row:last-child {border-bottom: none;}
+    </style>
+    """
+
+# Helper to generate HTML card (Corrected Indentation)
+def make_card(label, val, status, threshold_text):
+    color_class = "safe" if status == "Safe" else ("risk" if status == "Risk" else "warn")
+    val_color = '#00e676' if status=='Safe' else '#ff5252'
+    
+    return f"""
+<div class="score-card {color_class}">
+<div class="score-label">{label}</div>
+<div class="score-val" style="color: {val_color}">{val}</div>
+<div style="font-size:14px; opacity:0.8;">{threshold_text}</div>
+</div>
+"""
+
+def verdict_html(verdict):
+    # Logic Tree (evaluated in scoring.verdict_codes)
+    title, color, msg = VERDICTS[verdict]
+    return f"""
+<div style="background-color: #1e2530; border-left: 5px solid {color}; padding: 20px; border-radius: 5px;">
+<h2 style="color:{color}; margin:0; font-size: 28px;">{title}</h2>
+<p style="margin-top:10px; font-size: 18px;">{msg}</p>
+</div>
+"""
+
+def z_breakdown_html(A, B, C, D, E):
+    return f"""
+<div style="background-color: #0d1117; padding: 15px; border-radius: 8px;">
+<div class="metric-row"><span>Liquidity (A)</span> <span style="color:#00e5ff">{A:.2f}</span></div>
+<div class="metric-row"><span>Retained Earnings (B)</span> <span style="color:#00e5ff">{B:.2f}</span></div>
+<div class="metric-row"><span>Op. Efficiency (C)</span> <span style="color:#00e5ff">{C:.2f}</span></div>
+<div class="metric-row"><span>Market Leverage (D)</span> <span style="color:#00e5ff">{D:.2f}</span></div>
+<div class="metric-row"><span>Asset Turnover (E)</span> <span style="color:#00e5ff">{E:.2f}</span></div>
+</div>
+"""
+
+def m_breakdown_html(dsri, sgi):
+    # Check colors
+    dsri_col = '#ff5252' if dsri > 1.1 else '#00e5ff'
+    sgi_col = '#ff5252' if sgi > 1.2 else '#00e5ff'
+    
+    return f"""
+<div style="background-color: #0d1117; padding: 15px; border-radius: 8px;">
+<div class="metric-row">
+<span>DSRI (Receivables Growth)</span> 
+<span style="color:{dsri_col}">{dsri:.2f}x</span>
+</div>
+<div style="font-size:14px; color:gray; margin-bottom:10px;">*If > 1.0, receivables growing faster than sales.*</div>
+
+<div class="metric-row">
+<span>SGI (Sales Growth)</span> 
+<span style="color:{sgi_col}">{sgi:.2f}x</span>
+</div>
+<div style="font-size:14px; color:gray;">*If > 1.2, pressure to manipulate increases.*</div>
+</div>
+"""
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from functools import lru_cache
+
+from analysis import ANALYSIS_VERSION, analyze_narrative
+from lexicon import DEFAULT_LEXICONS, lexicon_fingerprint
+from readability import iter_chunks
+
+# --- PERSISTENT NARRATIVE RESULT STORE ---
+# Content-addressed SQLite cache of narrative analyses (Fog metrics, lexicon hit
+# counts, X-Ray match offsets). Key = hash of the whitespace-normalized text +
+# lexicon fingerprint + ANALYSIS_VERSION, so the same report pasted again (by
+# anyone) is a single indexed lookup. Least-recently-used rows are evicted once
+# the stored payloads exceed max_bytes. X-Ray match offsets index into the text
+# itself, so they are stored under the exact text instead (exact_key).
+
+DEFAULT_PATH = os.environ.get('FO_RESULT_STORE') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.forensic_cache', 'narrative.sqlite')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _normalized_pieces(chunks):
+    # Collapse every whitespace run to one space (across chunk boundaries) and trim the
+    # ends: whitespace never changes words, sentences or lexicon hits.
+    started = pending_space = False
+    for chunk in chunks:
+        words = chunk.split()
+        if not words:
+            pending_space = pending_space or bool(chunk)
+            continue
+        if started and (pending_space or chunk[0].isspace()):
+            yield ' '
+        yield ' '.join(words)
+        started = True
+        pending_space = chunk[-1].isspace()
+
+
+def content_key(source, lexicons=DEFAULT_LEXICONS):
+    # source: str, Path or file-like (hashed in a streamed pass)
+    h = hashlib.sha256()
+    h.update(f'{ANALYSIS_VERSION}|{lexicon_fingerprint(lexicons)}|'.encode())
+    for piece in _normalized_pieces(iter_chunks(source)):
+        h.update(piece.encode('utf-8'))
+    return h.hexdigest()
+
+
+def exact_key(text, lexicons=DEFAULT_LEXICONS):
+    # For results holding character offsets (X-Ray matches): whitespace moves them, so the
+    # exact text is hashed, never the normalized one
+    h = hashlib.sha256()
+    h.update(f'{ANALYSIS_VERSION}|{lexicon_fingerprint(lexicons)}|exact|'.encode())
+    h.update(text.encode('utf-8'))
+    return h.hexdigest()
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''CREATE TABLE IF NOT EXISTS results (
+                              key TEXT PRIMARY KEY,
+                              payload BLOB NOT NULL,
+                              size INTEGER NOT NULL,
+                              accessed REAL NOT NULL)''')
+            db.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: safe across Streamlit session threads
+        # and worker processes (WAL + busy timeout handle concurrent writers).
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key):
+        with self._connect() as db:
+            row = db.execute('SELECT payload FROM results WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key, payload):
+        blob = zlib.compress(json.dumps(payload).encode('utf-8'))
+        if len(blob) > self.max_bytes:
+            return
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO results (key, payload, size, accessed) VALUES (?, ?, ?, ?)',
+                       (key, blob, len(blob), time.time()))
+            self._evict(db)
+
+    def update(self, key, **fields):
+        # Merge fields into an existing entry (e.g. add X-Ray matches to an exact_key row)
+        payload = self.get(key) or {}
+        payload.update(fields)
+        self.put(key, payload)
+
+    def _evict(self, db):
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least-recently-used rows down to 90% of the cap, so eviction isn't run on every put
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in db.execute('SELECT key, size FROM results ORDER BY accessed'):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        db.executemany('DELETE FROM results WHERE key = ?', victims)
+
+    def stats(self):
+        with self._connect() as db:
+            n, total = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+        return {'entries': n, 'bytes': total, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        with self._connect() as db:
+            db.execute('DELETE FROM results')
+
+
+@lru_cache(maxsize=1)
+def default_store():
+    # None when the cache location is unusable (read-only disk, ...): callers just compute
+    try:
+        return ResultStore()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def cached_analysis(source, lexicons=DEFAULT_LEXICONS, store=None):
+    # Batch path: narrative metrics for a str/Path, served from the store when possible
+    store = store or default_store()
+    if store is None:
+        return analyze_narrative(source, lexicons)
+    key = content_key(source, lexicons)
+    res = store.get(key)
+    if res is not None and 'metrics' in res:
+        return res['metrics']
+    metrics = analyze_narrative(source, lexicons)
+    store.put(key, {**(res or {}), 'metrics': metrics})
+    return metrics
@@ -0,0 +1,128 @@
+import numpy as np
+from utils import safe_div_array
+
+# --- FORENSIC SCORING ENGINE ---
+# UI-independent, vectorized Altman Z / Beneish M / CFO-NI math.
+# Every function accepts scalars or equal-length arrays (one element per company-year).
+
+# Input columns (same fields & units as the Financial Analysis sidebar, ₹ Cr)
+INPUT_FIELDS = ['rev_cy', 'rev_py', 'cogs', 'ni', 'ta', 'tl', 'ca', 'cl',
+                'rec_cy', 'rec_py', 're', 'mve', 'cfo']
+
+# Preloaded sample company shown in the sidebar
+DEFAULT_INPUTS = {
+    'rev_cy': 162990.0, 'rev_py': 153670.0, 'cogs': 123754.0, 'ni': 26713.0,
+    'ta': 147795.0, 'tl': 51977.0, 'ca': 95000.0, 'cl': 43750.0,
+    'rec_cy': 31158.0, 'rec_py': 30193.0, 're': 93745.0, 'mve': 667000.0,
+    'cfo': 35694.0,
+}
+
+# Thresholds used by the score cards and the verdict tree
+Z_SAFE, Z_DISTRESS = 3.0, 1.8
+M_THRESHOLD = -2.22
+Q_SAFE, Q_WARN = 1.0, 0.8
+
+# Verdict tree, in priority order: (title, color, message)
+VERDICTS = [
+    ("CRITICAL RISK", "#ff5252", "Company is mathematically insolvent."),
+    ("HIGH FRAUD RISK", "#ff5252", "Earnings manipulation markers detected."),
+    ("QUALITY WARNING", "#ffab00", "Profits are not backed by cash flow."),
+    ("LOW RISK", "#00e676", "Financial structure appears robust and honest."),
+]
+VERDICT_LABELS = [v[0] for v in VERDICTS]
+
+# Output columns produced by score_arrays / score_frame
+COMPONENT_FIELDS = ['A', 'B', 'C', 'D', 'E', 'z_score', 'dsri', 'sgi', 'm_score', 'q_ratio']
+
+
+def z_components(ca, cl, re, rev_cy, cogs, mve, ta, tl):
+    ebit = np.subtract(rev_cy, cogs, dtype=np.float64)
+    wc = np.subtract(ca, cl, dtype=np.float64)
+    A = safe_div_array(wc, ta)
+    B = safe_div_array(re, ta)
+    C = safe_div_array(ebit, ta)
+    D = safe_div_array(mve, tl)
+    E = safe_div_array(rev_cy, ta)
+    return A, B, C, D, E, z_combine(A, B, C, D, E)
+
+
+def z_combine(A, B, C, D, E):
+    return (1.2*A) + (1.4*B) + (3.3*C) + (0.6*D) + (1.0*E)
+
+
+def m_components(rec_cy, rec_py, rev_cy, rev_py):
+    dsri = safe_div_array(safe_div_array(rec_cy, rev_cy), safe_div_array(rec_py, rev_py))
+    sgi = safe_div_array(rev_cy, rev_py)
+    return dsri, sgi, m_combine(dsri, sgi)
+
+
+def m_combine(dsri, sgi):
+    return -4.84 + (0.92 * dsri) + (0.71 * sgi)
+
+
+def verdict_codes(z_score, m_score, q_ratio):
+    # Vectorized logic tree -> index into VERDICTS (first matching rule wins);
+    # -1 where any score is NaN (incomplete inputs)
+    z_score, m_score, q_ratio = np.broadcast_arrays(z_score, m_score, q_ratio)
+    missing = np.isnan(z_score) | np.isnan(m_score) | np.isnan(q_ratio)
+    return np.select(
+        [missing, z_score < Z_DISTRESS, m_score > M_THRESHOLD, q_ratio < Q_WARN],
+        [-1, 0, 1, 2],
+        default=3,
+    ).astype(np.int8)
+
+
+def z_status(z_score):
+    return np.where(z_score > Z_SAFE, "Safe", np.where(z_score < Z_DISTRESS, "Risk", "Warn"))
+
+
+def m_status(m_score):
+    return np.where(m_score < M_THRESHOLD, "Safe", "Risk")
+
+
+def q_status(q_ratio):
+    return np.where(q_ratio > Q_SAFE, "Safe", np.where(q_ratio < Q_WARN, "Risk", "Warn"))
+
+
+def score_arrays(rev_cy, rev_py, cogs, ni, ta, tl, ca, cl, rec_cy, rec_py, re, mve, cfo):
+    A, B, C, D, E, z_score = z_components(ca, cl, re, rev_cy, cogs, mve, ta, tl)
+    dsri, sgi, m_score = m_components(rec_cy, rec_py, rev_cy, rev_py)
+    q_ratio = safe_div_array(cfo, ni)
+    return {
+        'A': A, 'B': B, 'C': C, 'D': D, 'E': E, 'z_score': z_score,
+        'dsri': dsri, 'sgi': sgi, 'm_score': m_score,
+        'q_ratio': q_ratio,
+        'verdict_code': verdict_codes(z_score, m_score, q_ratio),
+    }
+
+
+def score_frame(df):
+    # Score a whole portfolio: one row per company-year, columns named as INPUT_FIELDS
+    import pandas as pd
+    missing = [f for f in INPUT_FIELDS if f not in df.columns]
+    if missing:
+        raise KeyError(f"Missing input columns: {', '.join(missing)}")
+
+    cols = {f: df[f].to_numpy(dtype=np.float64, na_value=np.nan) for f in INPUT_FIELDS}
+    res = score_arrays(**cols)
+    codes = res.pop('verdict_code')
+    out = pd.DataFrame(res, index=df.index)
+    out['verdict'] = pd.Categorical.from_codes(codes, categories=VERDICT_LABELS)
+    return out
+
+
+def score_company(**inputs):
+    # Single-company case used by the Streamlit view; returns plain floats
+    vals = dict(DEFAULT_INPUTS)
+    vals.update(inputs)
+    res = score_arrays(**{f: vals[f] for f in INPUT_FIELDS})
+    out = {k: float(v) for k, v in res.items() if k != 'verdict_code'}
+    out['verdict'] = int(res['verdict_code'])
+    return out
+
+
+def score_stream(batches):
+    # Score ingested batches as they arrive (e.g. utils.parse_screener_csv);
+    # rows with missing inputs come back as NaN scores rather than being dropped.
+    for batch in batches:
+        yield batch.join(score_frame(batch))
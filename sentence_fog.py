@@ -0,0 +1,104 @@
+import re
+
+import numpy as np
+
+from readability import SENTENCE_END_RE, FOG_OBFUSCATED
+from syllables import count_syllables, is_complex_word
+
+# --- SENTENCE-LEVEL FOG ---
+# Which sentences make a report foggy. The text is tokenized once into words and
+# terminator runs; each distinct token is classified once (syllables, complex
+# word, terminator), and the per-word facts are kept as compact NumPy arrays
+# indexed by sentence. Per-sentence and rolling-window Fog are then bincount /
+# cumulative-sum array ops.
+
+TOKEN_RE = re.compile(r'\w+|[.!?]+')
+DEFAULT_WINDOW = 5  # sentences per rolling window
+
+
+class SentenceProfile:
+    def __init__(self, text):
+        import pandas as pd
+        self.text = text
+        tokens = TOKEN_RE.findall(text)
+        codes, uniques = pd.factorize(pd.Series(tokens, dtype=object), sort=False)
+        uniques = list(uniques)
+        u_term = np.array([u[0] in '.!?' for u in uniques], dtype=bool)
+        u_syll = np.array([0 if t else min(count_syllables(u), 255) for u, t in zip(uniques, u_term)], dtype=np.uint8)
+        u_complex = np.array([not t and is_complex_word(u) for u, t in zip(uniques, u_term)], dtype=bool)
+        u_len = np.array([min(len(u), 65535) for u in uniques], dtype=np.uint16)
+
+        is_term = u_term[codes] if len(codes) else np.zeros(0, dtype=bool)
+        # sentence index of a word = terminator runs before it
+        sid = np.cumsum(is_term, dtype=np.int32)[~is_term]
+        wcodes = codes[~is_term]
+        n_raw = int(is_term.sum()) + 1
+
+        # Character spans of the raw sentences (same terminator rule as the tokenizer)
+        ends = np.fromiter((m.end() for m in SENTENCE_END_RE.finditer(text)), dtype=np.int64)
+        starts = np.concatenate([[0], ends])
+        ends = np.concatenate([ends, [len(text)]])
+        words = np.bincount(sid, minlength=n_raw).astype(np.int32)
+        complex_words = np.bincount(sid, weights=u_complex[wcodes], minlength=n_raw).astype(np.int32)
+
+        # Keep sentences that contain words; renumber word -> sentence to match
+        keep = words > 0
+        renumber = np.cumsum(keep, dtype=np.int32) - 1
+        self.sentence_start = starts[keep]
+        self.sentence_end = ends[keep]
+        self.sentence_words = words[keep]
+        self.sentence_complex = complex_words[keep]
+        self.word_sentence = renumber[sid]
+        self.word_len = u_len[wcodes]
+        self.word_syllables = u_syll[wcodes]
+        self.word_complex = u_complex[wcodes]
+        # One-sentence Gunning Fog: 0.4 * (words + 100 * complex / words)
+        w = np.maximum(self.sentence_words, 1)
+        self.fog = (0.4 * (self.sentence_words + 100.0 * self.sentence_complex / w)).astype(np.float32)
+
+    def __len__(self):
+        return len(self.sentence_words)
+
+    def rolling_fog(self, window=DEFAULT_WINDOW):
+        # Fog of each run of `window` sentences ending at each sentence (shorter at the start)
+        cw = np.concatenate([[0], np.cumsum(self.sentence_words, dtype=np.int64)])
+        cc = np.concatenate([[0], np.cumsum(self.sentence_complex, dtype=np.int64)])
+        hi = np.arange(1, len(self) + 1)
+        lo = np.maximum(hi - window, 0)
+        w = cw[hi] - cw[lo]
+        return (0.4 * (w / (hi - lo) + 100.0 * (cc[hi] - cc[lo]) / np.maximum(w, 1))).astype(np.float32)
+
+    def sentence_text(self, i, max_chars=None):
+        s = ' '.join(self.text[self.sentence_start[i]:self.sentence_end[i]].split())
+        return s if max_chars is None or len(s) <= max_chars else s[:max_chars - 1] + '…'
+
+    def worst(self, n=5, min_words=5):
+        # Indices of the n foggiest sentences (ignoring fragments shorter than min_words)
+        fog = np.where(self.sentence_words >= min_words, self.fog, -np.inf)
+        n = min(n, int(np.isfinite(fog).sum()))
+        if n <= 0:
+            return []
+        top = np.argpartition(-fog, n - 1)[:n]
+        return top[np.argsort(-fog[top])].tolist()
+
+    def obfuscated_share(self):
+        # Share of words sitting in sentences above the document-level OBFUSCATED threshold
+        total = self.sentence_words.sum()
+        return float(self.sentence_words[self.fog > FOG_OBFUSCATED].sum() / total) if total else 0.0
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Time the sentence-level Fog profile on synthetic text")
+    parser.add_argument('--mb', type=float, default=2.0, help="synthetic text size in MB")
+    args = parser.parse_args()
+    from benchmarks import make_text
+    text = make_text(int(args.mb * (1 << 20)))
+    t0 = time.perf_counter()
+    profile = SentenceProfile(text)
+    t1 = time.perf_counter()
+    profile.rolling_fog()
+    t2 = time.perf_counter()
+    print(f"{len(profile):,} sentences, {len(profile.word_sentence):,} words: "
+          f"profile {(t1 - t0) * 1000:.0f} ms, rolling {(t2 - t1) * 1000:.1f} ms")
@@ -0,0 +1,260 @@
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+
+from readability import WORD_RE
+
+# --- BOILERPLATE / COPY-PASTE DETECTION ---
+# Prior filings are cut into passages (paragraphs, long ones split into word
+# windows). Each passage is shingled into word 5-grams and reduced to a MinHash
+# signature; signatures are banded into a locality-sensitive-hashing index in
+# SQLite. A new report's passages look up only their own band buckets, so the
+# cost grows with the number of near-duplicates, not the size of the library.
+#
+#   python similarity.py add filings/ --pattern "*.txt"
+#   python similarity.py query new_report.txt
+
+DEFAULT_PATH = os.environ.get('FO_SIMILARITY_INDEX') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.forensic_cache', 'similarity.sqlite')
+
+SHINGLE = 5            # words per shingle
+PASSAGE_WORDS = 80     # long paragraphs are split into windows of this many words
+MIN_PASSAGE_WORDS = 15
+NUM_PERM = 64
+BANDS, ROWS = 16, 4    # BANDS * ROWS == NUM_PERM; candidate threshold ~ (1/16)^(1/4) = 0.5
+MATCH_THRESHOLD = 0.5  # estimated Jaccard for a passage to count as recycled
+SHINGLE_BATCH = 200_000
+PARAGRAPH_RE = re.compile(r'\n[ \t\r]*\n')
+
+_rng = np.random.default_rng(0x5eed)
+_PERM_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_MULT = np.uint64(0x100000001b3)
+_BAND_MULT = np.uint64(0x9e3779b97f4a7c15)
+_EMPTY = np.uint64(0xffffffff)
+
+
+@lru_cache(maxsize=200_000)
+def _word_id(word):
+    # Stable 64-bit id per word (process-independent, unlike hash())
+    return int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _token_hashes(words):
+    import pandas as pd
+    codes, uniques = pd.factorize(pd.Series(words, dtype=object), sort=False)
+    ids = np.fromiter(map(_word_id, uniques), dtype=np.uint64, count=len(uniques))
+    return ids[codes]
+
+
+def passages(text):
+    # [(start char, end char, first word, end word)] plus the lowercased words of the text
+    found = list(WORD_RE.finditer(text))
+    words = [m.group().lower() for m in found]
+    if not found:
+        return [], words
+    starts = np.fromiter((m.start() for m in found), dtype=np.int64, count=len(found))
+    ends = np.fromiter((m.end() for m in found), dtype=np.int64, count=len(found))
+    # paragraph of each word = blank lines before it
+    breaks = np.fromiter((m.start() for m in PARAGRAPH_RE.finditer(text)), dtype=np.int64)
+    para = np.searchsorted(breaks, starts)
+    bounds = np.concatenate([[0], np.flatnonzero(para[1:] != para[:-1]) + 1, [len(found)]])
+    out = []
+    for i, j in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        for w0 in range(i, j, PASSAGE_WORDS):
+            w1 = min(w0 + PASSAGE_WORDS, j)
+            if w1 - w0 < MIN_PASSAGE_WORDS and w0 > i:
+                # fold a short tail into the previous window
+                s, _, a, _ = out.pop()
+                out.append((s, int(ends[w1 - 1]), a, w1))
+            elif w1 - w0 >= MIN_PASSAGE_WORDS:
+                out.append((int(starts[w0]), int(ends[w1 - 1]), w0, w1))
+    return out, words
+
+
+def signatures(words, spans):
+    # MinHash signature (NUM_PERM uint32) per passage span [(.., .., w0, w1)]
+    sig = np.full((len(spans), NUM_PERM), _EMPTY, dtype=np.uint64)
+    if not spans:
+        return sig.astype(np.uint32)
+    ids = _token_hashes(words)
+    n = len(ids)
+    # Rolling polynomial hash of every SHINGLE-word window (uint64 arithmetic wraps)
+    sh = np.zeros(max(n - SHINGLE + 1, 0), dtype=np.uint64)
+    for j in range(SHINGLE):
+        sh = sh * _SHINGLE_MULT + ids[j:n - SHINGLE + 1 + j]
+    # Shingles of each passage = windows fully inside it; laid out passage after passage
+    first = np.array([w0 for _, _, w0, _ in spans], dtype=np.int64)
+    counts = np.maximum(np.array([w1 - SHINGLE + 1 for _, _, _, w1 in spans], dtype=np.int64) - first, 0)
+    owner = np.repeat(np.arange(len(spans)), counts)
+    pos = np.arange(counts.sum()) + np.repeat(first - np.concatenate([[0], np.cumsum(counts)[:-1]]), counts)
+    for lo in range(0, len(pos), SHINGLE_BATCH):
+        p_idx = owner[lo:lo + SHINGLE_BATCH]
+        vals = sh[pos[lo:lo + SHINGLE_BATCH]]
+        # multiply-shift hashing: one independent permutation per row
+        h = (_PERM_A[:, None] * vals[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+        seg = np.flatnonzero(np.concatenate([[True], p_idx[1:] != p_idx[:-1]]))
+        mins = np.minimum.reduceat(h, seg, axis=1).T
+        sig[p_idx[seg]] = np.minimum(sig[p_idx[seg]], mins)
+    return sig.astype(np.uint32)
+
+
+def band_keys(sig):
+    # (passages, BANDS) int64 bucket keys
+    v = sig.astype(np.uint64).reshape(len(sig), BANDS, ROWS)
+    key = np.zeros((len(sig), BANDS), dtype=np.uint64)
+    for r in range(ROWS):
+        key = key * _BAND_MULT + v[:, :, r]
+    return key.view(np.int64)
+
+
+def document_key(text):
+    return hashlib.sha256(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+
+class SimilarityIndex:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''CREATE TABLE IF NOT EXISTS docs (
+                              id INTEGER PRIMARY KEY,
+                              name TEXT NOT NULL,
+                              doc_key TEXT UNIQUE NOT NULL,
+                              added REAL NOT NULL)''')
+            db.execute('''CREATE TABLE IF NOT EXISTS passages (
+                              id INTEGER PRIMARY KEY,
+                              doc_id INTEGER NOT NULL,
+                              start INTEGER NOT NULL,
+                              end INTEGER NOT NULL,
+                              sig BLOB NOT NULL)''')
+            db.execute('''CREATE TABLE IF NOT EXISTS lsh (
+                              band INTEGER NOT NULL,
+                              key INTEGER NOT NULL,
+                              passage_id INTEGER NOT NULL,
+                              PRIMARY KEY (band, key, passage_id)) WITHOUT ROWID''')
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def add(self, name, text):
+        # Index a filing; returns the number of passages added (0 if already indexed)
+        key = document_key(text)
+        spans, words = passages(text)
+        sig = signatures(words, spans)
+        keys = band_keys(sig)
+        with self._connect() as db:
+            if db.execute('SELECT 1 FROM docs WHERE doc_key = ?', (key,)).fetchone():
+                return 0
+            doc_id = db.execute('INSERT INTO docs (name, doc_key, added) VALUES (?, ?, ?)',
+                                (name, key, time.time())).lastrowid
+            ids = []
+            for (s, e, _, _), row in zip(spans, sig):
+                ids.append(db.execute('INSERT INTO passages (doc_id, start, end, sig) VALUES (?, ?, ?, ?)',
+                                      (doc_id, s, e, row.tobytes())).lastrowid)
+            db.executemany('INSERT OR IGNORE INTO lsh (band, key, passage_id) VALUES (?, ?, ?)',
+                           ((b, int(keys[i, b]), pid) for i, pid in enumerate(ids) for b in range(BANDS)))
+        return len(spans)
+
+    def query(self, text, threshold=MATCH_THRESHOLD):
+        # Recycled passages of `text`: [(start, end, doc name, estimated Jaccard)], best
+        # prior match per passage; the document itself (if indexed) is ignored
+        spans, words = passages(text)
+        if not spans:
+            return []
+        sig = signatures(words, spans)
+        keys = band_keys(sig)
+        with self._connect() as db:
+            own = db.execute('SELECT id FROM docs WHERE doc_key = ?', (document_key(text),)).fetchone()
+            db.execute('CREATE TEMP TABLE q (band INTEGER, key INTEGER, qi INTEGER)')
+            db.executemany('INSERT INTO q VALUES (?, ?, ?)',
+                           ((b, int(keys[i, b]), i) for i in range(len(spans)) for b in range(BANDS)))
+            # CROSS JOIN pins the loop order: probe the lsh primary key once per query bucket
+            rows = db.execute('''SELECT DISTINCT q.qi, p.id, p.sig, d.name FROM q
+                                 CROSS JOIN lsh l ON l.band = q.band AND l.key = q.key
+                                 JOIN passages p ON p.id = l.passage_id
+                                 JOIN docs d ON d.id = p.doc_id
+                                 WHERE d.id != ?''', (own[0] if own else -1,)).fetchall()
+        best = {}
+        for qi, _, blob, name in rows:
+            sim = float(np.mean(np.frombuffer(blob, dtype=np.uint32) == sig[qi]))
+            if sim >= threshold and sim > best.get(qi, (0.0, None))[0]:
+                best[qi] = (sim, name)
+        return [(spans[qi][0], spans[qi][1], name, sim) for qi, (sim, name) in sorted(best.items())]
+
+    def version(self):
+        # Changes whenever a filing is added (for cache keys)
+        with self._connect() as db:
+            return db.execute('SELECT COALESCE(MAX(id), 0) FROM docs').fetchone()[0]
+
+    def stats(self):
+        with self._connect() as db:
+            docs = db.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+            n = db.execute('SELECT COUNT(*) FROM passages').fetchone()[0]
+        return {'documents': docs, 'passages': n}
+
+
+@lru_cache(maxsize=1)
+def default_index():
+    # None when the index location is unusable: the boilerplate check is then skipped
+    try:
+        return SimilarityIndex()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def overlap_summary(matches, text_len):
+    # {doc name: passages matched}, share of characters covered by recycled passages
+    by_doc = {}
+    covered = 0
+    for s, e, name, _ in matches:
+        by_doc[name] = by_doc.get(name, 0) + 1
+        covered += e - s
+    return dict(sorted(by_doc.items(), key=lambda kv: -kv[1])), covered / max(text_len, 1)
+
+
+if __name__ == '__main__':
+    import argparse
+    import fnmatch
+    from pathlib import Path
+    parser = argparse.ArgumentParser(description="Filing library for boilerplate / copy-paste detection")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_add = sub.add_parser('add', help="index text files (a file or a directory)")
+    p_add.add_argument('path')
+    p_add.add_argument('--pattern', nargs='+', default=['*.txt'])
+    p_query = sub.add_parser('query', help="report recycled passages of a text file")
+    p_query.add_argument('path')
+    parser.add_argument('--index', default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    index = SimilarityIndex(args.index)
+    if args.cmd == 'add':
+        root = Path(args.path)
+        files = [root] if root.is_file() else sorted(
+            p for p in root.rglob('*') if p.is_file() and any(fnmatch.fnmatch(p.name, pat) for pat in args.pattern))
+        t0 = time.perf_counter()
+        for f in files:
+            n = index.add(f.as_posix(), f.read_text(encoding='utf-8', errors='replace'))
+            print(f"  {f}: {n} passages" if n else f"  {f}: already indexed")
+        print(f"{len(files):,} files in {time.perf_counter() - t0:.1f}s; library: {index.stats()}")
+    else:
+        text = Path(args.path).read_text(encoding='utf-8', errors='replace')
+        t0 = time.perf_counter()
+        matches = index.query(text)
+        by_doc, share = overlap_summary(matches, len(text))
+        print(f"{len(matches)} recycled passages ({share:.0%} of text) in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        for name, k in by_doc.items():
+            print(f"  {k:>4}  {name}")
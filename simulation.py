@@ -0,0 +1,129 @@
+import numpy as np
+
+from scoring import INPUT_FIELDS, DEFAULT_INPUTS, VERDICT_LABELS, score_arrays
+
+# --- MONTE CARLO SENSITIVITY ---
+# The sidebar inputs are point estimates. Here each uncertain input is drawn
+# from a distribution around its point value, and the Z / M / CFO-NI formulas
+# and the verdict tree are evaluated for all draws as array ops (in batches,
+# so memory stays bounded at 10^6 draws).
+#
+#   python simulation.py --draws 1000000
+
+DISTRIBUTIONS = ['normal', 'lognormal', 'uniform', 'triangular']
+
+# Field -> (distribution, relative spread): the usual judgement-heavy inputs
+DEFAULT_UNCERTAINTY = {
+    'rec_cy': ('normal', 0.15),
+    'cfo': ('normal', 0.20),
+    'mve': ('lognormal', 0.25),
+}
+
+SIM_BATCH = 250_000
+TORNADO_QUANTILES = (5, 95)
+
+
+def draw(base, dist, spread, n, rng):
+    # n samples around `base`; spread is relative (0.1 = +/-10% scale)
+    if dist == 'normal':
+        return base * (1.0 + spread * rng.standard_normal(n))
+    if dist == 'lognormal':
+        # mean-preserving: E[x] == base
+        return base * np.exp(spread * rng.standard_normal(n) - 0.5 * spread ** 2)
+    if dist == 'uniform':
+        return base * rng.uniform(1.0 - spread, 1.0 + spread, n)
+    if dist == 'triangular':
+        lo, hi = sorted((base * (1.0 - spread), base * (1.0 + spread)))
+        return rng.triangular(lo, base, hi, n) if hi > lo else np.full(n, float(base))
+    raise ValueError(f"Unknown distribution '{dist}' (expected one of {', '.join(DISTRIBUTIONS)})")
+
+
+def _active(uncertainty):
+    return {f: (d, s) for f, (d, s) in uncertainty.items() if s > 0}
+
+
+def simulate(inputs, uncertainty=DEFAULT_UNCERTAINTY, n=100_000, seed=0):
+    # inputs: point values per INPUT_FIELDS (missing -> sample company);
+    # uncertainty: {field: (distribution, relative spread)}.
+    # Returns {'z_score', 'm_score', 'q_ratio', 'verdict_code'} arrays plus the drawn inputs.
+    base = dict(DEFAULT_INPUTS)
+    base.update(inputs)
+    active = _active(uncertainty)
+    rng = np.random.default_rng(seed)
+    out = {k: np.empty(n) for k in ('z_score', 'm_score', 'q_ratio')}
+    out['verdict_code'] = np.empty(n, dtype=np.int8)
+    drawn = {f: np.empty(n) for f in active}
+    for lo in range(0, n, SIM_BATCH):
+        size = min(SIM_BATCH, n - lo)
+        cols = {f: base[f] for f in INPUT_FIELDS}
+        for f, (dist, spread) in active.items():
+            cols[f] = drawn[f][lo:lo + size] = draw(base[f], dist, spread, size, rng)
+        res = score_arrays(**cols)
+        for k in out:
+            out[k][lo:lo + size] = res[k]
+    out['inputs'] = drawn
+    return out
+
+
+def verdict_probabilities(codes):
+    # {verdict label: share of draws}; incomplete draws (-1) are left out
+    counts = np.bincount(codes[codes >= 0], minlength=len(VERDICT_LABELS))
+    return dict(zip(VERDICT_LABELS, counts / max(len(codes), 1)))
+
+
+def tornado(inputs, sim, quantiles=TORNADO_QUANTILES):
+    # One-at-a-time swings: each uncertain input at its low / high simulated quantile,
+    # everything else at the point value. All swings are scored in one vectorized call.
+    # Returns [(field, low value, high value, {metric: (at low, at high)})].
+    base = dict(DEFAULT_INPUTS)
+    base.update(inputs)
+    fields = list(sim['inputs'])
+    if not fields:
+        return []
+    cols = {f: np.full(2 * len(fields), float(base[f])) for f in INPUT_FIELDS}
+    bounds = []
+    for i, f in enumerate(fields):
+        lo, hi = np.percentile(sim['inputs'][f], quantiles)
+        cols[f][2 * i], cols[f][2 * i + 1] = lo, hi
+        bounds.append((lo, hi))
+    res = score_arrays(**cols)
+    rows = []
+    for i, f in enumerate(fields):
+        swings = {k: (float(res[k][2 * i]), float(res[k][2 * i + 1])) for k in ('z_score', 'm_score', 'q_ratio')}
+        rows.append((f, float(bounds[i][0]), float(bounds[i][1]), swings))
+    return rows
+
+
+def summarize(inputs, uncertainty=DEFAULT_UNCERTAINTY, n=100_000, seed=0, bins=60):
+    # Compact, cacheable result for the UI: verdict odds, score percentiles,
+    # histograms and tornado rows (the raw draws are not kept)
+    sim = simulate(inputs, uncertainty, n, seed)
+    out = {'n': n, 'verdicts': verdict_probabilities(sim['verdict_code']), 'tornado': tornado(inputs, sim)}
+    for k in ('z_score', 'm_score', 'q_ratio'):
+        vals = sim[k][np.isfinite(sim[k])]
+        if not len(vals):
+            out[k] = None
+            continue
+        # Histogram over the central 99% so a few extreme draws don't flatten the chart
+        lo, hi = np.percentile(vals, [0.5, 99.5])
+        counts, edges = np.histogram(vals, bins=bins, range=(lo, hi) if hi > lo else None)
+        out[k] = {'p5': float(np.percentile(vals, 5)), 'p50': float(np.median(vals)),
+                  'p95': float(np.percentile(vals, 95)), 'counts': counts.tolist(), 'edges': edges.tolist()}
+    return out
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Monte Carlo verdict odds for the sample company")
+    parser.add_argument('--draws', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    t0 = time.perf_counter()
+    res = summarize({}, DEFAULT_UNCERTAINTY, args.draws, args.seed)
+    print(f"{args.draws:,} draws in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    for label, p in res['verdicts'].items():
+        print(f"  {label:<18}{p:>8.1%}")
+    for f, lo, hi, swings in res['tornado']:
+        print(f"  {f:<8} {lo:>12,.0f} .. {hi:<12,.0f} Z {swings['z_score'][0]:.2f}..{swings['z_score'][1]:.2f}"
+              f"  M {swings['m_score'][0]:.2f}..{swings['m_score'][1]:.2f}")
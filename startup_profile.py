@@ -0,0 +1,76 @@
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+# --- STARTUP PROFILER ---
+# Cold-start report per page: each page is rendered first in a fresh interpreter
+# via Streamlit's headless AppTest, with app.py in FO_PROFILE_STARTUP mode.
+#
+#   python startup_profile.py                    # table
+#   python startup_profile.py --json --max-ms 3000   # exit 1 if any page is slower
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_RUNNER = r'''
+import json, sys, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t1 = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.session_state["nav_page"] = sys.argv[2]
+at.run()
+t2 = time.perf_counter()
+page = at.session_state["_startup_timings"][sys.argv[2]]
+print(json.dumps({"streamlit_import_ms": (t1 - t0) * 1000, "first_run_ms": (t2 - t1) * 1000,
+                  "view_import_ms": page["import_ms"], "view_render_ms": page["first_render_ms"],
+                  "error": str(at.exception[0].message) if at.exception else ""}))
+'''
+
+
+def profile_page(page):
+    env = dict(os.environ, FO_PROFILE_STARTUP="1")
+    proc = subprocess.run([sys.executable, "-c", _RUNNER, os.path.join(APP_DIR, "app.py"), page],
+                          cwd=APP_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "runner failed"}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def app_pages():
+    # PAGES is a literal in app.py; read it without executing the Streamlit script
+    with open(os.path.join(APP_DIR, "app.py"), encoding="utf-8") as fh:
+        tree = ast.parse(fh.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "PAGES" for t in node.targets):
+            return list(ast.literal_eval(node.value))
+    raise RuntimeError("PAGES not found in app.py")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import & first-render time per page")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if a page's first run exceeds this")
+    args = parser.parse_args(argv)
+
+    results = {page: profile_page(page) for page in app_pages()}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'Page':<28}{'st import':>11}{'view import':>13}{'view render':>13}{'first run':>11}")
+        for page, r in results.items():
+            if r.get("error"):
+                print(f"{page:<28}  ERROR: {r['error']}")
+                continue
+            print(f"{page:<28}{r['streamlit_import_ms']:>9.0f}ms{r['view_import_ms']:>11.0f}ms"
+                  f"{r['view_render_ms']:>11.0f}ms{r['first_run_ms']:>9.0f}ms")
+
+    failed = [p for p, r in results.items()
+              if r.get("error") or (args.max_ms is not None and r["first_run_ms"] > args.max_ms)]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+import os
+import re
+from functools import lru_cache
+
+# --- SYLLABLE COUNTER ---
+# Precomputed table lookup with a vowel-group heuristic fallback, memoized
+# behind a bounded LRU so recurring filing vocabulary costs one dict hit.
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'syllable_table.txt')
+CACHE_SIZE = 200_000
+
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+_NON_ALPHA_RE = re.compile(r'[^a-z]')
+# Vowel pairs usually pronounced as two syllables (me-di-a, ac-tu-al, ra-di-o)
+_SPLIT_RE = re.compile(r'(?<![cgst])ia|ua|uo|iu|(?<![cstx])io|eo(?!u)|(?<![aeiou])ie(?=r|t)|ea(?=[lt]i)')
+
+_table = None
+
+
+def _load_table(path=TABLE_PATH):
+    table = {}
+    try:
+        with open(path, encoding='utf-8') as fh:
+            for line in fh:
+                if not line or line[0] == '#':
+                    continue
+                parts = line.split()
+                if len(parts) == 2:
+                    table[parts[0]] = int(parts[1])
+    except OSError:
+        pass
+    return table
+
+
+def load_pronunciations(path):
+    # Merge a CMU-style pronouncing dictionary ("WORD  W ER1 D") into the table:
+    # syllables = phonemes carrying a stress digit. Clears the memo caches of both
+    # count_syllables and is_complex_word.
+    table = syllable_table()
+    with open(path, encoding='latin-1') as fh:
+        for line in fh:
+            if not line or line.startswith(';;;'):
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            word = parts[0].split('(')[0].lower()
+            count = sum(1 for ph in parts[1:] if ph[-1].isdigit())
+            table.setdefault(word, count)
+    count_syllables.cache_clear()
+    is_complex_word.cache_clear()
+    return len(table)
+
+
+def syllable_table():
+    global _table
+    if _table is None:
+        _table = _load_table()
+    return _table
+
+
+def _consonant_le(w):
+    return len(w) > 2 and w.endswith('le') and w[-3] not in 'aeiouy'
+
+
+def heuristic_syllables(word):
+    w = _NON_ALPHA_RE.sub('', word.lower())
+    if not w:
+        return 0
+    if len(w) <= 3:
+        return 1
+    n = len(_VOWEL_GROUP_RE.findall(w))
+    n += len(_SPLIT_RE.findall(w))
+    # Silent endings: make, jumped, pressures (but table, wanted, boxes, ties)
+    if w.endswith('e') and not w.endswith(('le', 'ee', 'ie', 'ye', 'oe')):
+        n -= 1
+    elif w.endswith('le') and w[-3] in 'aeiouy':
+        n -= 1
+    elif w.endswith('ed') and w[-3] not in 'tdaeiouy' and not _consonant_le(w[:-1]):
+        n -= 1
+    elif w.endswith('es') and w[-3] not in 'sxzaeiouy' and not w.endswith(('ches', 'shes', 'ges', 'ces')) \
+            and not _consonant_le(w[:-1]):
+        n -= 1
+    # -ism / -asm endings add a syllable (animism, enthusiasm)
+    if w.endswith('sm'):
+        n += 1
+    return max(n, 1)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def count_syllables(word):
+    if word.isdigit():
+        return 0
+    w = word.lower()
+    n = syllable_table().get(w)
+    return n if n is not None else heuristic_syllables(w)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_complex_word(word):
+    # Gunning: 3+ syllables, not counting a trailing -es / -ed / -ing
+    n = count_syllables(word)
+    if n < 3:
+        return False
+    w = word.lower()
+    for suffix in ('ing', 'ed', 'es'):
+        if w.endswith(suffix) and len(w) > len(suffix) + 2:
+            return count_syllables(w[:-len(suffix)]) >= 3
+    return True
+
+
+# --- BENCHMARK ---
+# python syllables.py [--words 5000000] [--vocab 50000]
+
+def _synthetic_corpus(n_words, vocab_size, seed=7):
+    import random
+    rnd = random.Random(seed)
+    letters = 'etaoinshrdlcumwfgypbvkjxqz'
+    vocab = sorted(syllable_table())[:vocab_size // 2]
+    while len(vocab) < vocab_size:
+        vocab.append(''.join(rnd.choices(letters, k=rnd.randint(3, 14))))
+    # Zipf-like frequencies, as in real filings a few thousand words dominate
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    return rnd.choices(vocab, weights=weights, k=n_words)
+
+
+def _bench(n_words, vocab_size):
+    import time
+    corpus = _synthetic_corpus(n_words, vocab_size)
+    print(f"Corpus: {n_words:,} words, {len(set(corpus)):,} distinct")
+
+    t0 = time.perf_counter()
+    for w in corpus[:min(n_words, 500_000)]:
+        heuristic_syllables(w)
+    dt = time.perf_counter() - t0
+    print(f"  heuristic, uncached : {min(n_words, 500_000) / dt:>14,.0f} words/s")
+
+    for label in ('cold cache', 'warm cache'):
+        if label == 'cold cache':
+            count_syllables.cache_clear()
+            is_complex_word.cache_clear()
+        t0 = time.perf_counter()
+        n_complex = sum(map(is_complex_word, corpus))
+        dt = time.perf_counter() - t0
+        print(f"  is_complex_word, {label}: {n_words / dt:>14,.0f} words/s ({n_complex:,} complex)")
+    print(f"  cache: {is_complex_word.cache_info()}")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="Syllable counter throughput benchmark")
+    parser.add_argument('--words', type=int, default=5_000_000)
+    parser.add_argument('--vocab', type=int, default=50_000)
+    args = parser.parse_args()
+    _bench(args.words, args.vocab)
@@ -0,0 +1,607 @@
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import re
+import sqlite3
+import sys
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from analysis import sentence_aligned
+from corpus_scan import iter_documents
+from extract import EXTRACTABLE, SectionFilter, iter_pages, pages_with_breaks
+from lexicon import DEFAULT_LEXICONS, TOKEN_RE, load_wordlist, scan
+from readability import iter_chunks
+
+# --- TONE MATRIX (corpus-wide term statistics) ---
+# Every ingested filing becomes one row of a sparse document x term count
+# matrix (CSR: row pointers, column ids, counts). Rows are appended in
+# segments, one .npz file per ingest batch, next to a SQLite table of terms and
+# documents, so adding filings never rewrites what is already stored. Category
+# scores (risk / vague share per company-year, with the built-in lexicons or
+# full dictionaries), top terms and year-over-year changes are sparse products
+# and column sums over the stored counts: raw text is read once, at ingest.
+#
+#   python tone_matrix.py add filings/ --pattern "*.txt" "*.pdf"
+#   python tone_matrix.py scores --dict risk=lm_negative.csv --dict vague=lm_uncertainty.csv
+#   python tone_matrix.py top --company Infosys --year 2024 --category risk
+#   python tone_matrix.py yoy --company Infosys
+#   python tone_matrix.py movers 2024
+#
+# Filings are keyed by their path under the ingested directory; company and year
+# come from the name: "<company>/<year>.txt" or "<company>_<year>.txt".
+
+DEFAULT_PATH = os.environ.get('FO_TONE_MATRIX') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.forensic_cache', 'tone_matrix')
+
+SEGMENT_ROWS = 2000    # documents per stored segment
+HASH_BLOCK = 1 << 20
+LOAD_ATTEMPTS = 5      # load() re-reads when a concurrent compact() removed its segments
+YEAR_RE = re.compile(r'(?<!\d)(?:19|20)\d{2}(?!\d)')
+# Left out of top-term / mover lists that are not restricted to a category
+STOPWORDS = frozenset((
+    'the', 'and', 'for', 'that', 'with', 'are', 'was', 'were', 'has', 'have', 'had', 'its', 'this', 'these',
+    'those', 'from', 'which', 'been', 'not', 'but', 'our', 'their', 'they', 'also', 'any', 'all', 'such',
+    'other', 'will', 'would', 'can', 'may', 'into', 'over', 'under', 'during', 'each', 'per', 'than', 'there',
+    'where', 'while', 'who', 'whom', 'what', 'when', 'through', 'about', 'being', 'both', 'more', 'most',
+    'only', 'same', 'some', 'very', 'upon', 'shall', 'out', 'his', 'her', 'she', 'him', 'you', 'your',
+))
+
+
+def doc_company_year(rel):
+    # "<company>/<year>.txt", "<company>/<year>/mdna.pdf" or "<company>_<year>.txt" -> (company, year)
+    parts = Path(rel).with_suffix('').parts
+    years = [y for part in parts for y in YEAR_RE.findall(part)]
+    company = parts[0] if len(parts) > 1 else (YEAR_RE.sub('', parts[0]).strip(' _-.') or parts[0])
+    return company, int(years[-1]) if years else None
+
+
+def phrase_terms(lexicons):
+    # The multi-word terms of a lexicon set, normalized as matrix terms ("going concern")
+    found = []
+    for _, terms in lexicons:
+        for term in terms:
+            toks = TOKEN_RE.findall(term.lower())
+            if len(toks) > 1:
+                found.append(' '.join(toks))
+    return tuple(dict.fromkeys(found))
+
+
+def count_terms(pieces, phrases=()):
+    # Term counts of a text stream: every word, plus the registered multi-word phrases
+    # (the words inside a phrase are counted as words too)
+    counts = Counter()
+    lexicons = (('phrase', phrases),) if phrases else None
+    for piece in sentence_aligned(pieces):
+        counts.update(TOKEN_RE.findall(piece.lower()))
+        if lexicons:
+            for s, e, _ in scan(piece, lexicons)[0]:
+                counts[' '.join(TOKEN_RE.findall(piece[s:e].lower()))] += 1
+    return counts
+
+
+def _file_fingerprint(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def count_file(job):
+    # Pool task: term counts of one filing (PDF / HTML: its MD&A / Directors' Report, as in corpus_scan.py)
+    root, rel, stored_fp, phrases = job
+    path = Path(root, rel)
+    out = {'key': rel, 'stat': _stat_key(path), 'fp': _file_fingerprint(path), 'error': ''}
+    if out['fp'] == stored_fp:
+        return out  # touched but identical
+    try:
+        if path.suffix.lower() in EXTRACTABLE:
+            selector = SectionFilter()
+            counts = count_terms(iter_chunks(pages_with_breaks(selector(iter_pages(path, workers=1)))), phrases)
+            if not selector.found:
+                counts = count_terms(iter_chunks(pages_with_breaks(iter_pages(path, workers=1))), phrases)
+        else:
+            counts = count_terms(iter_chunks(path), phrases)
+    except Exception as e:
+        out['error'] = f"{type(e).__name__}: {e}"
+        return out
+    out['counts'] = counts
+    out['words'] = sum(n for t, n in counts.items() if ' ' not in t)
+    return out
+
+
+# --- SPARSE MATRIX ---
+
+class CSR:
+    # Compressed sparse rows over numpy arrays: just the operations the tone queries need
+    def __init__(self, indptr, indices, data, n_cols):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data)
+        self.n_cols = n_cols
+
+    @property
+    def shape(self):
+        return len(self.indptr) - 1, self.n_cols
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    @classmethod
+    def vstack(cls, parts, n_cols):
+        # parts: (indptr, indices, data) triples, stacked in order
+        if not parts:
+            return cls([0], [], np.zeros(0, np.int32), n_cols)
+        offsets = np.cumsum([0] + [p[0][-1] for p in parts[:-1]])
+        indptr = np.concatenate([[0]] + [p[0][1:] + off for p, off in zip(parts, offsets)])
+        return cls(indptr, np.concatenate([p[1] for p in parts]), np.concatenate([p[2] for p in parts]), n_cols)
+
+    def row_ids(self):
+        return np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+
+    def take(self, rows):
+        # Sub-matrix of the given rows, in that order
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        pos = np.repeat(starts - indptr[:-1], lengths) + np.arange(indptr[-1])
+        return CSR(indptr, self.indices[pos], self.data[pos], self.n_cols)
+
+    def column_sums(self):
+        return np.bincount(self.indices, weights=self.data, minlength=self.n_cols)
+
+    def document_frequency(self):
+        # Rows with a non-zero count, per column
+        return np.bincount(self.indices, minlength=self.n_cols)
+
+    def project(self, term_class, k):
+        # Product with a term -> class indicator (one class per term, -1 for none): dense rows x k
+        cls = term_class[self.indices]
+        keep = cls >= 0
+        keys = self.row_ids()[keep] * k + cls[keep]
+        out = np.bincount(keys, weights=self.data[keep], minlength=self.shape[0] * k)
+        return out.reshape(self.shape[0], k)
+
+
+# --- STORE ---
+
+class ToneMatrix:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT UNIQUE NOT NULL)')
+            db.execute('''CREATE TABLE IF NOT EXISTS segments (
+                              file TEXT PRIMARY KEY,
+                              first_row INTEGER NOT NULL,
+                              n_rows INTEGER NOT NULL)''')
+            # row: the document's row in the stacked segments; rows no longer listed here are dead
+            db.execute('''CREATE TABLE IF NOT EXISTS docs (
+                              key TEXT PRIMARY KEY,
+                              row INTEGER NOT NULL,
+                              company TEXT,
+                              year INTEGER,
+                              words INTEGER NOT NULL,
+                              stat TEXT,
+                              fp TEXT,
+                              added REAL NOT NULL)''')
+            db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            db.execute("INSERT OR IGNORE INTO meta VALUES ('generation', '0'), ('phrases', '[]')")
+        self._loaded = None
+
+    @contextmanager
+    def _connect(self):
+        # Short-lived connection per call, as in result_store.py
+        db = sqlite3.connect(os.path.join(self.path, 'tone.sqlite'), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _meta(self, db, key):
+        return db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()[0]
+
+    def phrases(self):
+        with self._connect() as db:
+            return tuple(json.loads(self._meta(db, 'phrases')))
+
+    def register_phrases(self, lexicons):
+        # Multi-word dictionary terms are counted at ingest; returns the newly registered ones
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            known = tuple(json.loads(self._meta(db, 'phrases')))
+            new = [p for p in phrase_terms(lexicons) if p not in known]
+            if new:
+                db.execute("UPDATE meta SET value = ? WHERE key = 'phrases'", (json.dumps(known + tuple(new)),))
+        return new
+
+    # --- INGEST ---
+
+    def add(self, root, patterns=('*.txt',), workers=None, full=False, lexicons=DEFAULT_LEXICONS, progress=True):
+        # Count new and changed filings under root into new segments; returns a summary dict
+        new_phrases = self.register_phrases(lexicons)
+        if new_phrases and progress:
+            print(f"{len(new_phrases)} new phrase(s) registered: counted in filings added from now on "
+                  f"(--full re-counts stored ones)", file=sys.stderr)
+        phrases = self.phrases()
+        with self._connect() as db:
+            stored = {k: (stat, fp) for k, stat, fp in db.execute('SELECT key, stat, fp FROM docs')}
+            vocab = {t: i for i, t in db.execute('SELECT id, term FROM terms')}
+        todo = []
+        for rel in iter_documents(root, patterns):
+            stat, fp = stored.get(rel, (None, None))
+            if full:
+                fp = None
+            elif stat is not None and stat == _stat_key(Path(root, rel)):
+                continue  # untouched file: no read at all
+            todo.append((str(root), rel, fp, phrases))
+        if progress:
+            print(f"{len(stored):,} filings stored, {len(todo):,} new or changed", file=sys.stderr)
+
+        buf, touched, errors, added, t0 = [], [], 0, 0, time.perf_counter()
+        pool = mp.Pool(workers) if workers != 1 and len(todo) > 1 else None
+        try:
+            results = pool.imap_unordered(count_file, todo, chunksize=4) if pool else map(count_file, todo)
+            for res in results:
+                if res['error']:
+                    errors += 1
+                    print(f"  {res['key']}: {res['error']}", file=sys.stderr)
+                elif 'counts' not in res:
+                    touched.append((res['stat'], res['key']))
+                else:
+                    buf.append(res)
+                    if len(buf) >= SEGMENT_ROWS:
+                        added += self._write_segment(buf, vocab)
+                        buf = []
+                        if progress:
+                            rate = added / (time.perf_counter() - t0)
+                            print(f"  {added:,}/{len(todo):,} filings ({rate:,.1f}/s)", file=sys.stderr)
+            if pool:
+                pool.close()
+        except BaseException:
+            if pool:
+                pool.terminate()
+            raise
+        finally:
+            if buf:
+                added += self._write_segment(buf, vocab)
+            if pool:
+                pool.join()
+        if touched:
+            with self._connect() as db:
+                db.executemany('UPDATE docs SET stat = ? WHERE key = ?', touched)
+        return {'added': added, 'unchanged': len(touched), 'errors': errors, 'terms': len(vocab)}
+
+    def _write_segment(self, results, vocab):
+        # One CSR segment for a batch of counted filings; new terms get the next column ids.
+        # Runs under the write lock (BEGIN IMMEDIATE): concurrent add / compact runs see each
+        # other's terms, rows and generation, never a snapshot. vocab mirrors the committed terms.
+        now = time.time()
+        name = None
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                vocab.update((t, i) for i, t in db.execute('SELECT id, term FROM terms WHERE id >= ?',
+                                                           (len(vocab),)))
+                new_terms = {}
+                indptr, indices, data = [0], [], []
+                for res in results:
+                    counts = res['counts']
+                    for t in counts:
+                        if t not in vocab and t not in new_terms:
+                            new_terms[t] = len(vocab) + len(new_terms)
+                    ids = np.fromiter((vocab[t] if t in vocab else new_terms[t] for t in counts), np.int32,
+                                      len(counts))
+                    vals = np.fromiter(counts.values(), np.int32, len(counts))
+                    order = np.argsort(ids)
+                    indices.append(ids[order])
+                    data.append(vals[order])
+                    indptr.append(indptr[-1] + len(ids))
+                gen = int(self._meta(db, 'generation')) + 1
+                first = db.execute('SELECT COALESCE(MAX(first_row + n_rows), 0) FROM segments').fetchone()[0]
+                name = f'seg-{gen:06d}-{uuid.uuid4().hex[:8]}.npz'
+                # The segment file lands before the transaction that lists it commits
+                self._save(name, np.asarray(indptr, np.int64), np.concatenate(indices), np.concatenate(data))
+                db.executemany('INSERT INTO terms (id, term) VALUES (?, ?)', [(i, t) for t, i in new_terms.items()])
+                db.execute('INSERT INTO segments VALUES (?, ?, ?)', (name, first, len(results)))
+                db.executemany('''INSERT INTO docs VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                                  ON CONFLICT (key) DO UPDATE SET
+                                      row = excluded.row, company = excluded.company, year = excluded.year,
+                                      words = excluded.words, stat = excluded.stat, fp = excluded.fp,
+                                      added = excluded.added''',
+                               [(res['key'], first + i, *doc_company_year(res['key']), res['words'], res['stat'],
+                                 res['fp'], now) for i, res in enumerate(results)])
+                db.execute("UPDATE meta SET value = ? WHERE key = 'generation'", (str(gen),))
+            except BaseException:
+                if name is not None:
+                    self._discard(name)  # rolled back: the file is listed nowhere
+                raise
+        vocab.update(new_terms)
+        return len(results)
+
+    def _save(self, name, indptr, indices, data):
+        tmp = os.path.join(self.path, name + '.tmp')
+        with open(tmp, 'wb') as fh:
+            np.savez(fh, indptr=indptr, indices=indices, data=data)
+        os.replace(tmp, os.path.join(self.path, name))
+
+    def _discard(self, name):
+        try:
+            os.remove(os.path.join(self.path, name))
+        except FileNotFoundError:
+            pass
+
+    def compact(self):
+        # Rewrite the live rows as one segment: drops rows of replaced filings, renumbers the rest.
+        # The write lock is taken first, so no add() commits between the load and the rewrite.
+        name = None
+        with self._connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                matrix, docs, _ = self.load()
+                old = [f for f, in db.execute('SELECT file FROM segments')]
+                gen = int(self._meta(db, 'generation')) + 1
+                name = f'seg-{gen:06d}-{uuid.uuid4().hex[:8]}.npz'
+                live = matrix.take(docs['row'].to_numpy())
+                self._save(name, live.indptr, live.indices, live.data)
+                db.execute('DELETE FROM segments')
+                db.execute('INSERT INTO segments VALUES (?, 0, ?)', (name, len(docs)))
+                db.executemany('UPDATE docs SET row = ? WHERE key = ?', enumerate(docs['key'].tolist()))
+                db.execute("UPDATE meta SET value = ? WHERE key = 'generation'", (str(gen),))
+            except BaseException:
+                if name is not None:
+                    self._discard(name)
+                raise
+        # A reader still loading the old segments finds them gone and reloads (see load())
+        for f in old:
+            self._discard(f)
+        return {'rows_before': matrix.shape[0], 'rows': len(docs), 'segments_before': len(old)}
+
+    # --- QUERIES ---
+
+    def load(self):
+        # (CSR over every stored row, live documents frame, terms): re-read only when the store changed
+        import pandas as pd
+        for attempt in range(LOAD_ATTEMPTS):
+            with self._connect() as db:
+                db.execute('BEGIN')  # one snapshot for the four reads
+                gen = self._meta(db, 'generation')
+                if self._loaded is not None and self._loaded[0] == gen:
+                    return self._loaded[1:]
+                segments = db.execute('SELECT file FROM segments ORDER BY first_row').fetchall()
+                terms = [t for t, in db.execute('SELECT term FROM terms ORDER BY id')]
+                docs = pd.read_sql_query('SELECT key, row, company, year, words FROM docs ORDER BY row', db)
+            try:
+                parts = []
+                for f, in segments:
+                    with np.load(os.path.join(self.path, f)) as z:
+                        parts.append((z['indptr'], z['indices'], z['data']))
+                break
+            except FileNotFoundError:
+                # a concurrent compact() replaced the segments since the snapshot: read again
+                if attempt == LOAD_ATTEMPTS - 1:
+                    raise
+        self._loaded = (gen, CSR.vstack(parts, len(terms)), docs, terms)
+        self._columns = {t: i for i, t in enumerate(terms)}
+        self._plain = np.array([t not in STOPWORDS and len(t) > 2 and not t.isdigit() for t in terms], bool)
+        return self._loaded[1:]
+
+    def term_classes(self, lexicons=DEFAULT_LEXICONS):
+        # Column -> category index for a lexicon set (first category wins, as in lexicon.py); -1 elsewhere
+        self.load()
+        classes = np.full(len(self._columns), -1, np.int32)
+        for k, (_, terms) in enumerate(lexicons):
+            for term in terms:
+                j = self._columns.get(' '.join(TOKEN_RE.findall(term.lower())))
+                if j is not None and classes[j] < 0:
+                    classes[j] = k
+        return classes
+
+    def _select(self, docs, company=None, year=None):
+        if company is not None:
+            docs = docs[docs['company'] == company]
+        if year is not None:
+            docs = docs[docs['year'] == int(year)]
+        return docs
+
+    def category_scores(self, lexicons=DEFAULT_LEXICONS, company=None, by=('company', 'year')):
+        # Hits per category, hits per 1,000 words and each category's share of all category hits,
+        # per company-year (by=None: per filing)
+        matrix, docs, _ = self.load()
+        docs = self._select(docs, company)
+        cats = [c for c, _ in lexicons]
+        hits = matrix.take(docs['row'].to_numpy()).project(self.term_classes(lexicons), len(cats))
+        frame = docs[['key', 'company', 'year', 'words']].copy()
+        for k, c in enumerate(cats):
+            frame[f'hits_{c}'] = hits[:, k].astype(np.int64)
+        if by:
+            frame = frame.drop(columns='key').groupby(list(by), as_index=False, dropna=False).sum()
+        total = frame[[f'hits_{c}' for c in cats]].sum(axis=1).replace(0, np.nan)
+        for c in cats:
+            frame[f'{c}_per_1k'] = frame[f'hits_{c}'] * 1000 / frame['words'].replace(0, np.nan)
+            frame[f'{c}_share'] = frame[f'hits_{c}'] / total
+        return frame
+
+    def yoy(self, lexicons=DEFAULT_LEXICONS, company=None):
+        # Category scores per company-year with the change from the company's previous filing year
+        frame = self.category_scores(lexicons, company).dropna(subset=['year'])
+        frame = frame.sort_values(['company', 'year']).reset_index(drop=True)
+        by_company = frame.groupby('company')
+        frame.insert(2, 'prev_year', by_company['year'].shift())
+        for c, _ in lexicons:
+            for col in (f'{c}_per_1k', f'{c}_share'):
+                frame[f'{col}_change'] = by_company[col].diff()
+        return frame
+
+    def top_terms(self, n=20, company=None, year=None, category=None, lexicons=DEFAULT_LEXICONS):
+        # Most frequent terms of a company / year / the corpus, optionally within one category
+        import pandas as pd
+        matrix, docs, terms = self.load()
+        docs = self._select(docs, company, year)
+        sub = matrix.take(docs['row'].to_numpy())
+        sums = sub.column_sums()
+        if category is not None:
+            cats = [c for c, _ in lexicons]
+            if category not in cats:
+                raise KeyError(f"Unknown category {category!r} (have: {', '.join(cats)})")
+            sums[self.term_classes(lexicons) != cats.index(category)] = 0
+        else:
+            sums[~self._plain] = 0
+        top = np.argsort(-sums, kind='stable')[:n]
+        top = top[sums[top] > 0]
+        words = max(int(docs['words'].sum()), 1)
+        return pd.DataFrame({'term': [terms[j] for j in top], 'count': sums[top].astype(np.int64),
+                             'per_1k': sums[top] * 1000 / words, 'filings': sub.document_frequency()[top]})
+
+    def term_trend(self, terms, company=None):
+        # Frequency per 1,000 words of the given terms per company-year
+        matrix, docs, _ = self.load()
+        docs = self._select(docs, company)
+        classes = np.full(matrix.n_cols, -1, np.int32)
+        for k, term in enumerate(terms):
+            j = self._columns.get(' '.join(TOKEN_RE.findall(term.lower())))
+            if j is not None:
+                classes[j] = k
+        counts = matrix.take(docs['row'].to_numpy()).project(classes, len(terms))
+        frame = docs[['company', 'year', 'words']].copy()
+        for k, term in enumerate(terms):
+            frame[term] = counts[:, k]
+        frame = frame.groupby(['company', 'year'], as_index=False, dropna=False).sum()
+        for term in terms:
+            frame[term] = frame[term] * 1000 / frame['words'].replace(0, np.nan)
+        return frame
+
+    def movers(self, year, company=None, n=20, min_count=5):
+        # Terms whose frequency per 1,000 words moved most from the previous year to this one
+        import pandas as pd
+        matrix, docs, terms = self.load()
+        rates, counts = [], []
+        for y in (int(year) - 1, int(year)):
+            sel = self._select(docs, company, y)
+            sums = matrix.take(sel['row'].to_numpy()).column_sums()
+            counts.append(sums)
+            rates.append(sums * 1000 / max(int(sel['words'].sum()), 1))
+        change = rates[1] - rates[0]
+        change[(counts[0] + counts[1] < min_count) | ~self._plain] = 0
+        top = np.argsort(-np.abs(change), kind='stable')[:n]
+        top = top[change[top] != 0]
+        return pd.DataFrame({'term': [terms[j] for j in top], 'count_prev': counts[0][top].astype(np.int64),
+                             'count': counts[1][top].astype(np.int64), 'per_1k_prev': rates[0][top],
+                             'per_1k': rates[1][top], 'change': change[top]})
+
+    def stats(self):
+        matrix, docs, terms = self.load()
+        with self._connect() as db:
+            segments = db.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        size = sum(f.stat().st_size for f in Path(self.path).iterdir() if f.is_file())
+        years = docs['year'].dropna()
+        return {'filings': len(docs), 'companies': int(docs['company'].nunique()),
+                'years': f"{int(years.min())}–{int(years.max())}" if len(years) else None,
+                'terms': len(terms), 'nonzeros': matrix.nnz, 'dead_rows': matrix.shape[0] - len(docs),
+                'segments': segments, 'phrases': len(self.phrases()), 'disk_mb': round(size / 2**20, 1)}
+
+
+def parse_dicts(specs):
+    # ["risk=lm_negative.csv", ...] -> lexicon tuple; none given: the built-in risk / vague lexicons
+    if not specs:
+        return DEFAULT_LEXICONS
+    lexicons = []
+    for spec in specs:
+        category, sep, path = spec.partition('=')
+        if not sep:
+            raise SystemExit(f"--dict expects CATEGORY=PATH, got {spec!r}")
+        lexicons.append((category, load_wordlist(path)))
+    return tuple(lexicons)
+
+
+def main(argv=None):
+    import pandas as pd
+    parser = argparse.ArgumentParser(description="Forensic Omniscient: corpus tone matrix")
+    parser.add_argument('--store', default=DEFAULT_PATH, help="tone matrix directory")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    dicts = argparse.ArgumentParser(add_help=False)
+    dicts.add_argument('--dict', action='append', metavar='CATEGORY=PATH',
+                       help="category word list (one term per line or CSV; repeatable; default: built-in risk / vague)")
+    add = sub.add_parser('add', parents=[dicts], help="count new and changed filings into the matrix")
+    add.add_argument('root', help="directory of filings: <company>/<year>.txt or <company>_<year>.txt")
+    add.add_argument('--pattern', nargs='+', default=['*.txt'], help="filename glob(s) to include")
+    add.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: all cores)")
+    add.add_argument('--full', action='store_true', help="re-count every filing")
+    scores = sub.add_parser('scores', parents=[dicts], help="category scores per company-year")
+    scores.add_argument('--company')
+    scores.add_argument('--per-filing', action='store_true')
+    yoy = sub.add_parser('yoy', parents=[dicts], help="category scores with year-over-year change")
+    yoy.add_argument('--company')
+    top = sub.add_parser('top', parents=[dicts], help="most frequent terms")
+    top.add_argument('--company')
+    top.add_argument('--year', type=int)
+    top.add_argument('--category')
+    top.add_argument('-n', type=int, default=20)
+    trend = sub.add_parser('trend', help="frequency of terms per company-year")
+    trend.add_argument('terms', nargs='+')
+    trend.add_argument('--company')
+    movers = sub.add_parser('movers', help="terms that moved most against the previous year")
+    movers.add_argument('year', type=int)
+    movers.add_argument('--company')
+    movers.add_argument('-n', type=int, default=20)
+    movers.add_argument('--min-count', type=int, default=5)
+    sub.add_parser('compact', help="rewrite the matrix without rows of replaced filings")
+    sub.add_parser('stats', help="matrix size")
+    for p in (scores, yoy, top, trend, movers):
+        p.add_argument('-o', '--output', help="also write the table here (.csv)")
+    args = parser.parse_args(argv)
+
+    tm = ToneMatrix(args.store)
+    lexicons = parse_dicts(getattr(args, 'dict', None))
+    if args.cmd in ('scores', 'yoy', 'top'):
+        missing = [p for p in phrase_terms(lexicons) if p not in tm.phrases()]
+        if missing:
+            print(f"{len(missing)} phrase(s) not registered at ingest count as zero (run add with the same "
+                  f"--dict): {', '.join(missing[:5])}", file=sys.stderr)
+    if args.cmd == 'add':
+        t0 = time.perf_counter()
+        res = tm.add(args.root, args.pattern, workers=args.workers, full=args.full, lexicons=lexicons)
+        print(f"{res['added']:,} filings counted, {res['unchanged']:,} unchanged, {res['errors']:,} errors "
+              f"in {time.perf_counter() - t0:.1f}s; {res['terms']:,} terms", file=sys.stderr)
+        return
+    if args.cmd == 'compact':
+        print(tm.compact())
+        return
+    if args.cmd == 'stats':
+        print(tm.stats())
+        return
+    if args.cmd == 'scores':
+        table = tm.category_scores(lexicons, args.company, by=None if args.per_filing else ('company', 'year'))
+    elif args.cmd == 'yoy':
+        table = tm.yoy(lexicons, args.company)
+    elif args.cmd == 'top':
+        table = tm.top_terms(args.n, args.company, args.year, args.category, lexicons)
+    elif args.cmd == 'trend':
+        table = tm.term_trend(args.terms, args.company)
+    else:
+        table = tm.movers(args.year, args.company, args.n, args.min_count)
+    with pd.option_context('display.max_rows', 200, 'display.width', 200, 'display.float_format', '{:.3f}'.format):
+        print(table.to_string(index=False))
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+import numpy as np
+
+from scoring import INPUT_FIELDS, DEFAULT_INPUTS, VERDICT_LABELS, Q_SAFE, score_arrays
+from utils import safe_div_array
+
+# --- MULTI-YEAR TREND ENGINE ---
+# Panel mode for the financial scores: one row per company-year (e.g. a long
+# Screener export with 10 years per company). Rows are sorted once by
+# (company, year) so every company is a contiguous run; previous-year values,
+# rolling windows and streaks are then computed with shifted / cumulative
+# arrays over the whole panel, with no per-company or per-year Python loop.
+
+DEFAULT_WINDOW = 3  # fiscal years per rolling window (gaps in the reported years count)
+
+TREND_FIELDS = ['z_roll', 'z_change', 'dsri_roll', 'sgi_roll', 'q_roll', 'q_weak_streak']
+
+
+def _runs(codes):
+    # codes sorted: first-row flag and start index of each row's company run
+    n = len(codes)
+    first = np.ones(n, dtype=bool)
+    first[1:] = codes[1:] != codes[:-1]
+    start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+    return first, start
+
+
+def _prev(values, has_prev):
+    out = np.full(len(values), np.nan)
+    out[1:] = values[:-1]
+    return np.where(has_prev, out, np.nan)
+
+
+def _window_start(years, start, window):
+    # First row of the same company within `window` fiscal years of each row (years
+    # sorted per company; an undated row only covers itself). At most `window` rows
+    # qualify, so this is `window` vectorized passes rather than a per-row search.
+    idx = np.arange(len(years))
+    lo = idx.copy()
+    for k in range(window - 1, 0, -1):
+        j = np.maximum(idx - k, 0)
+        ok = (idx - k >= start) & (years - years[j] < window) & (lo == idx)
+        lo = np.where(ok, j, lo)
+    return lo
+
+
+def rolling_sum(values, start, window, years):
+    # Sum over the company's rows in the last `window` fiscal years (NaNs skipped) + observation count
+    valid = ~np.isnan(values)
+    cs = np.concatenate([[0.0], np.cumsum(np.where(valid, values, 0.0))])
+    cn = np.concatenate([[0], np.cumsum(valid)])
+    hi = np.arange(1, len(values) + 1)
+    lo = _window_start(years, start, window)
+    return cs[hi] - cs[lo], cn[hi] - cn[lo]
+
+
+def rolling_mean(values, start, window, years):
+    total, count = rolling_sum(values, start, window, years)
+    return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+
+def streak(flags, restart):
+    # Consecutive True rows ending at each row, restarting where `restart` is set
+    # (first year of a company, or after a gap in its reported years)
+    idx = np.arange(len(flags))
+    reset = np.where(~flags, idx, np.where(restart, idx - 1, -1))
+    return idx - np.maximum.accumulate(reset)
+
+
+def panel_scores(df, window=DEFAULT_WINDOW):
+    # df: 'company', 'year' + INPUT_FIELDS (rev_py / rec_py may be missing: they are
+    # taken from the same company's previous year). Returns a new frame sorted by
+    # company and year with the scores, the verdict and TREND_FIELDS.
+    import pandas as pd
+    if 'company' not in df.columns or 'year' not in df.columns:
+        raise KeyError("Trend mode needs 'company' and 'year' columns")
+    codes, _ = pd.factorize(df['company'].astype(str))
+    years = pd.to_numeric(df['year'].astype(str).str[:4], errors='coerce').to_numpy(dtype=np.float64)
+    order = np.lexsort((years, codes))
+    codes, years = codes[order], years[order]
+    cols = {}
+    for f in INPUT_FIELDS:
+        col = df[f] if f in df.columns else pd.Series(np.nan, index=df.index)
+        cols[f] = col.to_numpy(dtype=np.float64, na_value=np.nan)[order]
+
+    first, start = _runs(codes)
+    # Year-over-year only between consecutive fiscal years of the same company
+    has_prev = ~first & (_prev(years, ~first) == years - 1)
+    for py, cy in (('rev_py', 'rev_cy'), ('rec_py', 'rec_cy')):
+        cols[py] = np.where(np.isnan(cols[py]), _prev(cols[cy], has_prev), cols[py])
+
+    res = score_arrays(**cols)
+    codes_v = res.pop('verdict_code')
+    z = res['z_score']
+    res['z_roll'] = rolling_mean(z, start, window, years)
+    res['z_change'] = z - _prev(z, has_prev)
+    res['dsri_roll'] = rolling_mean(res['dsri'], start, window, years)
+    res['sgi_roll'] = rolling_mean(res['sgi'], start, window, years)
+    # Persistence: cumulative CFO over cumulative profit across the window, and the
+    # run of consecutive years where profit was not backed by cash
+    cfo_sum, _ = rolling_sum(cols['cfo'], start, window, years)
+    ni_sum, _ = rolling_sum(cols['ni'], start, window, years)
+    res['q_roll'] = safe_div_array(cfo_sum, ni_sum)
+    res['q_weak_streak'] = streak(res['q_ratio'] < Q_SAFE, ~has_prev)
+
+    out = df.iloc[order].reset_index(drop=True)
+    out['year'] = pd.Series(years).astype('Int64')
+    for f in ('rev_py', 'rec_py'):
+        out[f] = cols[f]
+    for k, v in res.items():
+        out[k] = v
+    out['verdict'] = pd.Categorical.from_codes(codes_v, categories=VERDICT_LABELS)
+    return out
+
+
+def latest_year(panel):
+    # Last reported year per company (panel is sorted by company, year)
+    return panel.groupby('company', sort=False).tail(1).reset_index(drop=True)
+
+
+def demo_panel(years=10, seed=7):
+    # Small deterministic panel built around the sample company, for the trend view
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    profiles = {
+        'Sample Co': (0.08, 0.00, 1.3),          # steady grower, cash-backed profits
+        'Receivables Drift Ltd': (0.15, 0.12, 0.7),  # growth with receivables piling up
+        'Leverage Slide Inc': (0.02, 0.02, 0.9),
+    }
+    frames = []
+    last_year = 2025
+    for name, (growth, rec_drift, cash_ratio) in profiles.items():
+        t = np.arange(years)
+        scale = (1 + growth) ** (t - years + 1) * rng.lognormal(0, 0.03, years)
+        data = {f: DEFAULT_INPUTS[f] * scale for f in INPUT_FIELDS if f not in ('rev_py', 'rec_py')}
+        data['rec_cy'] = data['rec_cy'] * (1 + rec_drift) ** t
+        data['cfo'] = data['ni'] * cash_ratio * rng.lognormal(0, 0.1, years)
+        if name == 'Leverage Slide Inc':
+            data['tl'] = data['tl'] * (1.25 ** t)
+            data['re'] = data['re'] * (0.85 ** t)
+            data['mve'] = data['mve'] * (0.8 ** t)
+        frame = pd.DataFrame(data)
+        frame.insert(0, 'year', (last_year - years + 1 + t).astype(str))
+        frame.insert(0, 'company', name)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    import pandas as pd
+    parser = argparse.ArgumentParser(description="Rolling multi-year scores for a company-year panel")
+    parser.add_argument('source', nargs='?', help="long Screener-style CSV/XLSX export (omit to time a synthetic panel)")
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--companies', type=int, default=5000, help="synthetic panel size")
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+    if args.source:
+        from utils import parse_screener_csv
+        df = pd.concat(parse_screener_csv(args.source), ignore_index=True)
+    else:
+        rng = np.random.default_rng(0)
+        n = args.companies * args.years
+        df = pd.DataFrame({f: DEFAULT_INPUTS[f] * rng.lognormal(0, 0.5, n) for f in INPUT_FIELDS})
+        df.insert(0, 'year', np.tile(np.arange(2025 - args.years + 1, 2026), args.companies).astype(str))
+        df.insert(0, 'company', np.repeat([f'C{i}' for i in range(args.companies)], args.years))
+        df = df.sample(frac=1, random_state=0)
+    t0 = time.perf_counter()
+    panel = panel_scores(df, args.window)
+    print(f"{len(panel):,} company-years in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    print(latest_year(panel)[['company', 'year', 'z_score', 'z_roll', 'dsri_roll', 'q_roll', 'q_weak_streak', 'verdict']].head(10).to_string())
@@ -1,5 +1,8 @@
 import streamlit as st
 
+# numpy / pandas are imported inside the functions that need them: app.py imports
+# this module on every page, including ones that never touch them.
+
 def inject_custom_css():
     st.markdown("""
     <style>
@@ -44,6 +47,7 @@ def inject_custom_css():
         /* Highlighting */
         .risk-high {background-color: rgba(255, 82, 82, 0.2); color: #ff5252; padding: 2px 8px; border-radius: 4px; border: 1px solid #ff5252;}
         .risk-med {background-color: rgba(255, 215, 0, 0.2); color: #ffd700; padding: 2px 8px; border-radius: 4px; border: 1px solid #ffd700;}
+        .recycled {background-color: rgba(0, 229, 255, 0.08); border-bottom: 1px dashed #00e5ff;}
         
         /* Headers */
         h1, h2, h3 {letter-spacing: 0.5px;}
@@ -80,6 +84,158 @@ def safe_div(n, d):
     except:
         return 0.0
 
-def parse_screener_csv(uploaded_file):
-    # (Keep your existing CSV logic here if you want, or leave it blank if using manual only)
-    pass
\ No newline at end of file
+def safe_div_array(n, d):
+    # Vectorized safe_div: element-wise n / d, with 0.0 wherever d == 0
+    import numpy as np
+    n = np.asarray(n, dtype=np.float64)
+    d = np.asarray(d, dtype=np.float64)
+    n, d = np.broadcast_arrays(n, d)
+    out = np.zeros(n.shape, dtype=np.float64)
+    np.divide(n, d, out=out, where=(d != 0))
+    return out
+
+# --- SCREENER IMPORT ---
+# Export headers (normalized: lowercase, alphanumerics only) -> financial view fields
+SCREENER_COLUMNS = {
+    'company': ['company', 'name', 'companyname', 'symbol', 'ticker', 'nsecode', 'bsecode'],
+    'sector': ['sector', 'industry', 'industrygroup'],
+    'year': ['year', 'fiscalyear', 'fy', 'reportdate', 'period'],
+    'rev_cy': ['revcy', 'revenue', 'sales', 'netsales', 'revenuecy', 'salescy', 'totalrevenue'],
+    'rev_py': ['revpy', 'revenuepy', 'salespy', 'salesprecedingyear', 'revenuepreviousyear', 'salesprevyear'],
+    'cogs': ['cogs', 'expenses', 'operatingexpenses', 'costofgoodssold', 'totalexpenses'],
+    'ni': ['ni', 'netincome', 'netprofit', 'pat', 'profitaftertax'],
+    'ta': ['ta', 'totalassets'],
+    'tl': ['tl', 'totalliabilities', 'liabilities'],
+    'ca': ['ca', 'currentassets', 'totalcurrentassets'],
+    'cl': ['cl', 'currentliabilities', 'totalcurrentliabilities'],
+    'rec_cy': ['reccy', 'receivables', 'tradereceivables', 'debtors', 'receivablescy'],
+    'rec_py': ['recpy', 'receivablespy', 'tradereceivablespy', 'debtorspy', 'receivablesprecedingyear'],
+    're': ['re', 'retainedearnings', 'reserves', 'reservesandsurplus'],
+    'mve': ['mve', 'marketvalueequity', 'marketcap', 'marketcapitalization', 'mcap'],
+    'cfo': ['cfo', 'operatingcashflow', 'cashfromoperatingactivity', 'cashfromoperations'],
+}
+NUMERIC_COLUMNS = [f for f in SCREENER_COLUMNS if f not in ('company', 'sector', 'year')]
+
+def _norm_header(h):
+    return ''.join(ch for ch in str(h).lower() if ch.isalnum())
+
+def map_screener_columns(headers):
+    # Returns {raw_header: field} for every header we recognise (first match wins)
+    lookup = {alias: field for field, aliases in SCREENER_COLUMNS.items() for alias in aliases}
+    mapping, taken = {}, set()
+    for h in headers:
+        field = lookup.get(_norm_header(h))
+        if field and field not in taken:
+            mapping[h] = field
+            taken.add(field)
+    return mapping
+
+def _clean_batch(df, mapping, carry):
+    import numpy as np
+    import pandas as pd
+    df = df.rename(columns=mapping)[list(mapping.values())]
+    for f in ('company', 'sector', 'year'):
+        if f in df.columns:
+            # missing cells stay empty, not the strings 'nan' / 'None'
+            df[f] = df[f].where(df[f].notna(), '').astype(str)
+    for f in NUMERIC_COLUMNS:
+        if f in df.columns:
+            col = df[f]
+            if not pd.api.types.is_numeric_dtype(col):
+                col = col.astype(str).str.replace(',', '', regex=False).str.strip()
+            df[f] = pd.to_numeric(col, errors='coerce').astype(np.float64)
+        else:
+            df[f] = np.nan
+
+    # Long-format exports (one row per company-year) usually lack the PY columns:
+    # fill them from the same company's previous year. Within a batch rows are
+    # matched in year order, whatever the export's row order. Across batches only
+    # each company's latest year is carried, so a previous year sitting in an
+    # earlier batch is found only when the export runs in ascending year order.
+    if 'company' in df.columns and 'year' in df.columns:
+        years = pd.to_numeric(df['year'].astype(str).str[:4], errors='coerce')
+        by_year = df.assign(_year=years).iloc[np.argsort(years.to_numpy(), kind='stable')]
+        grp = by_year.groupby('company', sort=False)
+        prev_year = grp['_year'].shift().reindex(df.index)
+        prev_rev = grp['rev_cy'].shift().reindex(df.index)
+        prev_rec = grp['rec_cy'].shift().reindex(df.index)
+
+        first = prev_year.isna()
+        if carry and first.any():
+            last = df.loc[first, 'company'].map(carry)
+            has = last.notna()
+            idx = last[has].index
+            prev_year[idx] = [v[0] for v in last[has]]
+            prev_rev[idx] = [v[1] for v in last[has]]
+            prev_rec[idx] = [v[2] for v in last[has]]
+
+        consecutive = prev_year == (years - 1)
+        df['rev_py'] = df['rev_py'].mask(df['rev_py'].isna() & consecutive, prev_rev)
+        df['rec_py'] = df['rec_py'].mask(df['rec_py'].isna() & consecutive, prev_rec)
+
+        tail = by_year[by_year['_year'].notna()].groupby('company', sort=False).tail(1)
+        for c, y, rev, rec in zip(tail['company'], tail['_year'], tail['rev_cy'], tail['rec_cy']):
+            if c not in carry or carry[c][0] < y:
+                carry[c] = (y, rev, rec)
+    return df.reset_index(drop=True)
+
+def _iter_xlsx(source, chunksize):
+    import pandas as pd
+    from openpyxl import load_workbook
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        headers = None
+        for row in rows:
+            if row and any(v is not None for v in row):
+                headers = [str(v) if v is not None else '' for v in row]
+                break
+        if headers is None:
+            return
+        # read-only rows can be ragged (trailing empty cells dropped): pad / cut to the header
+        n = len(headers)
+        buf = []
+        for row in rows:
+            if not row or all(v is None for v in row):
+                continue
+            buf.append(row[:n] + (None,) * (n - len(row)))
+            if len(buf) >= chunksize:
+                yield pd.DataFrame(buf, columns=headers)
+                buf = []
+        if buf:
+            yield pd.DataFrame(buf, columns=headers)
+    finally:
+        wb.close()
+
+def parse_screener_csv(uploaded_file, chunksize=50000):
+    # Streams a Screener-style CSV/XLSX export (path or file-like, e.g. st.file_uploader)
+    # and yields DataFrames of at most `chunksize` rows, mapped onto the financial fields.
+    # Memory stays bounded by the chunk size, not the file size.
+    import pandas as pd
+    name = getattr(uploaded_file, 'name', uploaded_file)
+    is_xlsx = str(name).lower().endswith(('.xlsx', '.xlsm'))
+    carry = {}
+
+    if is_xlsx:
+        mapping = None
+        for raw in _iter_xlsx(uploaded_file, chunksize):
+            if mapping is None:
+                mapping = map_screener_columns(raw.columns)
+                if not mapping:
+                    raise ValueError("No recognised financial columns in uploaded file.")
+            yield _clean_batch(raw, mapping, carry)
+        return
+
+    header = pd.read_csv(uploaded_file, nrows=0).columns
+    if hasattr(uploaded_file, 'seek'):
+        uploaded_file.seek(0)
+    mapping = map_screener_columns(header)
+    if not mapping:
+        raise ValueError("No recognised financial columns in uploaded file.")
+
+    reader = pd.read_csv(uploaded_file, chunksize=chunksize, usecols=list(mapping),
+                         dtype={h: str for h, f in mapping.items() if f in ('company', 'sector', 'year')},
+                         thousands=',', low_memory=True)
+    with reader:
+        for raw in reader:
+            yield _clean_batch(raw, mapping, carry)
\ No newline at end of file
@@ -1,231 +1,277 @@
 import streamlit as st
 import plotly.graph_objects as go
-from utils import safe_div
+from scoring import z_status, m_status, q_status, VERDICTS
+import report_blocks
+from report_blocks import CARD_CSS, make_card, verdict_html, z_breakdown_html, m_breakdown_html
+from metric_graph import session_graph
+from instrumentation import span, fragment_trace
+from peer_index import PeerIndex, DEFAULT_DIR as PEER_INDEX_DIR
+from simulation import DISTRIBUTIONS, DEFAULT_UNCERTAINTY, summarize
+
+# --- CACHED COMPUTATIONS (reused across reruns with unchanged inputs) ---
+# Scores come from the per-session metric graph (metric_graph.py): a sidebar edit
+# only recomputes the nodes downstream of it, and the HTML blocks (report_blocks.py)
+# are only rebuilt when a node they read has changed.
+
+@st.cache_resource(ttl=3600, show_spinner=False)
+def load_peer_index(path):
+    # None until an index has been built (python peer_index.py export.csv)
+    try:
+        return PeerIndex(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+# Figures are cached as shared objects (cache_resource) to skip the pickle round-trip;
+# treat them as read-only.
+build_radar_figure = st.cache_resource(max_entries=256, ttl=3600, show_spinner=False)(
+    report_blocks.build_radar_figure)
+
+# --- MONTE CARLO SENSITIVITY ---
+SIM_LABELS = {
+    'rev_cy': "Revenue (CY)", 'rev_py': "Revenue (PY)", 'cogs': "COGS / Op. Expenses", 'ni': "Net Income",
+    'ta': "Total Assets", 'tl': "Total Liabilities", 'ca': "Current Assets", 'cl': "Current Liabilities",
+    'rec_cy': "Receivables (CY)", 'rec_py': "Receivables (PY)", 're': "Retained Earnings",
+    'mve': "Market Value Equity", 'cfo': "Operating Cash Flow",
+}
+SIM_METRICS = {'z_score': "Z-Score", 'm_score': "M-Score", 'q_ratio': "CFO/NI"}
+
+@st.cache_data(max_entries=64, ttl=3600, show_spinner="Simulating...")
+def run_simulation(inputs, uncertainty, n, seed):
+    return summarize(inputs, uncertainty, n, seed)
+
+@st.cache_resource(max_entries=64, ttl=3600, show_spinner=False)
+def simulation_figures(key, metric, point, _summary):
+    # key: hashable identity of the run (inputs, uncertainty, draws, seed); point: score at the inputs
+    verdicts = _summary['verdicts']
+    colors = [c for _, c, _ in VERDICTS]
+    odds = go.Figure(go.Bar(x=[p * 100 for p in verdicts.values()], y=list(verdicts), orientation='h',
+                            marker_color=colors, text=[f"{p:.1%}" for p in verdicts.values()], textposition='auto'))
+    odds.update_layout(height=250, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                       font=dict(color='white'), margin=dict(l=10, r=10, t=30, b=10),
+                       title="Verdict probability", xaxis=dict(range=[0, 100], ticksuffix='%', gridcolor='#333'),
+                       yaxis=dict(autorange='reversed'))
+
+    # Tornado: score at the P5 / P95 value of each uncertain input, widest swing on top
+    rows = sorted(_summary['tornado'], key=lambda r: abs(r[3][metric][1] - r[3][metric][0]))
+    tornado = go.Figure()
+    for side, color in ((0, '#ff5252'), (1, '#00e676')):
+        tornado.add_trace(go.Bar(
+            y=[SIM_LABELS[r[0]] for r in rows], x=[r[3][metric][side] - point for r in rows], base=point,
+            orientation='h', marker_color=color, name="P5 input" if side == 0 else "P95 input",
+            customdata=[r[1 + side] for r in rows],
+            hovertemplate="input %{customdata:,.0f}<br>score %{x:.2f}<extra></extra>"))
+    tornado.add_vline(x=point, line=dict(color='white', width=1))
+    tornado.update_layout(barmode='overlay', height=250, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                          font=dict(color='white'), margin=dict(l=10, r=10, t=30, b=10),
+                          title=f"{SIM_METRICS[metric]} sensitivity", xaxis=dict(gridcolor='#333'),
+                          legend=dict(orientation='h', y=-0.2))
+
+    hist = _summary[metric]
+    dist = go.Figure()
+    if hist:
+        edges = hist['edges']
+        dist.add_trace(go.Bar(x=[(a + b) / 2 for a, b in zip(edges, edges[1:])], y=hist['counts'],
+                              marker_color='#00e5ff', opacity=0.7))
+        for q in ('p5', 'p50', 'p95'):
+            dist.add_vline(x=hist[q], line=dict(color='white', width=1, dash='dot' if q != 'p50' else 'solid'))
+    dist.update_layout(height=250, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                       font=dict(color='white'), margin=dict(l=10, r=10, t=30, b=10), bargap=0,
+                       title=f"{SIM_METRICS[metric]} distribution", xaxis=dict(gridcolor='#333'),
+                       yaxis=dict(showticklabels=False))
+    return odds, tornado, dist
+
+# Own fragment (nested in the dashboard): editing the uncertainty table, the draws or the
+# toggle reruns only this panel
+@st.fragment
+def show_simulation(inputs, scores):
+    with fragment_trace("financial.simulation"):
+        st.caption("Draw perturbed versions of the inputs above and score every draw at once: "
+                   "how likely is each verdict, and which input moves the scores most?")
+        import pandas as pd
+        table = pd.DataFrame({
+            'Input': list(SIM_LABELS.values()),
+            'Distribution': [DEFAULT_UNCERTAINTY.get(f, ('normal', 0))[0] for f in SIM_LABELS],
+            'Spread %': [DEFAULT_UNCERTAINTY.get(f, ('normal', 0))[1] * 100 for f in SIM_LABELS],
+        })
+        c_table, c_opts = st.columns([2, 1])
+        with c_table:
+            edited = st.data_editor(table, hide_index=True, use_container_width=True, key="mc_uncertainty",
+                                    disabled=['Input'],
+                                    column_config={
+                                        'Distribution': st.column_config.SelectboxColumn(options=DISTRIBUTIONS, required=True),
+                                        'Spread %': st.column_config.NumberColumn(min_value=0.0, max_value=100.0, step=1.0,
+                                                                                  help="relative spread; 0 = fixed"),
+                                    })
+        with c_opts:
+            n = st.select_slider("Draws", options=[10_000, 100_000, 1_000_000], value=100_000,
+                                 format_func=lambda v: f"{v:,}")
+            seed = int(st.number_input("Seed", value=0, step=1))
+            metric = st.radio("Sensitivity of", list(SIM_METRICS), format_func=SIM_METRICS.get, horizontal=True)
+            run = st.toggle("Run simulation", value=False)
+        if not run:
+            return
+
+        uncertainty = {f: (d, s / 100.0) for f, d, s in zip(SIM_LABELS, edited['Distribution'], edited['Spread %'])
+                       if s and s > 0}
+        if not uncertainty:
+            st.info("Give at least one input a spread above 0%.")
+            return
+        with span("simulation"):
+            summary = run_simulation(inputs, uncertainty, n, seed)
+        key = (tuple(inputs.values()), tuple(sorted(uncertainty.items())), n, seed)
+        with span("figure.simulation"):
+            odds, tornado, dist = simulation_figures(key, metric, scores[metric], summary)
+        with span("chart.simulation"):
+            s1, s2, s3 = st.columns(3)
+            s1.plotly_chart(odds, use_container_width=True)
+            s2.plotly_chart(tornado, use_container_width=True)
+            s3.plotly_chart(dist, use_container_width=True)
+
+# Own fragment (nested in the dashboard): switching the peer sector / year reruns only
+# the benchmark and the radar. Scores are read from the session's metric graph, which
+# the dashboard has already updated.
+@st.fragment
+def show_peer_radar():
+    with fragment_trace("financial.peers"):
+        graph = session_graph(st.session_state)
+        z_score, m_score, q_ratio = graph['z_score'], graph['m_score'], graph['q_ratio']
+
+        with st.expander("Peer Benchmark", expanded=False):
+            peer_index = load_peer_index(PEER_INDEX_DIR)
+            if peer_index is None:
+                st.caption("No peer index yet. Build one with `python peer_index.py export.csv`.")
+                sector = year = None
+            else:
+                p1, p2 = st.columns(2)
+                sector = p1.selectbox("Sector", peer_index.sectors())
+                year = p2.selectbox("Year", ["*"] + peer_index.years(sector)[::-1],
+                                    format_func=lambda y: "All years" if y == "*" else y)
+
+        # Peer percentiles (binary search in the precomputed sector/year index)
+        def peer_lookup():
+            peer_text, peer_bands = "", None
+            if sector is not None:
+                n_peers, used = peer_index.group_size(sector, year)
+                group = (used or "").replace("|*", " (all years)").replace("|", " ").replace("* (all years)", "all companies")
+                pcts = []
+                for metric, val in (('z_score', z_score), ('m_score', m_score), ('q_ratio', q_ratio)):
+                    pct = peer_index.percentile(metric, sector, year, val)
+                    if pct is not None:
+                        pcts.append(f"{SIM_METRICS[metric]} P{pct:.0f}")
+                if pcts:
+                    peer_text = f"{' · '.join(pcts)} vs {n_peers:,} {group} peers"
+                bands = [peer_index.bands(m, sector, year) for m in ('z_score', 'm_score', 'q_ratio')]
+                if all(bands):
+                    peer_bands = tuple(zip(*bands))
+            return peer_text, peer_bands
+        with span("peers"):
+            peer_text, peer_bands = graph.view('peers', ['z_score', 'm_score', 'q_ratio'], peer_lookup,
+                                               extra=(id(peer_index), sector, year))
+        if peer_text:
+            st.caption(peer_text)
+
+        with span("figure.radar"):
+            fig = graph.view('radar', ['z_score', 'm_score', 'q_ratio'],
+                             lambda: build_radar_figure(z_score, m_score, q_ratio, peer_bands), extra=peer_bands)
+        with span("chart.radar"):
+            st.plotly_chart(fig, use_container_width=True)
 
 def show_financial_phase():
     # --- 1. CSS FOR HIGH VISIBILITY & CARDS ---
-    st.markdown("""
-    <style>
-        /* Increase global font size */
-        p, .stMarkdown, li, div {
-            font-size: 18px !important;
-        }
-        
-        /* Custom Score Cards */
-        .score-card {
-            background: linear-gradient(145deg, #161b22, #0d1117);
-            padding: 20px;
-            border-radius: 10px;
-            border: 1px solid #333;
-            text-align: center;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-            margin-bottom: 10px;
-        }
-        .score-val {
-            font-size: 36px !important;
-            font-weight: 700;
-            margin: 10px 0;
-            text-shadow: 0 0 10px rgba(255,255,255,0.1);
-        }
-        .score-label {
-            font-size: 16px !important;
-            color: #8b949e;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        
-        /* Status Colors */
-        .safe {color: #00e676; border-bottom: 3px solid #00e676;}
-        .risk {color: #ff5252; border-bottom: 3px solid #ff5252;}
-        .warn {color: #ffab00; border-bottom: 3px solid #ffab00;}
-        
-        /* Table/Grid styling */
-        .metric-row {
-            display: flex; justify-content: space-between;
-            padding: 12px 0;
-            border-bottom: 1px solid #333;
-            font-size: 16px !important;
-        }
-        .metric-row:last-child {border-bottom: none;}
-    </style>
-    """, unsafe_allow_html=True)
+    with span("css.financial"):
+        st.markdown(CARD_CSS, unsafe_allow_html=True)
 
     st.markdown("## 💎 Phase 1: Forensic Triangulation Model")
-    
-    # --- 2. SIDEBAR INPUTS ---
-    with st.sidebar:
-        st.header("1. Financial Inputs (₹ Cr)")
-        st.info("Preloaded sample data. Adjust as per requirement.")
+
+    # Sidebar inputs and everything computed from them form one fragment: editing a
+    # number reruns the dashboard only, not app.py (header, navigation, CSS)
+    financial_dashboard()
+
+@st.fragment
+def financial_dashboard():
+    with fragment_trace("financial.dashboard"):
+        # --- 2. SIDEBAR INPUTS ---
+        with st.sidebar:
+            st.header("1. Financial Inputs (₹ Cr)")
+            st.info("Preloaded sample data. Adjust as per requirement.")
         
-        with st.expander("Profit & Loss", expanded=True):
-            rev_cy = st.number_input("Revenue (CY)", value=162990.0)
-            rev_py = st.number_input("Revenue (PY)", value=153670.0)
-            cogs = st.number_input("COGS / Op. Expenses", value=123754.0)
-            ni = st.number_input("Net Income", value=26713.0)
-            ebit = rev_cy - cogs
-
-        with st.expander("Balance Sheet", expanded=False):
-            ta = st.number_input("Total Assets", value=147795.0)
-            tl = st.number_input("Total Liabilities", value=51977.0)
-            ca = st.number_input("Current Assets", value=95000.0) 
-            cl = st.number_input("Current Liabilities", value=43750.0)
-            rec_cy = st.number_input("Receivables (CY)", value=31158.0)
-            rec_py = st.number_input("Receivables (PY)", value=30193.0)
-            re = st.number_input("Retained Earnings", value=93745.0)
-            mve = st.number_input("Market Value Equity", value=667000.0) 
-
-        with st.expander("Cash Flow", expanded=False):
-            cfo = st.number_input("Operating Cash Flow", value=35694.0)
-
-    # --- 3. CALCULATIONS ---
-    # Z-Score Components
-    wc = ca - cl
-    A = safe_div(wc, ta)
-    B = safe_div(re, ta)
-    C = safe_div(ebit, ta)
-    D = safe_div(mve, tl)
-    E = safe_div(rev_cy, ta)
-    z_score = (1.2*A) + (1.4*B) + (3.3*C) + (0.6*D) + (1.0*E)
-
-    # M-Score Components
-    dsri = safe_div(safe_div(rec_cy, rev_cy), safe_div(rec_py, rev_py))
-    sgi = safe_div(rev_cy, rev_py)
-    m_score = -4.84 + (0.92 * dsri) + (0.71 * sgi)
-
-    # Quality Ratio
-    q_ratio = safe_div(cfo, ni)
-
-    # --- 4. TOP ROW: PROMINENT SCORE CARDS ---
-    c1, c2, c3 = st.columns(3)
+            with st.expander("Profit & Loss", expanded=True):
+                rev_cy = st.number_input("Revenue (CY)", value=162990.0)
+                rev_py = st.number_input("Revenue (PY)", value=153670.0)
+                cogs = st.number_input("COGS / Op. Expenses", value=123754.0)
+                ni = st.number_input("Net Income", value=26713.0)
+
+            with st.expander("Balance Sheet", expanded=False):
+                ta = st.number_input("Total Assets", value=147795.0)
+                tl = st.number_input("Total Liabilities", value=51977.0)
+                ca = st.number_input("Current Assets", value=95000.0) 
+                cl = st.number_input("Current Liabilities", value=43750.0)
+                rec_cy = st.number_input("Receivables (CY)", value=31158.0)
+                rec_py = st.number_input("Receivables (PY)", value=30193.0)
+                re = st.number_input("Retained Earnings", value=93745.0)
+                mve = st.number_input("Market Value Equity", value=667000.0) 
+
+            with st.expander("Cash Flow", expanded=False):
+                cfo = st.number_input("Operating Cash Flow", value=35694.0)
+
+        # --- 3. CALCULATIONS ---
+        # Z-Score, M-Score & Quality Ratio via the incremental metric graph
+        graph = session_graph(st.session_state)
+        with span("scores"):
+            graph.update(dict(rev_cy=rev_cy, rev_py=rev_py, cogs=cogs, ni=ni, ta=ta, tl=tl, ca=ca, cl=cl,
+                              rec_cy=rec_cy, rec_py=rec_py, re=re, mve=mve, cfo=cfo))
+        scores = graph.values
+        z_score, m_score, q_ratio = scores['z_score'], scores['m_score'], scores['q_ratio']
+
+        # --- 4. TOP ROW: PROMINENT SCORE CARDS ---
+        c1, c2, c3 = st.columns(3)
     
-    # Helper to generate HTML card (Corrected Indentation)
-    def make_card(label, val, status, threshold_text):
-        color_class = "safe" if status == "Safe" else ("risk" if status == "Risk" else "warn")
-        val_color = '#00e676' if status=='Safe' else '#ff5252'
+        with c1:
+            st.markdown(graph.view('z_card', ['z_score'], lambda: make_card(
+                "Solvency (Z-Score)", f"{z_score:.2f}", str(z_status(z_score)), "Target > 3.0")),
+                unsafe_allow_html=True)
         
-        return f"""
-<div class="score-card {color_class}">
-<div class="score-label">{label}</div>
-<div class="score-val" style="color: {val_color}">{val}</div>
-<div style="font-size:14px; opacity:0.8;">{threshold_text}</div>
-</div>
-"""
-
-    with c1:
-        status = "Safe" if z_score > 3.0 else ("Risk" if z_score < 1.8 else "Warn")
-        st.markdown(make_card("Solvency (Z-Score)", f"{z_score:.2f}", status, "Target > 3.0"), unsafe_allow_html=True)
+        with c2:
+            st.markdown(graph.view('m_card', ['m_score'], lambda: make_card(
+                "Integrity (M-Score)", f"{m_score:.2f}", str(m_status(m_score)), "Target < -2.22")),
+                unsafe_allow_html=True)
         
-    with c2:
-        status = "Safe" if m_score < -2.22 else "Risk"
-        st.markdown(make_card("Integrity (M-Score)", f"{m_score:.2f}", status, "Target < -2.22"), unsafe_allow_html=True)
-        
-    with c3:
-        status = "Safe" if q_ratio > 1.0 else ("Risk" if q_ratio < 0.8 else "Warn")
-        st.markdown(make_card("Quality (CFO/NI)", f"{q_ratio:.2f}x", status, "Target > 1.0"), unsafe_allow_html=True)
+        with c3:
+            st.markdown(graph.view('q_card', ['q_ratio'], lambda: make_card(
+                "Quality (CFO/NI)", f"{q_ratio:.2f}x", str(q_status(q_ratio)), "Target > 1.0")),
+                unsafe_allow_html=True)
 
-    st.markdown("---")
+        st.markdown("---")
 
-    # --- 5. MIDDLE ROW: CHART & VERDICT ---
-    col_chart, col_verdict = st.columns([1.5, 1])
+        # --- 5. MIDDLE ROW: CHART & VERDICT ---
+        col_chart, col_verdict = st.columns([1.5, 1])
 
-    with col_chart:
-        st.subheader("📊 Forensic Radar View")
-        
-        # Normalize (0-100 scale)
-        n_z = min(max((z_score/3)*100, 0), 100)
-        n_m = min(max(((-2.0 - m_score)+5)*20, 0), 100) # Inverted
-        n_q = min(max(q_ratio*100, 0), 100)
-        
-        # Detailed Radar Chart
-        fig = go.Figure()
-        
-        # Green Safe Zone Overlay
-        fig.add_trace(go.Scatterpolar(
-            r=[100, 100, 100, 100],
-            theta=['Solvency', 'Integrity', 'Quality', 'Solvency'],
-            fill='toself', name='Safe Zone',
-            line=dict(color='rgba(0, 230, 118, 0.2)', width=0),
-            fillcolor='rgba(0, 230, 118, 0.1)'
-        ))
-        
-        # The Data Line
-        fig.add_trace(go.Scatterpolar(
-            r=[n_z, n_m, n_q, n_z],
-            theta=['Solvency', 'Integrity', 'Quality', 'Solvency'],
-            fill='toself', name='Target Co',
-            line=dict(color='#00e5ff', width=3),
-            fillcolor='rgba(0, 229, 255, 0.2)'
-        ))
-
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(visible=True, range=[0, 100], gridcolor='#333', tickfont=dict(color='gray')),
-                angularaxis=dict(gridcolor='#333', tickfont=dict(size=14, color='white')),
-                bgcolor='rgba(0,0,0,0)'
-            ),
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=350,
-            showlegend=False,
-            margin=dict(l=40, r=40, t=20, b=20)
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-    with col_verdict:
-        st.subheader("🤖 AI Auditor Verdict")
-        
-        # Logic Tree
-        if z_score < 1.8:
-            title = "CRITICAL RISK"; color = "#ff5252"; msg = "Company is mathematically insolvent."
-        elif m_score > -2.22:
-            title = "HIGH FRAUD RISK"; color = "#ff5252"; msg = "Earnings manipulation markers detected."
-        elif q_ratio < 0.8:
-            title = "QUALITY WARNING"; color = "#ffab00"; msg = "Profits are not backed by cash flow."
-        else:
-            title = "LOW RISK"; color = "#00e676"; msg = "Financial structure appears robust and honest."
-
-        st.markdown(f"""
-<div style="background-color: #1e2530; border-left: 5px solid {color}; padding: 20px; border-radius: 5px;">
-<h2 style="color:{color}; margin:0; font-size: 28px;">{title}</h2>
-<p style="margin-top:10px; font-size: 18px;">{msg}</p>
-</div>
-""", unsafe_allow_html=True)
-
-    # --- 6. BOTTOM ROW: DEEP DIVE DIAGNOSTICS (Fills Empty Space) ---
-    st.markdown("---")
-    st.subheader("🔍 Deep Dive Diagnostics")
+        with col_chart:
+            st.subheader("📊 Forensic Radar View")
+            show_peer_radar()
+
+        with col_verdict:
+            st.subheader("🤖 AI Auditor Verdict")
+            st.markdown(graph.view('verdict', ['verdict'], lambda: verdict_html(scores['verdict'])), unsafe_allow_html=True)
+
+        # --- 6. BOTTOM ROW: DEEP DIVE DIAGNOSTICS (Fills Empty Space) ---
+        st.markdown("---")
+        st.subheader("🔍 Deep Dive Diagnostics")
     
-    d1, d2 = st.columns(2)
+        d1, d2 = st.columns(2)
     
-    with d1:
-        st.markdown("**Z-Score Breakdown (Solvency Drivers)**")
-        st.markdown(f"""
-<div style="background-color: #0d1117; padding: 15px; border-radius: 8px;">
-<div class="metric-row"><span>Liquidity (A)</span> <span style="color:#00e5ff">{A:.2f}</span></div>
-<div class="metric-row"><span>Retained Earnings (B)</span> <span style="color:#00e5ff">{B:.2f}</span></div>
-<div class="metric-row"><span>Op. Efficiency (C)</span> <span style="color:#00e5ff">{C:.2f}</span></div>
-<div class="metric-row"><span>Market Leverage (D)</span> <span style="color:#00e5ff">{D:.2f}</span></div>
-<div class="metric-row"><span>Asset Turnover (E)</span> <span style="color:#00e5ff">{E:.2f}</span></div>
-</div>
-""", unsafe_allow_html=True)
+        with d1:
+            st.markdown("**Z-Score Breakdown (Solvency Drivers)**")
+            st.markdown(graph.view('z_breakdown', ['A', 'B', 'C', 'D', 'E'],
+                                   lambda: z_breakdown_html(*(scores[k] for k in 'ABCDE'))), unsafe_allow_html=True)
         
-    with d2:
-        st.markdown("**M-Score Breakdown (Fraud Flags)**")
-        # Check colors
-        dsri_col = '#ff5252' if dsri > 1.1 else '#00e5ff'
-        sgi_col = '#ff5252' if sgi > 1.2 else '#00e5ff'
-        
-        st.markdown(f"""
-<div style="background-color: #0d1117; padding: 15px; border-radius: 8px;">
-<div class="metric-row">
-<span>DSRI (Receivables Growth)</span> 
-<span style="color:{dsri_col}">{dsri:.2f}x</span>
-</div>
-<div style="font-size:14px; color:gray; margin-bottom:10px;">*If > 1.0, receivables growing faster than sales.*</div>
-
-<div class="metric-row">
-<span>SGI (Sales Growth)</span> 
-<span style="color:{sgi_col}">{sgi:.2f}x</span>
-</div>
-<div style="font-size:14px; color:gray;">*If > 1.2, pressure to manipulate increases.*</div>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+        with d2:
+            st.markdown("**M-Score Breakdown (Fraud Flags)**")
+            st.markdown(graph.view('m_breakdown', ['dsri', 'sgi'],
+                                   lambda: m_breakdown_html(scores['dsri'], scores['sgi'])), unsafe_allow_html=True)
+
+        # --- 7. MONTE CARLO SENSITIVITY ---
+        st.markdown("---")
+        with st.expander("🎲 Monte Carlo Sensitivity (uncertain inputs)", expanded=False):
+            show_simulation(dict(rev_cy=rev_cy, rev_py=rev_py, cogs=cogs, ni=ni, ta=ta, tl=tl, ca=ca, cl=cl,
+                                 rec_cy=rec_cy, rec_py=rec_py, re=re, mve=mve, cfo=cfo), scores)
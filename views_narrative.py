@@ -1,6 +1,127 @@
+import hashlib
+import os
+import tempfile
 import streamlit as st
 import plotly.graph_objects as go
-import re
+from analysis import analyze_narrative
+from extract import extract_text
+from lexicon import scan
+from result_store import content_key, default_store, exact_key
+from xray import XRayIndex
+from sentence_fog import SentenceProfile, DEFAULT_WINDOW
+from similarity import default_index, overlap_summary
+from instrumentation import span, fragment_trace
+import report_blocks
+
+# --- CACHED COMPUTATIONS (reused across reruns with unchanged inputs) ---
+def text_digest(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# Keyed on the text hash only: the leading underscore stops Streamlit hashing the full text again.
+# Misses fall through to the persistent result store shared by all sessions and restarts.
+@st.cache_data(max_entries=64, ttl=3600, show_spinner=False)
+def analyze_text(digest, _raw_text):
+    metrics = _stored(_raw_text, 'metrics', lambda: analyze_narrative(_raw_text))
+    return metrics['fog'], metrics['hits']
+
+# Uploaded reports: extracted once per file content (pages stream through the section
+# detector, only the MD&A / Directors' Report is kept). Workers read from a temp copy.
+@st.cache_data(max_entries=8, ttl=3600, show_spinner="Extracting report text...")
+def extract_upload(digest, name, sections, _data):
+    suffix = os.path.splitext(name)[1].lower()
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(_data)
+        return extract_text(path, sections=sections)
+    finally:
+        os.remove(path)
+
+# The X-Ray index (match offsets + page breaks) is shared, not copied, between reruns;
+# pages are rendered from it on demand.
+@st.cache_resource(max_entries=16, ttl=3600, show_spinner=False)
+def xray_index(digest, _raw_text):
+    # Offsets into this exact text: stored under the exact-text key, not the normalized one
+    matches = _stored(_raw_text, 'matches', lambda: scan(_raw_text)[0], key=exact_key(_raw_text))
+    return XRayIndex(_raw_text, matches)
+
+@st.cache_resource(max_entries=8, ttl=3600, show_spinner=False)
+def sentence_profile(digest, _raw_text):
+    return SentenceProfile(_raw_text)
+
+@st.cache_resource(max_entries=64, ttl=3600, show_spinner=False)
+def fog_heatmap(digest, page, smooth, _profile, _xray):
+    # One cell per sentence, in reading order; the X-Ray page on screen is outlined
+    import numpy as np
+    n = len(_profile)
+    width = max(int(np.ceil(np.sqrt(n * 0.75))), 1)
+    rows = -(-n // width)
+    fog = _profile.rolling_fog(DEFAULT_WINDOW) if smooth else _profile.fog
+    z = np.full(rows * width, np.nan, dtype=np.float32)
+    z[:n] = fog
+    idx = np.arange(rows * width).reshape(rows, width)
+    pages = np.searchsorted(_xray.bounds, _profile.sentence_start, side='right')
+    hover_page = np.zeros(rows * width, dtype=np.int32)
+    hover_page[:n] = pages
+    fig = go.Figure(go.Heatmap(
+        z=z.reshape(rows, width), customdata=np.dstack([idx + 1, hover_page.reshape(rows, width)]),
+        zmin=0, zmax=30, showscale=False,
+        colorscale=[[0, '#1e2530'], [14 / 30, '#2d333b'], [18 / 30, '#ffab00'], [1, '#ff5252']],
+        hovertemplate="Sentence %{customdata[0]}<br>Page %{customdata[1]}<br>Fog %{z:.1f}<extra></extra>"))
+    if _xray.pages > 1:
+        first, last = np.searchsorted(_profile.sentence_start, [_xray.bounds[page], _xray.bounds[page + 1]])
+        if last > first:
+            fig.add_shape(type='rect', x0=-0.5, x1=width - 0.5, y0=first // width - 0.5, y1=(last - 1) // width + 0.5,
+                          line=dict(color='#00e5ff', width=2))
+    fig.update_layout(height=240, margin=dict(l=0, r=0, t=0, b=0), paper_bgcolor='rgba(0,0,0,0)',
+                      plot_bgcolor='rgba(0,0,0,0)', xaxis=dict(visible=False),
+                      yaxis=dict(visible=False, autorange='reversed'))
+    return fig
+
+# Keyed on the library version too, so filings added since are picked up
+@st.cache_data(max_entries=64, ttl=3600, show_spinner=False)
+def recycled_passages(digest, library_version, _raw_text):
+    index = default_index()
+    return index.query(_raw_text) if index else []
+
+def _add_to_library(raw_text):
+    name = st.session_state.get("library_name") or "Untitled filing"
+    added = default_index().add(name, raw_text)
+    st.session_state["library_msg"] = (f"Added '{name}' ({added} passages)." if added
+                                       else "This report is already in the library.")
+
+def _stored(text, field, compute, key=None):
+    store = default_store()
+    key = key or content_key(text)
+    entry = (store.get(key) if store else None) or {}
+    if field not in entry:
+        entry[field] = compute()
+        if store:
+            store.put(key, entry)
+    return entry[field]
+
+def _goto_page(page):
+    st.session_state["xray_page"] = page + 1
+
+# Figures are cached as shared objects (cache_resource) to skip the pickle round-trip;
+# treat them as read-only.
+fog_gauge = st.cache_resource(max_entries=128, ttl=3600, show_spinner=False)(report_blocks.fog_gauge)
+
+@st.cache_resource(max_entries=32, ttl=3600, show_spinner=False)
+def risk_gauge(score):
+    # Gauge for Simulation - FIXED VISIBILITY
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number", value = score,
+        title = {'text': "Deception Risk Score", 'font': {'size': 24, 'color': 'white'}}, # FORCE WHITE
+        number = {'font': {'size': 40, 'color': 'white'}}, # FORCE WHITE
+        gauge = {
+            'axis': {'range': [0, 100], 'tickcolor': "white"},
+            'bar': {'color': "red" if score > 50 else "#00e5ff"},
+            'bgcolor': "rgba(0,0,0,0)"
+        }
+    ))
+    fig.update_layout(height=250, margin=dict(t=50, b=10), paper_bgcolor='rgba(0,0,0,0)', font={'color': "white"})
+    return fig
 
 def show_narrative_phase():
     st.markdown("## 📝 Phase 2: Narrative Decoder")
@@ -8,7 +129,16 @@ def show_narrative_phase():
     mode = st.radio("Select Analysis Mode:", ["📋 Text Analysis (Copy-Paste)", "🎛️ Auditor Simulation (Dropdowns)"], horizontal=True)
     st.divider()
 
+    # Each mode is a fragment: typing, page turns and dropdown changes rerun only the
+    # panel they belong to, not app.py (header, navigation, CSS) or the rest of the page.
     if mode == "📋 Text Analysis (Copy-Paste)":
+        text_analysis_panel()
+    else:
+        auditor_simulation_panel()
+
+@st.fragment
+def text_analysis_panel():
+    with fragment_trace("narrative.text"):
         col1, col2 = st.columns([1, 1])
         with col1:
             # A realistic, complex MD message with "Foggy" language
@@ -19,60 +149,43 @@ We have endeavored to mitigate contingent liabilities through a comprehensive ra
 Furthermore, the amortization of intangible assets has been realigned with our revised capital allocation framework to better reflect the underlying economic reality. We believe that these proactive measures will precipitate a robust recovery in shareholder value, although we acknowledge that near-term visibility remains constrained by external variables beyond our control."""
             
             st.info("👇 **Paste Annual Report Excerpt below:**")
-            raw_text = st.text_area("Managing Director's Statement / MD&A", height=350, value=default_text)
+            raw_text = None
+            upload = st.file_uploader("…or upload an annual report (PDF / HTML)", type=['pdf', 'htm', 'html'])
+            if upload is not None:
+                sections_only = st.checkbox("MD&A / Directors' Report only", value=True)
+                data = upload.getvalue()
+                try:
+                    with span("narrative.extract"):
+                        text, info = extract_upload(hashlib.sha256(data).hexdigest(), upload.name, sections_only, data)
+                except Exception as e:
+                    st.error(f"Could not extract text from {upload.name}: {e}")
+                else:
+                    if text.strip():
+                        raw_text = text
+                        st.caption(f"📄 {upload.name}: {info}")
+                    else:
+                        st.warning(f"No text layer found in {upload.name} (scanned report?)")
+            if raw_text is None:
+                raw_text = st.text_area("Managing Director's Statement / MD&A", height=350, value=default_text)
         
         with col2:
             st.subheader("🤖 AI Text Audit")
             
             # --- ANALYSIS LOGIC ---
-            # 1. Fog Index Calculation
-            words = re.findall(r'\w+', raw_text)
-            sentences = max(len(re.split(r'[.!?]+', raw_text)) - 1, 1) 
-            num_words = len(words) if words else 1
-            
-            # Complex words: Words with > 7 letters as proxy for 3+ syllables
-            complex_words = len([w for w in words if len(w) > 7]) 
-            
-            # Gunning Fog Formula
-            fog = 0.4 * ((num_words / sentences) + 100 * (complex_words / num_words))
-            
-            # 2. Keyword Highlighting
-            highlighted = raw_text
-            
-            # Red Flags (Negative/Risk)
-            risks = ['loss', 'decline', 'challenging', 'headwinds', 'litigation', 'fail', 'unable', 'volatilities', 'constrained', 'pressures']
-            # Yellow Flags (Vague/Obfuscation)
-            vague = ['believe', 'estimate', 'anticipate', 'maybe', 'could', 'contingent', 'endeavored', 'mitigate', 'aforementioned', 'synergistic', 'rationalization', 'precipitate']
-            
-            # Case-insensitive replacement with HTML wrappers
-            for w in risks:
-                pattern = re.compile(rf"\b({w})\b", re.IGNORECASE)
-                highlighted = pattern.sub(r'<span class="risk-high">\1</span>', highlighted)
-            for w in vague:
-                pattern = re.compile(rf"\b({w})\b", re.IGNORECASE)
-                highlighted = pattern.sub(r'<span class="risk-med">\1</span>', highlighted)
+            # 1. Fog Index Calculation (Gunning Fog, streamed in chunks)
+            # 2. Keyword Highlighting: Red Flags (Risk) & Yellow Flags (Vague), single pass
+            # Cached per text hash, so reruns with the same text skip both.
+            digest = text_digest(raw_text)
+            with span("narrative.analyze"):
+                fog, hits = analyze_text(digest, raw_text)
 
             # --- DISPLAY RESULTS ---
             
-            # Fog Index Gauge - FIXED VISIBILITY
-            fig = go.Figure(go.Indicator(
-                mode = "gauge+number", value = fog,
-                title = {'text': "Fog Index (Complexity)", 'font': {'size': 24, 'color': 'white'}}, # FORCE WHITE
-                number = {'font': {'size': 40, 'color': 'white'}}, # FORCE WHITE
-                gauge = {
-                    'axis': {'range': [0, 30], 'tickwidth': 1, 'tickcolor': "white"},
-                    'bar': {'color': "#ff5252" if fog > 18 else "#00e5ff"},
-                    'bgcolor': "rgba(0,0,0,0)",
-                    'steps': [
-                        {'range': [0, 14], 'color': "#1e2530"},
-                        {'range': [14, 18], 'color': "#2d333b"},
-                        {'range': [18, 30], 'color': "#3d0000"}
-                    ],
-                    'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.75, 'value': 18}
-                }
-            ))
-            fig.update_layout(height=250, margin=dict(t=50, b=10, l=20, r=20), paper_bgcolor='rgba(0,0,0,0)', font={'color': "white"})
-            st.plotly_chart(fig, use_container_width=True)
+            # Fog Index Gauge
+            with span("figure.fog"):
+                fig = fog_gauge(fog)
+            with span("chart.fog"):
+                st.plotly_chart(fig, use_container_width=True)
 
             # Text Verdict
             if fog > 18:
@@ -85,17 +198,86 @@ Furthermore, the amortization of intangible assets has been realigned with our r
                 st.success("✅ **VERDICT: CLEAR**")
                 st.caption("Communication is direct and transparent.")
 
-            # Scrollable X-Ray View
-            st.markdown("#### 🔍 X-Ray View")
+            # X-Ray, heatmap and sentence drill-down: page turns rerun only that fragment
+            xray_panel(digest, raw_text, hits)
+
+@st.fragment
+def xray_panel(digest, raw_text, hits):
+    with fragment_trace("narrative.xray"):
+        # Scrollable X-Ray View (one page of the document at a time)
+        st.markdown("#### 🔍 X-Ray View")
+        with span("xray.index"):
+            xray = xray_index(digest, raw_text)
+        if st.session_state.get("xray_digest") != digest:
+            st.session_state["xray_digest"] = digest
+            st.session_state["xray_page"] = 1
+        page = 0
+        if xray.pages > 1:
+            page = min(st.session_state.get("xray_page", 1), xray.pages) - 1
+            nav1, nav2, nav3 = st.columns([1, 1, 1])
+            prev_flag, next_flag = xray.prev_flag_page(page), xray.next_flag_page(page)
+            nav1.button("⏮ Prev red flag", disabled=prev_flag is None, use_container_width=True,
+                        on_click=_goto_page, args=(prev_flag,))
+            nav2.number_input("Page", min_value=1, max_value=xray.pages, key="xray_page",
+                              label_visibility="collapsed")
+            nav3.button("Next red flag ⏭", disabled=next_flag is None, use_container_width=True,
+                        on_click=_goto_page, args=(next_flag,))
+            page = st.session_state["xray_page"] - 1
+        library = default_index()
+        with span("similarity.query"):
+            recycled = recycled_passages(digest, library.version(), raw_text) if library else []
+        x_col, h_col = st.columns([2, 1])
+        with x_col, span("xray.render"):
+            highlighted = xray.render(page, [(s, e) for s, e, _, _ in recycled])
             st.markdown(f"""
-            <div class="report-card" style="height: 200px; overflow-y: scroll; font-size: 16px; line-height: 1.8;">
-                {highlighted}
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.caption("🔴 Red = Risk/Negative | 🟡 Yellow = Vague/Jargon")
+        <div class="report-card" style="height: 200px; overflow-y: scroll; font-size: 16px; line-height: 1.8;">
+            {highlighted}
+        </div>
+        """, unsafe_allow_html=True)
+        # Sentence-level Fog heatmap (red = sentences above the OBFUSCATED threshold)
+        with h_col:
+            with span("narrative.sentences"):
+                profile = sentence_profile(digest, raw_text)
+            if len(profile):
+                smooth = st.toggle(f"Smooth ({DEFAULT_WINDOW} sentences)", key="fog_smooth")
+                with span("figure.heatmap"):
+                    heatmap = fog_heatmap(digest, page, smooth, profile, xray)
+                st.plotly_chart(heatmap, use_container_width=True, config={'displayModeBar': False})
+        if xray.pages > 1:
+            st.caption(f"Page {page + 1} of {xray.pages} · {xray.flag_count(page)} red flag(s) on this page · "
+                       f"{len(xray.flag_pages())} page(s) with red flags")
+        
+        st.caption(f"🔴 Red = Risk/Negative ({hits['risk']}) | 🟡 Yellow = Vague/Jargon ({hits['vague']})")
+        if recycled:
+            by_doc, share = overlap_summary(recycled, len(raw_text))
+            sources = ", ".join(f"{name} ({k})" for name, k in list(by_doc.items())[:3])
+            st.caption(f"♻️ Shaded = recycled: {len(recycled)} passage(s), {share:.0%} of the text, "
+                       f"match prior filings: {sources}")
 
-    else:
+        if library:
+            with st.expander("📚 Filing library (boilerplate check)"):
+                stats = library.stats()
+                st.caption(f"{stats['documents']:,} filings · {stats['passages']:,} passages indexed. "
+                           "Bulk-load with `python similarity.py add filings/`.")
+                st.text_input("Filing name", key="library_name", placeholder="e.g. ACME FY2025 MD&A")
+                st.button("Add this report to the library", on_click=_add_to_library, args=(raw_text,))
+                if "library_msg" in st.session_state:
+                    st.caption(st.session_state.pop("library_msg"))
+
+        worst = profile.worst(5)
+        if worst:
+            with st.expander(f"🌫️ Foggiest sentences ({profile.obfuscated_share():.0%} of words sit in sentences with Fog > 18)"):
+                for i in worst:
+                    s_page = xray.page_of(int(profile.sentence_start[i]))
+                    st.markdown(f"**Fog {profile.fog[i]:.1f}** · sentence {i + 1}"
+                                + (f" · page {s_page + 1}" if xray.pages > 1 else "")
+                                + f"  \n{profile.sentence_text(i, 300)}")
+                    if xray.pages > 1:
+                        st.button("Show in X-Ray", key=f"fog_goto_{i}", on_click=_goto_page, args=(s_page,))
+
+@st.fragment
+def auditor_simulation_panel():
+    with fragment_trace("narrative.simulation"):
         # ADVANCED SIMULATION (Dropdowns)
         st.info("👨‍💻 **Simulation Mode:** Configure the linguistic profile of the report.")
         
@@ -152,19 +334,7 @@ Furthermore, the amortization of intangible assets has been realigned with our r
         c_meter, c_details = st.columns([1, 2])
         
         with c_meter:
-            # Gauge for Simulation - FIXED VISIBILITY
-            fig = go.Figure(go.Indicator(
-                mode = "gauge+number", value = score,
-                title = {'text': "Deception Risk Score", 'font': {'size': 24, 'color': 'white'}}, # FORCE WHITE
-                number = {'font': {'size': 40, 'color': 'white'}}, # FORCE WHITE
-                gauge = {
-                    'axis': {'range': [0, 100], 'tickcolor': "white"},
-                    'bar': {'color': "red" if score > 50 else "#00e5ff"},
-                    'bgcolor': "rgba(0,0,0,0)"
-                }
-            ))
-            fig.update_layout(height=250, margin=dict(t=50, b=10), paper_bgcolor='rgba(0,0,0,0)', font={'color': "white"})
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(risk_gauge(score), use_container_width=True)
             
         with c_details:
             st.subheader("Auditor Conclusion")
@@ -0,0 +1,111 @@
+import hashlib
+import io
+import streamlit as st
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from scoring import Z_SAFE, Z_DISTRESS, Q_SAFE, Q_WARN
+from trends import DEFAULT_WINDOW, panel_scores, latest_year, demo_panel
+from utils import parse_screener_csv
+from instrumentation import span
+
+# --- CACHED COMPUTATIONS (reused across reruns with unchanged inputs) ---
+# Keyed on the upload's hash: the leading underscore stops Streamlit hashing the bytes again.
+@st.cache_data(max_entries=8, ttl=3600, show_spinner="Scoring panel...")
+def load_panel(digest, name, _data, window):
+    import pandas as pd
+    if _data is None:
+        return panel_scores(demo_panel(), window)
+    src = io.BytesIO(_data)
+    src.name = name  # parse_screener_csv picks CSV vs XLSX from the name
+    return panel_scores(pd.concat(parse_screener_csv(src), ignore_index=True), window)
+
+@st.cache_resource(max_entries=64, ttl=3600, show_spinner=False)
+def trend_figure(digest, company, window, _company_rows):
+    df = _company_rows
+    x = df['year'].astype(str)
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.08,
+                        subplot_titles=("Solvency (Z-Score)", "Manipulation Drift (DSRI / SGI)",
+                                        "Earnings Quality (CFO / NI)"))
+
+    # Z-Score with distress / safe bands
+    fig.add_hrect(y0=Z_SAFE, y1=max(df['z_score'].max(), Z_SAFE) * 1.1, fillcolor='rgba(0, 230, 118, 0.08)',
+                  line_width=0, row=1, col=1)
+    fig.add_hrect(y0=min(df['z_score'].min(), 0), y1=Z_DISTRESS, fillcolor='rgba(255, 82, 82, 0.1)',
+                  line_width=0, row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['z_score'], name='Z-Score', mode='lines+markers',
+                             line=dict(color='#00e5ff', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['z_roll'], name=f'Z {window}y avg',
+                             line=dict(color='#00e5ff', width=1, dash='dash')), row=1, col=1)
+
+    # DSRI / SGI: sustained values above 1.0 are the manipulation signal
+    fig.add_hline(y=1.0, line=dict(color='gray', width=1, dash='dot'), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['dsri'], name='DSRI', mode='lines+markers',
+                             line=dict(color='#ff5252', width=2)), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['dsri_roll'], name=f'DSRI {window}y avg',
+                             line=dict(color='#ff5252', width=1, dash='dash')), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['sgi'], name='SGI', mode='lines+markers',
+                             line=dict(color='#ffab00', width=2)), row=2, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['sgi_roll'], name=f'SGI {window}y avg',
+                             line=dict(color='#ffab00', width=1, dash='dash')), row=2, col=1)
+
+    # CFO / NI: yearly bars, cumulative window ratio as a line
+    colors = ['#00e676' if q > Q_SAFE else '#ff5252' if q < Q_WARN else '#ffab00' for q in df['q_ratio']]
+    fig.add_trace(go.Bar(x=x, y=df['q_ratio'], name='CFO/NI', marker_color=colors, opacity=0.7), row=3, col=1)
+    fig.add_trace(go.Scatter(x=x, y=df['q_roll'], name=f'Cumulative {window}y',
+                             line=dict(color='white', width=2)), row=3, col=1)
+    fig.add_hline(y=Q_SAFE, line=dict(color='gray', width=1, dash='dot'), row=3, col=1)
+
+    fig.update_layout(height=720, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)',
+                      font=dict(color='white'), legend=dict(orientation='h', y=-0.08),
+                      margin=dict(l=40, r=20, t=40, b=20))
+    fig.update_xaxes(gridcolor='#333', type='category')
+    fig.update_yaxes(gridcolor='#333')
+    return fig
+
+def show_trends_phase():
+    st.markdown("## 📈 Multi-Year Trend Mode")
+    st.caption("Upload a long Screener-style export (one row per company-year, with company and year columns). "
+               "Previous-year revenue and receivables are filled from the previous fiscal year when it is reported.")
+
+    col_up, col_win = st.columns([3, 1])
+    with col_up:
+        upload = st.file_uploader("Company-year panel (CSV / XLSX)", type=["csv", "xlsx", "xlsm"])
+    with col_win:
+        window = st.number_input("Rolling window (years)", min_value=2, max_value=10, value=DEFAULT_WINDOW)
+
+    if upload is None:
+        st.info("No file uploaded: showing a demo panel of three companies over ten years.")
+        digest, name, data = "demo", "demo", None
+    else:
+        data = upload.getvalue()
+        digest, name = hashlib.sha256(data).hexdigest(), upload.name
+    try:
+        with span("trends.panel"):
+            panel = load_panel(digest, name, data, int(window))
+    except (ValueError, KeyError) as e:
+        st.error(f"Could not read panel: {e}")
+        return
+
+    latest = latest_year(panel)
+    st.markdown(f"**{panel['company'].nunique():,} companies · {len(panel):,} company-years**")
+
+    companies = latest['company'].tolist()
+    company = st.selectbox("Company", companies)
+    rows = panel[panel['company'] == company]
+    last = rows.iloc[-1]
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Z-Score", f"{last['z_score']:.2f}", f"{last['z_change']:+.2f} YoY" if last['z_change'] == last['z_change'] else None)
+    c2.metric(f"DSRI ({window}y avg)", f"{last['dsri_roll']:.2f}")
+    c3.metric(f"CFO/NI ({window}y cumulative)", f"{last['q_roll']:.2f}x")
+    c4.metric("Weak-cash streak", f"{int(last['q_weak_streak'])} yrs")
+
+    with span("figure.trend"):
+        fig = trend_figure(digest, company, int(window), rows)
+    with span("chart.trend"):
+        st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Latest year, all companies", expanded=False):
+        cols = ['company', 'year', 'z_score', 'z_roll', 'z_change', 'dsri_roll', 'sgi_roll',
+                'q_roll', 'q_weak_streak', 'verdict']
+        st.dataframe(latest[cols].sort_values('z_roll'), use_container_width=True, hide_index=True)
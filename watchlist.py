@@ -0,0 +1,307 @@
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+from analysis import ANALYSIS_VERSION
+from corpus_scan import CATEGORIES, analyze_file
+from export import narrative_files, narrative_for
+from lexicon import lexicon_fingerprint
+from scoring import COMPONENT_FIELDS, INPUT_FIELDS, VERDICT_LABELS, score_frame
+from utils import parse_screener_csv
+
+# --- WATCHLIST (nightly delta re-scoring) ---
+# Each watched company is stored with a fingerprint of its financial inputs and
+# of its narrative file next to its last scores. A run fingerprints the new
+# inputs (one vectorized hash per batch) and the narrative files (a stat() per
+# file; content is hashed only when size / mtime moved), re-scores only the
+# records whose fingerprint changed, and reports verdict transitions such as
+# LOW RISK -> HIGH FRAUD RISK. A nightly run costs time in proportion to what
+# changed, not to the size of the watchlist.
+#
+#   python watchlist.py run portfolio.csv --narratives mdna/
+#   python watchlist.py history --limit 50
+
+DEFAULT_PATH = os.environ.get('FO_WATCHLIST') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '.forensic_cache', 'watchlist.sqlite')
+
+# Bump when scoring.py formulas or thresholds change: every stored fingerprint goes stale
+SCORING_VERSION = '1'
+LOOKUP_CHUNK = 500     # companies per IN (...) query
+HASH_BLOCK = 1 << 20
+
+
+def input_fingerprints(batch):
+    # One fingerprint per row over the financial inputs (NaN-safe, order-sensitive)
+    import pandas as pd
+    cols = pd.DataFrame({f: batch[f].to_numpy(dtype=np.float64, na_value=np.nan) for f in INPUT_FIELDS})
+    hashes = pd.util.hash_pandas_object(cols, index=False).to_numpy()
+    return [f"{SCORING_VERSION}:{h:016x}" for h in hashes.tolist()]
+
+
+def text_fingerprint(path):
+    # Narrative content + the analysis / lexicon versions that produced the stored metrics
+    h = hashlib.sha256(f'{ANALYSIS_VERSION}|{lexicon_fingerprint()}|'.encode())
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def verdict_label(code):
+    if code is None:
+        return None
+    return VERDICT_LABELS[code] if code >= 0 else "INCOMPLETE INPUTS"
+
+
+class Watchlist:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('''CREATE TABLE IF NOT EXISTS watch (
+                              company TEXT PRIMARY KEY,
+                              year TEXT,
+                              fin_fp TEXT,
+                              scores TEXT,
+                              verdict INTEGER,
+                              text_path TEXT,
+                              text_stat TEXT,
+                              text_fp TEXT,
+                              narrative TEXT,
+                              fog_verdict TEXT,
+                              updated REAL NOT NULL)''')
+            db.execute('''CREATE TABLE IF NOT EXISTS transitions (
+                              id INTEGER PRIMARY KEY,
+                              run REAL NOT NULL,
+                              company TEXT NOT NULL,
+                              kind TEXT NOT NULL,
+                              old TEXT,
+                              new TEXT)''')
+
+    @contextmanager
+    def _connect(self):
+        # Short-lived connection per call, as in result_store.py
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _lookup(self, db, companies, columns):
+        found = {}
+        for i in range(0, len(companies), LOOKUP_CHUNK):
+            chunk = companies[i:i + LOOKUP_CHUNK]
+            marks = ','.join('?' * len(chunk))
+            for row in db.execute(f'SELECT company, {columns} FROM watch WHERE company IN ({marks})', chunk):
+                found[row[0]] = row[1:]
+        return found
+
+    def _record_transitions(self, db, now, transitions):
+        # Called inside the transaction that stores the new fingerprints: a run that fails later
+        # cannot leave rows updated (and so never re-scored) with their transitions unrecorded
+        db.executemany('INSERT INTO transitions (run, company, kind, old, new) VALUES (?, ?, ?, ?, ?)',
+                       [(now, *t) for t in transitions])
+
+    def _update_financials(self, batch, full, now):
+        # Re-score the changed rows of one batch; returns (rescored, new, transitions)
+        batch = batch.drop_duplicates('company', keep='last').reset_index(drop=True)
+        companies = batch['company'].tolist()
+        fps = input_fingerprints(batch)
+        with self._connect() as db:
+            stored = self._lookup(db, companies, 'fin_fp, verdict')
+        changed = [i for i, (c, fp) in enumerate(zip(companies, fps)) if full or stored.get(c, (None,))[0] != fp]
+        if not changed:
+            return 0, 0, []
+        scores = score_frame(batch.iloc[changed])
+        codes = scores['verdict'].cat.codes.to_numpy().tolist()
+        comps = {f: scores[f].to_numpy().tolist() for f in COMPONENT_FIELDS}
+        years = batch['year'].tolist() if 'year' in batch.columns else [None] * len(batch)
+        rows, transitions, new = [], [], 0
+        for j, i in enumerate(changed):
+            c = companies[i]
+            payload = json.dumps({f: (None if comps[f][j] != comps[f][j] else comps[f][j]) for f in COMPONENT_FIELDS})
+            rows.append((c, years[i], fps[i], payload, codes[j], now))
+            if c not in stored:
+                new += 1
+            elif stored[c][1] != codes[j]:
+                transitions.append((c, 'financial', verdict_label(stored[c][1]), verdict_label(codes[j])))
+        with self._connect() as db:
+            db.executemany('''INSERT INTO watch (company, year, fin_fp, scores, verdict, updated)
+                              VALUES (?, ?, ?, ?, ?, ?)
+                              ON CONFLICT (company) DO UPDATE SET
+                                  year = excluded.year, fin_fp = excluded.fin_fp, scores = excluded.scores,
+                                  verdict = excluded.verdict, updated = excluded.updated''', rows)
+            self._record_transitions(db, now, transitions)
+        return len(changed), new, transitions
+
+    def _changed_narratives(self, root, companies, full):
+        # (company, rel path, stat key, fingerprint) for narrative files whose content moved
+        matches = narrative_files(root)
+        with self._connect() as db:
+            stored = self._lookup(db, companies, 'year, text_path, text_stat, text_fp')
+        jobs, touched = [], []
+        for c in companies:
+            year, path, stat, fp = stored.get(c, (None, None, None, None))
+            rel = narrative_for(matches, c, year)
+            if rel is None:
+                continue
+            abspath = Path(root, rel)
+            stat_now = _stat_key(abspath)
+            if not full and rel == path and stat_now == stat:
+                continue  # untouched file: no read at all
+            fp_now = text_fingerprint(abspath)
+            if not full and rel == path and fp_now == fp:
+                touched.append((stat_now, c))  # touched but identical: just refresh the stat
+                continue
+            jobs.append((c, rel, stat_now, fp_now))
+        if touched:
+            with self._connect() as db:
+                db.executemany('UPDATE watch SET text_stat = ? WHERE company = ?', touched)
+        return jobs
+
+    def _update_narratives(self, root, jobs, workers, now):
+        with self._connect() as db:
+            old = self._lookup(db, [c for c, _, _, _ in jobs], 'fog_verdict')
+        tasks = [(str(root), rel, True) for _, rel, _, _ in jobs]
+        pool = mp.Pool(workers) if workers != 1 and len(tasks) > 1 else None
+        try:
+            results = pool.imap(analyze_file, tasks, chunksize=4) if pool else map(analyze_file, tasks)
+            rows, transitions = [], []
+            for (c, rel, stat, fp), res in zip(jobs, results):
+                if res.get('error'):
+                    print(f"  {c}: {rel}: {res['error']}", file=sys.stderr)
+                    continue
+                narrative = {k: res[k] for k in ('words', 'sentences', 'complex_ratio', 'fog', 'verdict')}
+                narrative.update({f'hits_{cat}': res[f'hits_{cat}'] for cat in CATEGORIES})
+                rows.append((rel, stat, fp, json.dumps(narrative), res['verdict'], now, c))
+                prev = old.get(c, (None,))[0]
+                if prev is not None and prev != res['verdict']:
+                    transitions.append((c, 'narrative', prev, res['verdict']))
+            if pool:
+                pool.close()
+        except BaseException:
+            if pool:
+                pool.terminate()
+            raise
+        finally:
+            if pool:
+                pool.join()
+        with self._connect() as db:
+            db.executemany('''UPDATE watch SET text_path = ?, text_stat = ?, text_fp = ?, narrative = ?,
+                                  fog_verdict = ?, updated = ? WHERE company = ?''', rows)
+            self._record_transitions(db, now, transitions)
+        return len(rows), transitions
+
+    def run(self, source, narratives=None, workers=None, full=False, batch_size=50000, progress=True):
+        # source: portfolio CSV / XLSX (path or file-like) with a 'company' column.
+        # Returns a summary dict with the verdict transitions of this run.
+        now = time.time()
+        seen, rescored, new, transitions, companies = 0, 0, 0, [], []
+        for batch in parse_screener_csv(source, chunksize=batch_size):
+            if 'company' not in batch.columns:
+                raise KeyError("The watchlist needs a 'company' column")
+            r, n, t = self._update_financials(batch, full, now)
+            seen += len(batch)
+            rescored += r
+            new += n
+            transitions += t
+            if narratives:
+                companies += batch['company'].drop_duplicates().tolist()
+            if progress:
+                print(f"  {seen:,} rows, {rescored:,} re-scored", file=sys.stderr)
+        narrated = 0
+        if narratives:
+            jobs = self._changed_narratives(narratives, list(dict.fromkeys(companies)), full)
+            if jobs:
+                narrated, t = self._update_narratives(narratives, jobs, workers, now)
+                transitions += t
+        return {
+            'run': now, 'rows': seen, 'rescored': rescored, 'new': new, 'narratives_rescored': narrated,
+            'transitions': [dict(zip(('company', 'kind', 'old', 'new'), t)) for t in transitions],
+        }
+
+    def history(self, limit=100, company=None):
+        query = 'SELECT run, company, kind, old, new FROM transitions'
+        args = ()
+        if company is not None:
+            query += ' WHERE company = ?'
+            args = (company,)
+        with self._connect() as db:
+            rows = db.execute(query + ' ORDER BY id DESC LIMIT ?', args + (limit,)).fetchall()
+        return [dict(zip(('run', 'company', 'kind', 'old', 'new'), r)) for r in rows]
+
+    def get(self, company):
+        with self._connect() as db:
+            row = db.execute('SELECT year, scores, verdict, narrative, fog_verdict, updated FROM watch '
+                             'WHERE company = ?', (company,)).fetchone()
+        if row is None:
+            return None
+        year, scores, verdict, narrative, fog_verdict, updated = row
+        return {'company': company, 'year': year, 'scores': json.loads(scores) if scores else None,
+                'verdict': verdict_label(verdict), 'narrative': json.loads(narrative) if narrative else None,
+                'fog_verdict': fog_verdict, 'updated': updated}
+
+    def stats(self):
+        with self._connect() as db:
+            n, narrated = db.execute('SELECT COUNT(*), COUNT(narrative) FROM watch').fetchone()
+            t = db.execute('SELECT COUNT(*) FROM transitions').fetchone()[0]
+        return {'companies': n, 'with_narrative': narrated, 'transitions': t}
+
+
+def _print_transitions(items):
+    for t in items:
+        when = f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(t['run']))}  " if 'run' in t else ''
+        print(f"{when}{t['company']} [{t['kind']}]: {t['old']} → {t['new']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forensic Omniscient: watchlist delta re-scoring")
+    parser.add_argument('--db', default=DEFAULT_PATH, help="watchlist database")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    run = sub.add_parser('run', help="re-score what changed and list verdict transitions")
+    run.add_argument('portfolio', help="Screener-style CSV / XLSX, one row per watched company")
+    run.add_argument('--narratives', help="directory of MD&A text files / annual reports named by company")
+    run.add_argument('-w', '--workers', type=int, default=None, help="narrative worker processes")
+    run.add_argument('--full', action='store_true', help="ignore fingerprints and re-score everything")
+    run.add_argument('--json', help="also write the run summary here")
+    hist = sub.add_parser('history', help="recent verdict transitions")
+    hist.add_argument('--limit', type=int, default=50)
+    hist.add_argument('--company')
+    sub.add_parser('stats', help="watchlist size")
+    args = parser.parse_args(argv)
+
+    wl = Watchlist(args.db)
+    if args.cmd == 'run':
+        t0 = time.perf_counter()
+        res = wl.run(args.portfolio, narratives=args.narratives, workers=args.workers, full=args.full)
+        print(f"{res['rows']:,} rows: {res['rescored']:,} re-scored ({res['new']:,} new), "
+              f"{res['narratives_rescored']:,} narratives re-analysed in {time.perf_counter() - t0:.1f}s",
+              file=sys.stderr)
+        _print_transitions(res['transitions'])
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as fh:
+                json.dump(res, fh, indent=2)
+    elif args.cmd == 'history':
+        _print_transitions(wl.history(args.limit, args.company))
+    else:
+        print(wl.stats())
+
+
+if __name__ == '__main__':
+    main()
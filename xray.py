@@ -0,0 +1,101 @@
+from bisect import bisect_left, bisect_right
+
+from lexicon import DEFAULT_LEXICONS, render_html, scan
+
+# --- PAGED X-RAY ---
+# The highlighted X-Ray is rendered one page at a time: the document is cut
+# into ~PAGE_CHARS windows at paragraph / sentence / word breaks, and only the
+# visible window is turned into HTML. Lexicon matches are kept as sorted
+# offsets, so a page's matches and the next / previous red flag are binary
+# searches. The markup sent per rerun is bounded by the page size, not the
+# document length.
+
+PAGE_CHARS = 6000
+FLAG_CATEGORY = 'risk'
+
+
+def page_bounds(text, page_chars=PAGE_CHARS):
+    # Page start offsets (plus len(text) as the final end), breaking in the last
+    # half of each window at a paragraph, then a sentence, then a word boundary
+    n = len(text)
+    bounds = [0]
+    pos = 0
+    while n - pos > page_chars:
+        lo, hi = pos + page_chars // 2, pos + page_chars
+        cut = text.rfind('\n\n', lo, hi)
+        if cut < 0:
+            cut = max(text.rfind('. ', lo, hi), text.rfind('? ', lo, hi), text.rfind('! ', lo, hi))
+            cut = cut + 1 if cut >= 0 else text.rfind(' ', lo, hi)
+        if cut <= pos:
+            cut = hi
+        bounds.append(cut)
+        pos = cut
+    bounds.append(n)
+    return bounds
+
+
+class XRayIndex:
+    def __init__(self, text, matches, page_chars=PAGE_CHARS, flag_category=FLAG_CATEGORY):
+        self.text = text
+        self.matches = [tuple(m) for m in matches]
+        self.starts = [m[0] for m in self.matches]
+        self.bounds = page_bounds(text, page_chars)
+        self.flags = [m[0] for m in self.matches if m[2] == flag_category]
+
+    @classmethod
+    def build(cls, text, lexicons=DEFAULT_LEXICONS, **kwargs):
+        return cls(text, scan(text, lexicons)[0], **kwargs)
+
+    @property
+    def pages(self):
+        return len(self.bounds) - 1
+
+    def page_of(self, offset):
+        return min(max(bisect_right(self.bounds, offset) - 1, 0), self.pages - 1)
+
+    def page_matches(self, page):
+        start, end = self.bounds[page], self.bounds[page + 1]
+        # a phrase match may straddle the page start: step back one
+        lo = max(bisect_left(self.starts, start) - 1, 0)
+        hi = bisect_left(self.starts, end)
+        return self.matches[lo:hi]
+
+    def render(self, page, recycled=()):
+        # recycled: sorted, non-overlapping (start, end) passages found in prior filings,
+        # shaded behind the lexicon highlights
+        start, end = self.bounds[page], self.bounds[page + 1]
+        matches = self.page_matches(page)
+        parts, pos = [], start
+        for s, e in recycled:
+            s, e = max(s, start), min(e, end)
+            if s >= e:
+                continue
+            parts.append(render_html(self.text, matches, pos, s))
+            parts.append(f'<span class="recycled">{render_html(self.text, matches, s, e)}</span>')
+            pos = e
+        parts.append(render_html(self.text, matches, pos, end))
+        return ''.join(parts)
+
+    def flag_count(self, page):
+        return bisect_left(self.flags, self.bounds[page + 1]) - bisect_left(self.flags, self.bounds[page])
+
+    def next_flag_page(self, page):
+        # First page after `page` holding a red flag (wrapping around); None without flags
+        if not self.flags:
+            return None
+        i = bisect_left(self.flags, self.bounds[page + 1])
+        return self.page_of(self.flags[i] if i < len(self.flags) else self.flags[0])
+
+    def prev_flag_page(self, page):
+        if not self.flags:
+            return None
+        i = bisect_left(self.flags, self.bounds[page]) - 1
+        return self.page_of(self.flags[i])
+
+    def flag_pages(self):
+        # [(page, red flags on it)] for every page holding at least one
+        out = {}
+        for offset in self.flags:
+            p = self.page_of(offset)
+            out[p] = out.get(p, 0) + 1
+        return sorted(out.items())